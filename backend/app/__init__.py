@@ -5,6 +5,8 @@ from loguru import logger
 
 from .core.config import settings
 from .core.database import init_db
+from .core.json import FastJSONProvider
+from .core.hashing import password_hasher
 from .core.security import jwt
 from .api import register_blueprints
 from .cli import register_cli
@@ -14,6 +16,7 @@ from werkzeug.middleware.proxy_fix import ProxyFix
 
 def create_app() -> Flask:
     app = Flask(__name__)
+    app.json = FastJSONProvider(app)
     app.wsgi_app = ProxyFix(app.wsgi_app, x_for=1, x_proto=1, x_host=1, x_prefix=1)
     app.config.update(
         SECRET_KEY=settings.secret_key,
@@ -49,5 +52,24 @@ def create_app() -> Flask:
     def healthcheck() -> dict[str, str]:
         return {"status": "ok"}
 
+    @app.get("/health/cache")
+    def cache_health() -> dict[str, object]:
+        # Per process, like the hashing pool: each gunicorn worker has its own breaker.
+        from .core.cache import cache_stats
+
+        return cache_stats()
+
+    @app.get("/health/chat-cache")
+    def chat_cache_metrics() -> dict[str, object]:
+        # Per process, per intent: hits, misses, bypass (not cacheable) and hit rate.
+        from .services.ai_chat import ai_engine
+
+        return ai_engine.cache_stats.stats()
+
+    @app.get("/health/password-hashing")
+    def password_hashing_metrics() -> dict[str, object]:
+        # Per process: each gunicorn worker owns its own hashing pool.
+        return password_hasher.stats()
+
     logger.success("Flask app initialized with environment: {}", settings.environment)
     return app
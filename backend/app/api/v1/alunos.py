@@ -3,6 +3,7 @@ from flask import Blueprint, jsonify, request
 from flask_jwt_extended import get_jwt, get_jwt_identity, jwt_required
 
 from ...core.database import session_scope
+from ...repositories.aluno_repository import LIST_SORTS
 from ...services.aluno_service import AlunoService
 
 
@@ -20,6 +21,10 @@ def register(parent: Blueprint) -> None:
         turno = request.args.get("turno")
         turma = request.args.get("turma")
         query_text = request.args.get("q")
+        sort = request.args.get("sort", "nome")
+        if sort not in LIST_SORTS:
+            return jsonify({"error": f"sort deve ser um de: {', '.join(LIST_SORTS)}"}), 400
+        risk_min = request.args.get("risk_min", type=float)
 
         user_id = int(get_jwt_identity())
         with session_scope() as session:
@@ -29,11 +34,11 @@ def register(parent: Blueprint) -> None:
                 per_page=per_page,
                 turno=turno,
                 turma=turma,
-                query_text=query_text
+                query_text=query_text,
+                sort=sort,
+                risk_min=risk_min,
             )
-            
-            # Pydantic v2 use model_dump
-            return jsonify(result.model_dump())
+            return jsonify(result)
 
     @bp.get("/alunos/<int:aluno_id>")
     @jwt_required()
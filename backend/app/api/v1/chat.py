@@ -1,4 +1,4 @@
-from flask import Blueprint, jsonify, request
+from flask import Blueprint, g, jsonify, request
 from flask_jwt_extended import jwt_required
 
 from ...services import process_chat_message
@@ -14,7 +14,9 @@ def register(parent: Blueprint) -> None:
         if not message:
             return jsonify({"error": "Mensagem vazia"}), 400
         
-        response_data = process_chat_message(message)
+        response_data = process_chat_message(
+            message, getattr(g, "tenant_id", None), getattr(g, "academic_year_id", None)
+        )
         # response_data is a dict with text, type, data, etc.
         # Ensure we return valid JSON
         return jsonify(response_data)
@@ -150,11 +150,14 @@ def register(parent: Blueprint) -> None:
             )
 
             session.refresh(nota)
-            
-            # Invalidate cache
-            from ...core.cache import invalidate_tenant_cache
-            invalidate_tenant_cache()
-            
-            return jsonify(serialize_nota_row(nota))
+            body = serialize_nota_row(nota)
+            scope = (nota.tenant_id, nota.academic_year_id)
+
+        # Invalidate cache once the update is committed, so no reader re-caches the old row
+        from ...core.cache import bump_data_version, invalidate_tenant_cache
+        invalidate_tenant_cache()
+        bump_data_version(*scope)
+
+        return jsonify(body)
 
     parent.register_blueprint(bp)
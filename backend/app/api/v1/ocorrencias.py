@@ -34,7 +34,7 @@ def register(parent: Blueprint) -> None:
                     target_aluno_id = int(req_aluno_id)
 
             results = service.list_ocorrencias(aluno_id=target_aluno_id)
-            return jsonify([r.model_dump() for r in results])
+            return jsonify(results)
 
     @bp.post("/ocorrencias")
     @jwt_required()
@@ -131,4 +131,48 @@ def register(parent: Blueprint) -> None:
             session.delete(tenant)
             return "", 204
 
+    @bp.route("/queues", methods=["GET"])
+    @jwt_required()
+    @super_admin_required
+    def queue_metrics():
+        """Pending jobs, slots and queue-wait times per tenant (see core/jobs.py)."""
+        from app.core.jobs import job_stats
+
+        try:
+            return jsonify(job_stats())
+        except Exception as exc:
+            return jsonify({"error": f"Fila indisponível: {exc}"}), 503
+
+    @bp.route("/risk-models", methods=["GET"])
+    @jwt_required()
+    @super_admin_required
+    def list_risk_models():
+        """Stored risk model versions per scope (tenant id or "global"), newest first."""
+        from app.services.risk_models import list_scopes, list_versions, parse_scope
+
+        scopes = {}
+        for scope in list_scopes():
+            try:
+                scopes[scope] = list_versions(parse_scope(scope))
+            except ValueError:
+                continue
+        return jsonify(scopes)
+
+    @bp.route("/risk-models/<scope>/<version>/activate", methods=["POST"])
+    @jwt_required()
+    @super_admin_required
+    def activate_risk_model(scope, version):
+        from app.services.risk_models import activate_version, parse_scope
+        from app.services.risk_scores import request_risk_refresh
+
+        try:
+            tenant_id = parse_scope(scope)
+        except ValueError:
+            return jsonify({"error": "Escopo inválido (id da escola ou 'global')"}), 400
+        meta = activate_version(tenant_id, version)
+        if tenant_id is not None:
+            # Stored scores follow the active model.
+            meta["refresh_job_id"] = request_risk_refresh(tenant_id)
+        return jsonify(meta)
+
     parent.register_blueprint(bp)
@@ -1,10 +1,14 @@
 """Turmas endpoints."""
-from flask import Blueprint, jsonify
+from flask import Blueprint, current_app, g, jsonify
 from flask_jwt_extended import get_jwt, jwt_required
 from urllib.parse import unquote
 
+from ...core.cache import cache_get, cache_set
 from ...core.database import session_scope
-from ...services.turma_service import TurmaService
+from ...services.turma_service import TurmaService, turma_detail_cache_key
+
+# Invalidation is explicit (invalidate_turma_cache); the TTL is only a safety net.
+TURMA_DETAIL_CACHE_TIMEOUT = 3600
 
 
 def register(parent: Blueprint) -> None:
@@ -28,15 +32,25 @@ def register(parent: Blueprint) -> None:
             return jsonify({"error": "Acesso restrito"}), 403
             
         turma_decoded = unquote(turma_nome)
+        tenant_id = g.get("tenant_id")
+        academic_year_id = g.get("academic_year_id")
+
+        # Cached as encoded JSON so a hit is served without touching the DB or the encoder.
+        cache_key = turma_detail_cache_key(tenant_id, academic_year_id, turma_decoded)
+        cached = cache_get(cache_key)
+        if cached is not None:
+            return current_app.response_class(cached, mimetype="application/json")
         
         with session_scope() as session:
             service = TurmaService(session)
-            result = service.get_turma_detail(turma_decoded)
+            result = service.get_turma_detail(turma_decoded, tenant_id, academic_year_id)
             
             if not result:
                 # Return empty structure as per original contract if not found/empty
                 return jsonify({"turma": turma_decoded, "alunos": [], "total": 0}), 200
 
-            return jsonify(result.model_dump())
+        body = current_app.json.dumps(result)
+        cache_set(cache_key, body, timeout=TURMA_DETAIL_CACHE_TIMEOUT)
+        return current_app.response_class(body, mimetype="application/json")
 
     parent.register_blueprint(bp)
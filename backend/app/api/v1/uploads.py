@@ -1,13 +1,16 @@
 """Uploads endpoints for boletim PDFs."""
 from pathlib import Path
-import re
 
-from flask import Blueprint, jsonify, request
+from flask import Blueprint, Response, g, jsonify, request, stream_with_context
 from flask_jwt_extended import jwt_required
 from werkzeug.utils import secure_filename
 
 from ...core.config import settings
+from ...core.jobs import fetch_tenant_job
 from ...services import enqueue_pdf
+from ...services.job_progress import stream_events
+from ...services.upload_batches import batch_status, create_batch
+from ...services.upload_store import path_segment, save_upload
 
 
 def register(parent: Blueprint) -> None:
@@ -29,40 +32,76 @@ def register(parent: Blueprint) -> None:
         if not filename:
             return jsonify({"error": "nome de arquivo inválido"}), 400
 
-        upload_dir = Path(settings.upload_folder) / _normalize_segment(turno) / _normalize_segment(turma)
-        upload_dir.mkdir(parents=True, exist_ok=True)
+        # Dry run: the job only computes the diff against the DB; nothing is written
+        # and the file is not published under the upload folder.
+        dry_run = (request.form.get("dry_run") or "").strip().lower() in {"1", "true", "yes", "on"}
+        upload_dir = Path(settings.upload_folder) / path_segment(turno) / path_segment(turma)
         filepath = upload_dir / filename
-        file.save(filepath)
+        # Stored by content hash; filepath becomes a link to the blob.
+        blob, digest = save_upload(file.stream, None if dry_run else filepath)
 
-        from flask import g
         job_id = enqueue_pdf(
-            filepath, 
+            blob if dry_run else filepath, 
             turno=turno, 
             turma=turma, 
             tenant_id=g.tenant_id, 
-            academic_year_id=g.academic_year_id
+            academic_year_id=g.academic_year_id,
+            dry_run=dry_run,
         )
         return (
             jsonify(
                 {
                     "filename": filename,
+                    "sha256": digest,
                     "status": "queued",
                     "job_id": job_id,
                     "turno": turno,
                     "turma": turma,
+                    "dry_run": dry_run,
                 }
             ),
             202,
         )
 
+    @bp.post("/uploads/batch")
+    @jwt_required()
+    def upload_batch():
+        """
+        Many boletins at once (PDFs and/or ZIPs of PDFs). Turma and turno come
+        from each PDF's "Turma:" line; the optional form fields are only a
+        fallback. One ingestion job per file; progress via the batch id.
+        """
+        files = request.files.getlist("files") or request.files.getlist("file")
+        if not files:
+            return jsonify({"error": "nenhum arquivo enviado"}), 400
+
+        batch = create_batch(
+            [(file.filename or "", file.stream) for file in files],
+            tenant_id=g.tenant_id,
+            academic_year_id=g.academic_year_id,
+            turno=(request.form.get("turno") or "").strip() or None,
+            turma=(request.form.get("turma") or "").strip() or None,
+        )
+        if not batch["files"]:
+            return jsonify({"error": "nenhum boletim válido no envio", "rejected": batch["rejected"]}), 400
+        return jsonify({**batch, "status": "queued"}), 202
+
+    @bp.get("/uploads/batches/<batch_id>")
+    @jwt_required()
+    def get_batch_status(batch_id):
+        status = batch_status(batch_id, g.tenant_id)
+        if status is None:
+            return jsonify({"error": "Lote não encontrado"}), 404
+        return jsonify(status)
+
     @bp.get("/uploads/jobs/<job_id>")
     @jwt_required()
     def get_job_status(job_id):
         try:
-            from rq.job import Job
-            from ...core.queue import redis_conn
-            
-            job = Job.fetch(job_id, connection=redis_conn)
+            # Another tenant's job answers like an unknown one.
+            job = fetch_tenant_job(job_id, g.tenant_id)
+            if job is None:
+                return jsonify({"error": "Job not found"}), 404
             return jsonify({
                 "job_id": job.id,
                 "status": job.get_status(),
@@ -75,9 +114,17 @@ def register(parent: Blueprint) -> None:
         except Exception:
             return jsonify({"error": "Job not found"}), 404
 
-    parent.register_blueprint(bp)
-
+    @bp.get("/uploads/jobs/<job_id>/events")
+    @jwt_required()
+    def stream_job_events(job_id):
+        """Server-sent events with the job's progress; replaces polling the status endpoint."""
+        job = fetch_tenant_job(job_id, g.tenant_id)
+        if job is None:
+            return jsonify({"error": "Job not found"}), 404
+        return Response(
+            stream_with_context(stream_events(job)),
+            mimetype="text/event-stream",
+            headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+        )
 
-def _normalize_segment(value: str) -> str:
-    slug = re.sub(r"[^0-9A-Za-z_-]+", "-", value.strip())
-    return slug or "geral"
+    parent.register_blueprint(bp)
@@ -1,9 +1,8 @@
 """Endpoints para gerenciamento administrativo de usuários."""
 from __future__ import annotations
 
-from flask import Blueprint, jsonify, request, send_from_directory
+from flask import Blueprint, g, jsonify, request, send_from_directory
 from flask_jwt_extended import get_jwt, get_jwt_identity, jwt_required
-from sqlalchemy import func, or_
 from sqlalchemy.orm import joinedload
 from pathlib import Path
 from werkzeug.utils import secure_filename
@@ -12,7 +11,8 @@ from ...core.config import settings
 from ...core.database import session_scope
 from ...core.security import hash_password
 from ...models import Aluno, Usuario
-from ...services.accounts import ensure_all_aluno_users
+from ...services.accounts import reset_turma_passwords
+from ...services.usuario_service import UsuarioService, invalidate_usuario_totals
 
 
 def serialize_usuario(usuario: Usuario) -> dict[str, object]:
@@ -55,51 +55,20 @@ def register(parent: Blueprint) -> None:
 
         page = max(1, int(request.args.get("page", 1)))
         per_page = min(100, int(request.args.get("per_page", 20)))
-        query_text = request.args.get("q")
-        role_filter = request.args.get("role")
 
+        # Pure read: accounts for new alunos are provisioned by ingestion and by
+        # the reconciliation job (accounts.enqueue_account_reconciliation).
         with session_scope() as session:
-            ensure_all_aluno_users(session)
-            session.flush()  # Ensure new users have IDs before querying
-            
-            query = (
-                session.query(Usuario)
-                .options(joinedload(Usuario.aluno))
-                .outerjoin(Aluno)
-            )
-            if query_text:
-                like = f"%{query_text}%"
-                query = query.filter(
-                    or_(
-                        Usuario.username.ilike(like),
-                        Aluno.nome.ilike(like),
-                        Aluno.matricula.ilike(like),
-                    )
-                )
-            if role_filter:
-                query = query.filter(Usuario.role == role_filter)
-
-            total = query.count()
-            usuarios = (
-                query.order_by(func.lower(Usuario.username))
-                .offset((page - 1) * per_page)
-                .limit(per_page)
-                .all()
+            result = UsuarioService(session).list_users(
+                page=page,
+                per_page=per_page,
+                query=request.args.get("q"),
+                role=request.args.get("role"),
+                after=request.args.get("after"),
+                tenant_id=g.get("tenant_id"),
             )
-            
-            # Serialize within session context to avoid DetachedInstanceError
-            serialized_usuarios = [serialize_usuario(usuario) for usuario in usuarios]
-
-        return jsonify(
-            {
-                "items": serialized_usuarios,
-                "meta": {
-                    "page": page,
-                    "per_page": per_page,
-                    "total": total,
-                },
-            }
-        )
+
+        return jsonify(result)
 
     @bp.post("/usuarios")
     @jwt_required()
@@ -116,7 +85,6 @@ def register(parent: Blueprint) -> None:
         if not username or not password:
             return jsonify({"error": "Usuário e senha são obrigatórios"}), 400
 
-        from flask import g
         with session_scope() as session:
             existing = session.query(Usuario).filter(Usuario.username == username).first()
             if existing:
@@ -138,7 +106,27 @@ def register(parent: Blueprint) -> None:
             )
             session.add(usuario)
             session.flush()
-            return jsonify(serialize_usuario(usuario)), 201
+            body = serialize_usuario(usuario)
+
+        # After the commit, so a concurrent listing cannot re-cache the old total.
+        invalidate_usuario_totals(body["tenant_id"])
+        return jsonify(body), 201
+
+    @bp.post("/usuarios/reset-turma")
+    @jwt_required()
+    def reset_turma_passwords_endpoint():
+        if not _is_admin():
+            return jsonify({"error": "Acesso restrito"}), 403
+
+        turma = ((request.get_json() or {}).get("turma") or "").strip()
+        if not turma:
+            return jsonify({"error": "Turma é obrigatória"}), 400
+
+        with session_scope() as session:
+            total = reset_turma_passwords(
+                session, turma, tenant_id=g.get("tenant_id"), academic_year_id=g.get("academic_year_id")
+            )
+        return jsonify({"turma": turma, "reset": total})
 
     @bp.patch("/usuarios/<int:usuario_id>")
     @jwt_required()
@@ -150,6 +138,7 @@ def register(parent: Blueprint) -> None:
         if not payload:
             return jsonify({"error": "Nenhum dado informado"}), 400
 
+        role_changed = False
         with session_scope() as session:
             usuario = session.get(Usuario, usuario_id)
             if not usuario:
@@ -171,6 +160,7 @@ def register(parent: Blueprint) -> None:
 
             if "role" in payload:
                 usuario.role = payload.get("role") or usuario.role
+                role_changed = True
 
             if "is_admin" in payload:
                 usuario.is_admin = bool(payload.get("is_admin"))
@@ -197,6 +187,8 @@ def register(parent: Blueprint) -> None:
             session.refresh(usuario)
             payload = serialize_usuario(usuario)
 
+        if role_changed:
+            invalidate_usuario_totals(payload["tenant_id"])
         return jsonify(payload)
 
     @bp.delete("/usuarios/<int:usuario_id>")
@@ -213,8 +205,10 @@ def register(parent: Blueprint) -> None:
             usuario = session.get(Usuario, usuario_id)
             if not usuario:
                 return jsonify({"error": "Usuário não encontrado"}), 404
+            tenant_id = usuario.tenant_id
             session.delete(usuario)
 
+        invalidate_usuario_totals(tenant_id)
         return ("", 204)
 
     @bp.post("/usuarios/me/photo")
@@ -255,7 +249,6 @@ def register(parent: Blueprint) -> None:
     @bp.get("/usuarios/me")
     @jwt_required()
     def get_me():
-        from flask import g
         user_id = int(get_jwt_identity())
         
         with session_scope() as session:
@@ -1,6 +1,8 @@
 """Custom Flask CLI commands for database lifecycle."""
+import os
 import random
 from decimal import Decimal
+from pathlib import Path
 
 import click
 
@@ -157,37 +159,187 @@ def register_cli(app):
             else:
                 click.secho(f"User '{username}' already exists.", fg="yellow")
 
+    @app.cli.command("reconcile-accounts")
+    @click.option("--tenant", "tenant_slug", default=None, help="Tenant slug (default: all tenants)")
+    @click.option("--enqueue", is_flag=True, help="Run on the RQ worker instead of inline")
+    def reconcile_accounts_command(tenant_slug, enqueue):
+        """Create missing student accounts (the /usuarios listing no longer does it)."""
+        from .services.accounts import enqueue_account_reconciliation, reconcile_aluno_users
+
+        tenant_id = None
+        if tenant_slug:
+            with session_scope() as session:
+                tenant = session.query(Tenant).filter(Tenant.slug == tenant_slug).first()
+                if not tenant:
+                    click.secho(f"Tenant '{tenant_slug}' not found.", fg="red")
+                    return
+                tenant_id = tenant.id
+
+        if enqueue:
+            job_id = enqueue_account_reconciliation(tenant_id)
+            click.echo(f"Enqueued job {job_id}." if job_id else "Could not reach the queue.")
+            return
+        result = reconcile_aluno_users(tenant_id)
+        click.secho(f"Created {result['created']} accounts, relinked {result['linked']} ({result['seconds']}s).", fg="green")
+
+    @app.cli.command("train-risk-model")
+    @click.option("--tenant", "tenant_slug", default=None, help="Tenant slug (default: the global model)")
+    @click.option("--all", "all_tenants", is_flag=True, help="The global model and one per active tenant")
+    @click.option("--enqueue", is_flag=True, help="Run on the RQ worker instead of inline")
+    def train_risk_model_command(tenant_slug, all_tenants, enqueue):
+        """Retrain risk models as new active versions (schedule with cron plus --enqueue)."""
+        from .services.ai_predictor import enqueue_risk_training, train_risk_model
+
+        tenant_ids = [None]
+        with session_scope() as session:
+            if all_tenants:
+                tenant_ids += [t.id for t in session.query(Tenant).filter(Tenant.is_active.is_(True)).order_by(Tenant.id)]
+            elif tenant_slug:
+                tenant = session.query(Tenant).filter(Tenant.slug == tenant_slug).first()
+                if not tenant:
+                    click.secho(f"Tenant '{tenant_slug}' not found.", fg="red")
+                    return
+                tenant_ids = [tenant.id]
+
+        for tenant_id in tenant_ids:
+            scope = "global" if tenant_id is None else f"tenant {tenant_id}"
+            if enqueue:
+                job_id = enqueue_risk_training(tenant_id)
+                click.echo(f"{scope}: enqueued job {job_id}." if job_id else f"{scope}: could not reach the queue.")
+                continue
+            meta = train_risk_model(tenant_id)
+            if meta is None:
+                click.secho(f"{scope}: not enough data to train a risk model.", fg="yellow")
+                continue
+            click.secho(
+                f"{scope}: version {meta['version']} trained on {meta['alunos']} alunos in {meta['seconds']}s "
+                f"(accuracy {meta['accuracy']}).",
+                fg="green",
+            )
+
+    @app.cli.command("refresh-risk-scores")
+    @click.option("--tenant", "tenant_slug", default=None, help="Tenant slug (default: all active tenants)")
+    @click.option("--enqueue", is_flag=True, help="Run on the RQ worker instead of inline")
+    def refresh_risk_scores_command(tenant_slug, enqueue):
+        """Recompute the stored risk scores (e.g. to backfill them after upgrading)."""
+        from .services.risk_scores import refresh_risk_scores, request_risk_refresh
+
+        with session_scope() as session:
+            query = session.query(Tenant)
+            if tenant_slug:
+                query = query.filter(Tenant.slug == tenant_slug)
+            else:
+                query = query.filter(Tenant.is_active.is_(True))
+            tenant_ids = [t.id for t in query.order_by(Tenant.id)]
+        if tenant_slug and not tenant_ids:
+            click.secho(f"Tenant '{tenant_slug}' not found.", fg="red")
+            return
+
+        for tenant_id in tenant_ids:
+            if enqueue:
+                job_id = request_risk_refresh(tenant_id)
+                click.echo(f"tenant {tenant_id}: enqueued job {job_id}." if job_id else f"tenant {tenant_id}: could not reach the queue.")
+                continue
+            result = refresh_risk_scores(tenant_id)
+            if result["model_version"] is None:
+                click.secho(f"tenant {tenant_id}: no risk model yet (training scheduled).", fg="yellow")
+                continue
+            click.secho(
+                f"tenant {tenant_id}: {result['alunos']} scores with model {result['model_version']} in {result['seconds']}s.",
+                fg="green",
+            )
+
+    @app.cli.command("gc-uploads")
+    @click.option("--dry-run", is_flag=True, help="Only report what would be removed")
+    def gc_uploads_command(dry_run):
+        """Remove stored PDFs (and cached parse results) no upload path points to, after a day."""
+        from .services.upload_store import collect_garbage
+
+        result = collect_garbage(dry_run=dry_run)
+        verb = "Would remove" if dry_run else "Removed"
+        click.secho(
+            f"{verb} {result['blobs']} blobs ({result['bytes']} bytes), "
+            f"{result['sidecars']} cached results and {result['tmp']} temp files.",
+            fg="green",
+        )
+
     @app.cli.command("reprocess-pdfs")
-    def reprocess_pdfs_command():
+    @click.option("--tenant", "tenant_slug", default="default", show_default=True, help="Tenant slug")
+    @click.option("--year", "year_label", default=None, help="Only boletins of this academic year (e.g. 2025)")
+    @click.option("--local", is_flag=True, help="Process here in a process pool instead of enqueueing")
+    @click.option("--workers", type=int, default=os.cpu_count() or 1, show_default=True,
+                  help="Parsing processes for --local (the DB writes run one file at a time)")
+    @click.option("--checkpoint", "checkpoint_path", type=click.Path(dir_okay=False, path_type=Path), default=None,
+                  help="Checkpoint file for --local (default: per tenant/year under the upload store)")
+    @click.option("--restart", is_flag=True, help="Ignore the checkpoint and reprocess everything")
+    def reprocess_pdfs_command(tenant_slug, year_label, local, workers, checkpoint_path, restart):
         """Reprocess all PDFs in the upload folder."""
-        from pathlib import Path
         from .core.config import settings
         from .services.ingestion import enqueue_pdf
-        from .models import Tenant
-        
+        from .services.reprocess import Checkpoint, collect_upload_files, default_checkpoint_path, matches_year, run_local
+
         upload_path = Path(settings.upload_folder)
         if not upload_path.exists():
             click.echo("Cloud uploads folder not found.")
             return
 
         with session_scope() as session:
-            tenant = session.query(Tenant).filter(Tenant.slug == "default").first()
+            tenant = session.query(Tenant).filter(Tenant.slug == tenant_slug).first()
             if not tenant:
-                click.echo("Default tenant not found.")
+                click.secho(f"Tenant '{tenant_slug}' not found.", fg="red")
                 return
-            
+            years = session.query(AcademicYear).filter(AcademicYear.tenant_id == tenant.id)
+            if year_label:
+                year = years.filter(AcademicYear.label == year_label).first()
+                if year is None:
+                    # Created once here, not by each file (there is no unique constraint on it).
+                    year = AcademicYear(tenant_id=tenant.id, label=year_label, is_current=False)
+                    session.add(year)
+                    session.flush()
+                    click.echo(f"Created academic year {year_label}.")
+            else:
+                year = years.filter(AcademicYear.is_current.is_(True)).first()
+            tenant_id, academic_year_id = tenant.id, year.id if year else None
+
+        # Upload paths only (the content-addressed store is skipped); parse results are cached per blob.
+        files = collect_upload_files()
+        if not local:
             count = 0
-            # glob matches recursively
-            for pdf_file in upload_path.rglob("*.pdf"):
-                # Guess turno/turma from path if possible (assumes /data/uploads/TURNO/TURMA/file.pdf)
-                rel_path = pdf_file.relative_to(upload_path)
-                parts = rel_path.parts
-                
-                turno = parts[0] if len(parts) >= 2 else None
-                turma = parts[1] if len(parts) >= 3 else None
-                
-                enqueue_pdf(pdf_file, turno=turno, turma=turma, tenant_id=tenant.id)
+            for upload in files:
+                if not matches_year(upload.path, year_label):
+                    continue
+                enqueue_pdf(
+                    upload.path, turno=upload.turno, turma=upload.turma,
+                    tenant_id=tenant_id, academic_year_id=academic_year_id, priority="bulk",
+                )
                 count += 1
-                click.echo(f"Enqueued: {rel_path}")
-            
+                click.echo(f"Enqueued: {upload.path.relative_to(upload_path)}")
             click.secho(f"Enqueued {count} files for reprocessing.", fg="green")
+            return
+
+        checkpoint = Checkpoint(checkpoint_path or default_checkpoint_path(tenant_slug, year_label))
+        if restart:
+            checkpoint.reset()
+        click.echo(f"{len(files)} files, {len(checkpoint.done)} already done (checkpoint: {checkpoint.path}).")
+
+        def report(upload, result, error):
+            rel_path = upload.path.relative_to(upload_path)
+            if error is not None:
+                click.secho(f"Failed: {rel_path}: {error}", fg="red")
+            elif result.get("other_year"):
+                click.echo(f"Other year: {rel_path}")
+            else:
+                click.echo(f"Processed: {rel_path} ({result.get('count', 0)} alunos)")
+
+        summary = run_local(
+            files, tenant_id=tenant_id, academic_year_id=academic_year_id, year_label=year_label,
+            checkpoint=checkpoint, workers=max(1, workers), on_result=report,
+        ).as_dict()
+        click.secho(
+            f"Processed {summary['processed']} files ({summary['alunos']} alunos, {summary['notas']} notas) "
+            f"in {summary['seconds']}s: {summary['files_per_second'] or 0} files/s, "
+            f"{summary['alunos_per_second'] or 0} alunos/s. "
+            f"Skipped {summary['skipped']} from the checkpoint, {summary['other_year']} of other years, "
+            f"{summary['failed']} failed.",
+            fg="red" if summary["failed"] else "green",
+        )
@@ -1,11 +1,223 @@
+"""
+Redis-backed response and data cache.
+
+Every Redis call goes through a circuit breaker: after
+``CACHE_BREAKER_FAILURES`` consecutive failures (each bounded by
+``CACHE_SOCKET_TIMEOUT``) Redis is skipped for ``CACHE_BREAKER_COOLDOWN``
+seconds and reads/writes use a small in-process LRU instead. After the
+cool-down one request probes Redis; on success the breaker closes, the
+invalidations missed during the outage are replayed and the LRU is dropped.
+The same recovery runs after failures too few to open the breaker, and LRU
+entries never live longer than the cool-down.
+State is exposed at ``/health/cache``.
+"""
+import fnmatch
 import json
+import threading
+import time
+from collections import OrderedDict
 from functools import wraps
 from flask import g
 import redis
+from loguru import logger
 from .config import settings
 
-# Initialize redis client
-redis_client = redis.from_url(settings.redis_url)
+redis_client = redis.from_url(
+    settings.redis_url,
+    socket_timeout=settings.cache_socket_timeout,
+    socket_connect_timeout=settings.cache_socket_timeout,
+)
+
+
+class CacheUnavailable(Exception):
+    """Redis was skipped (breaker open) or the call failed."""
+
+
+class CircuitBreaker:
+    CLOSED, OPEN, HALF_OPEN = "closed", "open", "half_open"
+
+    def __init__(self, failure_threshold: int, cooldown: float, clock=time.monotonic):
+        self.failure_threshold = max(1, failure_threshold)
+        self.cooldown = cooldown
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._state = self.CLOSED
+        self._opened_at = 0.0
+        self._consecutive = 0
+        self.failures = 0
+        self.trips = 0
+        self.short_circuited = 0
+        self.last_error: str | None = None
+
+    @property
+    def state(self) -> str:
+        return self._state
+
+    def allow(self) -> bool:
+        """True when the caller may use Redis; after the cool-down exactly one caller probes."""
+        with self._lock:
+            if self._state == self.CLOSED:
+                return True
+            if self._state == self.OPEN and self._clock() - self._opened_at >= self.cooldown:
+                self._state = self.HALF_OPEN
+                return True
+            self.short_circuited += 1
+            return False
+
+    def record_success(self) -> bool:
+        """Returns True when this success follows failures (the breaker closed, or never opened)."""
+        with self._lock:
+            failed, self._consecutive = self._consecutive, 0
+            if self._state == self.CLOSED:
+                return failed > 0
+            self._state = self.CLOSED
+        logger.info("Redis cache recovered, circuit closed")
+        return True
+
+    def record_failure(self, exc: Exception) -> None:
+        with self._lock:
+            self.failures += 1
+            self._consecutive += 1
+            self.last_error = f"{type(exc).__name__}: {exc}"
+            if self._state == self.HALF_OPEN or (
+                self._state == self.CLOSED and self._consecutive >= self.failure_threshold
+            ):
+                self._state = self.OPEN
+                self._opened_at = self._clock()
+                self.trips += 1
+                tripped = True
+            else:
+                tripped = False
+        if tripped:
+            logger.warning("Redis cache unavailable ({}), circuit open for {}s", self.last_error, self.cooldown)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "state": self._state,
+                "failures": self.failures,
+                "consecutive_failures": self._consecutive,
+                "trips": self.trips,
+                "short_circuited": self.short_circuited,
+                "last_error": self.last_error,
+                "open_for_seconds": round(self._clock() - self._opened_at, 1) if self._state != self.CLOSED else 0.0,
+            }
+
+
+class LocalLRU:
+    """Thread-safe, size-bounded in-process cache with per-entry expiry.
+
+    ``max_ttl`` caps every entry's lifetime: other processes keep writing and
+    invalidating in Redis once it is back, so a local entry must not outlive
+    the outage by much.
+    """
+
+    def __init__(self, max_entries: int, max_ttl: float | None = None):
+        self.max_entries = max_entries
+        self.max_ttl = max_ttl
+        self._lock = threading.Lock()
+        self._data: OrderedDict[str, tuple[float, bytes]] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: str) -> bytes | None:
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None or entry[0] <= time.monotonic():
+                self._data.pop(key, None)
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def set(self, key: str, value: bytes | str, timeout: int) -> None:
+        if isinstance(value, str):
+            value = value.encode()
+        if self.max_ttl is not None:
+            timeout = min(timeout, self.max_ttl)
+        with self._lock:
+            self._data[key] = (time.monotonic() + timeout, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+
+    def delete(self, *keys: str) -> None:
+        with self._lock:
+            for key in keys:
+                self._data.pop(key, None)
+
+    def delete_pattern(self, pattern: str) -> None:
+        with self._lock:
+            for key in [key for key in self._data if fnmatch.fnmatchcase(key, pattern)]:
+                del self._data[key]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"entries": len(self._data), "hits": self.hits, "misses": self.misses}
+
+
+breaker = CircuitBreaker(settings.cache_breaker_failures, settings.cache_breaker_cooldown)
+local_cache = LocalLRU(settings.cache_local_max_entries, max_ttl=settings.cache_breaker_cooldown)
+# Invalidations made while Redis was unavailable, replayed on recovery. Sets:
+# repeated invalidations of the same key/pattern replay once.
+_missed: dict[str, set[str]] = {"delete": set(), "pattern": set(), "incr": set()}
+_missed_lock = threading.Lock()
+
+
+def _redis(fn, *args):
+    """Runs ``fn(*args)`` (a Redis call) through the breaker; raises CacheUnavailable."""
+    if not breaker.allow():
+        raise CacheUnavailable
+    try:
+        result = fn(*args)
+    except Exception as exc:
+        breaker.record_failure(exc)
+        raise CacheUnavailable from exc
+    # Every process has its own breaker and LRU: whichever sees Redis answer
+    # again after failing replays its own missed invalidations and drops its LRU.
+    if breaker.record_success():
+        _recover()
+    return result
+
+
+def _remember(operation: str, *values: str) -> None:
+    with _missed_lock:
+        _missed[operation].update(values)
+
+
+def _recover() -> None:
+    # Entries cached in Redis before the outage may be stale: apply what was missed.
+    with _missed_lock:
+        missed = {operation: set(values) for operation, values in _missed.items()}
+        for values in _missed.values():
+            values.clear()
+    try:
+        if missed["delete"]:
+            redis_client.delete(*missed["delete"])
+        for pattern in missed["pattern"]:
+            keys = list(redis_client.scan_iter(pattern))
+            if keys:
+                redis_client.delete(*keys)
+        for key in missed["incr"]:
+            redis_client.incr(key)
+    except Exception as exc:
+        logger.warning("Could not replay missed cache invalidations: {}", exc)
+        with _missed_lock:
+            for operation, values in missed.items():
+                _missed[operation].update(values)
+    local_cache.clear()
+
+
+def cache_stats() -> dict:
+    with _missed_lock:
+        missed = sum(len(values) for values in _missed.values())
+    return {**breaker.stats(), "local": local_cache.stats(), "missed_invalidations": missed}
+
 
 def cache_response(timeout=300, key_prefix="cache"):
     """
@@ -26,13 +238,9 @@ def cache_response(timeout=300, key_prefix="cache"):
             from flask import request
             cache_key = f"{key_prefix}:{tenant_id}:{year_id}:{request.path}:{request.query_string.decode()}"
             
-            try:
-                cached_data = redis_client.get(cache_key)
-                if cached_data:
-                    return json.loads(cached_data)
-            except Exception as e:
-                # Log or ignore redis failure
-                pass
+            cached_data = cache_get(cache_key)
+            if cached_data:
+                return json.loads(cached_data)
 
             response = f(*args, **kwargs)
             
@@ -40,15 +248,11 @@ def cache_response(timeout=300, key_prefix="cache"):
             if isinstance(response, tuple):
                  return response # Don't cache if it has status code (might be error)
             
-            try:
-                # We assume the response is a flask response or a dict that jsonify will handle.
-                # If it's a Response object, we need to handle it.
-                # However, usually we return dicts in this project.
-                # If it's a dict/list, we cache it.
-                if isinstance(response, (dict, list)):
-                    redis_client.setex(cache_key, timeout, json.dumps(response))
-            except Exception as e:
-                pass
+            # We assume the response is a flask response or a dict that jsonify will handle.
+            # However, usually we return dicts in this project.
+            # If it's a dict/list, we cache it.
+            if isinstance(response, (dict, list)):
+                cache_set(cache_key, json.dumps(response), timeout=timeout)
                 
             return response
         return decorated_function
@@ -58,6 +262,70 @@ def invalidate_tenant_cache():
     """Invalidates all cache for the current tenant."""
     tenant_id = getattr(g, 'tenant_id', None)
     if tenant_id:
-        pattern = f"cache:{tenant_id}:*"
-        for key in redis_client.scan_iter(pattern):
-            redis_client.delete(key)
+        cache_delete_pattern(f"cache:{tenant_id}:*")
+
+
+def cache_get(key: str) -> bytes | None:
+    """Reads a raw cached payload; the local LRU answers while Redis is unavailable."""
+    if settings.environment == "test":
+        return None
+    try:
+        return _redis(redis_client.get, key)
+    except CacheUnavailable:
+        return local_cache.get(key)
+
+
+def cache_set(key: str, value: bytes | str, timeout: int = 300) -> None:
+    if settings.environment == "test":
+        return
+    try:
+        _redis(redis_client.setex, key, timeout, value)
+    except CacheUnavailable:
+        local_cache.set(key, value, timeout)
+
+
+def cache_delete(*keys: str) -> None:
+    if settings.environment == "test" or not keys:
+        return
+    local_cache.delete(*keys)
+    try:
+        _redis(redis_client.delete, *keys)
+    except CacheUnavailable:
+        _remember("delete", *keys)
+
+
+def cache_delete_pattern(pattern: str) -> None:
+    if settings.environment == "test":
+        return
+    local_cache.delete_pattern(pattern)
+    try:
+        keys = _redis(lambda: list(redis_client.scan_iter(pattern)))
+        if keys:
+            _redis(redis_client.delete, *keys)
+    except CacheUnavailable:
+        _remember("pattern", pattern)
+
+
+def data_version(tenant_id: int | None, academic_year_id: int | None) -> int | None:
+    """
+    Counter bumped on every write to a tenant/year's alunos or notas. None when
+    Redis is unavailable, so callers must treat "unknown" as "changed".
+    """
+    if settings.environment == "test":
+        return None
+    try:
+        value = _redis(redis_client.get, f"data_version:{tenant_id}:{academic_year_id}")
+        return int(value) if value is not None else 0
+    except CacheUnavailable:
+        return None
+
+
+def bump_data_version(tenant_id: int | None, academic_year_id: int | None) -> int | None:
+    if settings.environment == "test":
+        return None
+    key = f"data_version:{tenant_id}:{academic_year_id}"
+    try:
+        return int(_redis(redis_client.incr, key))
+    except CacheUnavailable:
+        _remember("incr", key)
+        return None
@@ -16,6 +16,25 @@ class Settings(BaseSettings):
     upload_folder: str = Field(default="../data/uploads", alias="UPLOAD_FOLDER")
     log_level: str = Field(default="INFO", alias="LOG_LEVEL")
     flask_debug: bool = Field(default=False, alias="FLASK_DEBUG")
+    ingestion_workers: int = Field(default=1, alias="INGESTION_WORKERS")
+    ingestion_pages_per_task: int = Field(default=25, alias="INGESTION_PAGES_PER_TASK")
+    password_hash_workers: int = Field(default=1, alias="PASSWORD_HASH_WORKERS")
+    password_hash_max_pending: int = Field(default=64, alias="PASSWORD_HASH_MAX_PENDING")
+    bcrypt_rounds: int | None = Field(default=None, alias="BCRYPT_ROUNDS")
+    job_progress_interval: float = Field(default=1.0, alias="JOB_PROGRESS_INTERVAL")
+    job_events_timeout: int = Field(default=300, alias="JOB_EVENTS_TIMEOUT")
+    upload_batch_max_files: int = Field(default=300, alias="UPLOAD_BATCH_MAX_FILES")
+    upload_batch_ttl: int = Field(default=7 * 24 * 3600, alias="UPLOAD_BATCH_TTL")
+    tenant_job_concurrency: int = Field(default=1, alias="TENANT_JOB_CONCURRENCY")
+    cache_socket_timeout: float = Field(default=0.25, alias="CACHE_SOCKET_TIMEOUT")
+    cache_breaker_failures: int = Field(default=3, alias="CACHE_BREAKER_FAILURES")
+    cache_breaker_cooldown: float = Field(default=30.0, alias="CACHE_BREAKER_COOLDOWN")
+    cache_local_max_entries: int = Field(default=1024, alias="CACHE_LOCAL_MAX_ENTRIES")
+    job_backend: str | None = Field(default=None, alias="JOB_BACKEND")
+    local_job_workers: int = Field(default=2, alias="LOCAL_JOB_WORKERS")
+    local_job_max_pending: int = Field(default=500, alias="LOCAL_JOB_MAX_PENDING")
+    risk_model_dir: str = Field(default="../data/risk_models", alias="RISK_MODEL_DIR")
+    risk_refresh_after_ingestion: bool | None = Field(default=None, alias="RISK_REFRESH_AFTER_INGESTION")
 
     model_config = {
         "env_file": ".env",
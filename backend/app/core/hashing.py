@@ -0,0 +1,130 @@
+"""Password hashing service: bcrypt in a bounded process pool with wait-time metrics."""
+from __future__ import annotations
+
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Callable, Sequence
+
+from passlib.context import CryptContext
+
+from .config import settings
+from .processes import pool_context
+
+
+def configured_rounds() -> int:
+    """BCRYPT_ROUNDS, or a per-environment default (cheap hashes in tests)."""
+    if settings.bcrypt_rounds:
+        return settings.bcrypt_rounds
+    return 4 if settings.environment == "test" else 12
+
+
+_rounds = configured_rounds()
+# min == max == default: hashes made with any other cost report needs_update,
+# which is what drives the rehash on login.
+pwd_context = CryptContext(
+    schemes=["bcrypt"],
+    deprecated="auto",
+    bcrypt__default_rounds=_rounds,
+    bcrypt__min_rounds=_rounds,
+    bcrypt__max_rounds=_rounds,
+)
+
+
+# Pool entry points. They run in the worker process and return the monotonic
+# start time so the caller can measure how long the task sat in the queue.
+def _hash(raw_password: str) -> tuple[float, str]:
+    return time.monotonic(), pwd_context.hash(raw_password)
+
+
+def _verify(raw_password: str, hashed_password: str) -> tuple[float, bool]:
+    return time.monotonic(), pwd_context.verify(raw_password, hashed_password)
+
+
+def _verify_and_update(raw_password: str, hashed_password: str) -> tuple[float, tuple[bool, str | None]]:
+    return time.monotonic(), pwd_context.verify_and_update(raw_password, hashed_password)
+
+
+class PasswordHasher:
+    """
+    Runs bcrypt inline (``workers <= 1``) or in a process pool owned by the
+    current process. ``max_pending`` bounds the tasks in flight; callers
+    block for a free slot instead of growing the queue without limit.
+    """
+
+    def __init__(self, workers: int, max_pending: int):
+        self.workers = workers
+        self._slots = threading.BoundedSemaphore(max(1, max_pending))
+        self._lock = threading.Lock()
+        self._pool: ProcessPoolExecutor | None = None
+        self._pool_pid: int | None = None
+        self._calls = 0
+        self._wait_total = 0.0
+        self._wait_max = 0.0
+        self._in_flight = 0
+
+    def hash(self, raw_password: str) -> str:
+        return self._run(_hash, raw_password)
+
+    def verify(self, raw_password: str, hashed_password: str) -> bool:
+        return self._run(_verify, raw_password, hashed_password)
+
+    def verify_and_update(self, raw_password: str, hashed_password: str) -> tuple[bool, str | None]:
+        """Returns ``(valid, new_hash)``; ``new_hash`` is set when the stored cost is outdated."""
+        return self._run(_verify_and_update, raw_password, hashed_password)
+
+    def hash_many(self, raw_passwords: Sequence[str]) -> list[str]:
+        if self.workers <= 1 or len(raw_passwords) < 2:
+            return [self.hash(raw) for raw in raw_passwords]
+        chunksize = max(1, len(raw_passwords) // (self.workers * 4))
+        submitted = time.monotonic()
+        results = list(self._executor().map(_hash, raw_passwords, chunksize=chunksize))
+        for started, _ in results:
+            self._record(started - submitted)
+        return [hashed for _, hashed in results]
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            return {
+                "workers": self.workers,
+                "rounds": _rounds,
+                "calls": self._calls,
+                "in_flight": self._in_flight,
+                "avg_wait_ms": round(self._wait_total / self._calls * 1000, 2) if self._calls else 0.0,
+                "max_wait_ms": round(self._wait_max * 1000, 2),
+            }
+
+    def _run(self, fn: Callable[..., tuple[float, Any]], *args: Any) -> Any:
+        if self.workers <= 1:
+            _, result = fn(*args)
+            self._record(0.0)
+            return result
+        submitted = time.monotonic()
+        with self._slots:
+            with self._lock:
+                self._in_flight += 1
+            try:
+                started, result = self._executor().submit(fn, *args).result()
+            finally:
+                with self._lock:
+                    self._in_flight -= 1
+        self._record(started - submitted)
+        return result
+
+    def _executor(self) -> ProcessPoolExecutor:
+        # A pool inherited through fork (gunicorn preload, RQ work horse) is not usable.
+        with self._lock:
+            if self._pool is None or self._pool_pid != os.getpid():
+                self._pool = ProcessPoolExecutor(max_workers=self.workers, mp_context=pool_context())
+                self._pool_pid = os.getpid()
+            return self._pool
+
+    def _record(self, wait: float) -> None:
+        with self._lock:
+            self._calls += 1
+            self._wait_total += wait
+            self._wait_max = max(self._wait_max, wait)
+
+
+password_hasher = PasswordHasher(settings.password_hash_workers, settings.password_hash_max_pending)
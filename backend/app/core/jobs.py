@@ -0,0 +1,422 @@
+"""
+Job backends: where background work (PDF imports, account reconciliation) runs.
+
+``JOB_BACKEND=rq`` hands jobs to the tenant scheduler and RQ workers
+(``core/scheduler.py``). ``JOB_BACKEND=local`` runs them in a bounded thread
+pool inside the web process, with an in-memory job registry, for single-node
+deployments without Redis (one gunicorn worker with threads: the registry is
+per process). Unset, the test environment uses ``local`` and everything else
+``rq``.
+
+Both backends hand out job ids and return job objects with the parts of the
+RQ ``Job`` surface the API relies on (``id``, ``meta``, ``get_status()``,
+``result``, ``enqueued_at``/``started_at``/``ended_at``, ``latest_result()``,
+and a ``connection`` that can ``publish`` and ``pubsub``), so
+``/uploads/jobs/<job_id>`` and its event stream answer the same either way.
+
+The local pool is a thread pool: the CPU-heavy parts of an import already
+run in their own process pools (``INGESTION_WORKERS``,
+``PASSWORD_HASH_WORKERS``), started through a fork server
+(``core/processes.py``) since forking this threaded process is unsafe. Jobs are admitted like the RQ scheduler does:
+by priority, round-robin across tenants, at most ``TENANT_JOB_CONCURRENCY``
+per tenant. Job timeouts are not enforced (threads cannot be killed).
+"""
+from __future__ import annotations
+
+import queue as queue_module
+import threading
+import time
+import traceback
+import uuid
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Any, Callable
+
+from loguru import logger
+
+from .config import settings
+from .exceptions import AppError
+
+PRIORITIES = ("interactive", "bulk", "maintenance")
+# Tenant of jobs submitted without one (super admin, CLI).
+GLOBAL_TENANT = "global"
+# Finished local jobs stay queryable this long.
+LOCAL_RESULT_TTL = 24 * 3600
+
+
+class JobQueueFull(AppError):
+    """The local backend already holds ``LOCAL_JOB_MAX_PENDING`` waiting jobs."""
+
+    def __init__(self, waiting: int):
+        super().__init__("Fila de processamento cheia, tente novamente em instantes", status_code=503)
+        self.waiting = waiting
+
+
+def configured_job_backend() -> str:
+    """JOB_BACKEND, or a per-environment default (no Redis in tests)."""
+    if settings.job_backend:
+        return settings.job_backend
+    return "local" if settings.environment == "test" else "rq"
+
+
+def submit_job(
+    func: Callable[..., Any],
+    args: tuple = (),
+    kwargs: dict | None = None,
+    *,
+    tenant_id: int | None,
+    priority: str = "interactive",
+    job_timeout: int = 600,
+    meta: dict | None = None,
+) -> str:
+    """Schedules ``func(*args, **kwargs)`` for ``tenant_id`` on the configured backend; returns the job id."""
+    if priority not in PRIORITIES:
+        raise ValueError(f"Unknown job priority: {priority}")
+    return job_backend().submit(
+        func, args, kwargs or {}, tenant_id=tenant_id, priority=priority, job_timeout=job_timeout, meta=meta
+    )
+
+
+def fetch_job(job_id: str):
+    """The job, or None when the backend does not know (or no longer keeps) it."""
+    return job_backend().fetch(job_id)
+
+
+def job_tenant(tenant_id: int | None) -> str:
+    """The ``meta["tenant"]`` both backends give the jobs of ``tenant_id``."""
+    return GLOBAL_TENANT if tenant_id is None else str(tenant_id)
+
+
+def fetch_tenant_job(job_id: str, tenant_id: int | None):
+    """The job when it belongs to ``tenant_id``; None otherwise, as if unknown."""
+    job = fetch_job(job_id)
+    if job is None or job.meta.get("tenant") != job_tenant(tenant_id):
+        return None
+    return job
+
+
+def fetch_jobs(job_ids: list[str]) -> list:
+    return job_backend().fetch_many(job_ids)
+
+
+def current_job():
+    """The job running in this thread/work horse, if any."""
+    return job_backend().current_job()
+
+
+def save_record(key: str, data: str, ttl: int) -> None:
+    """Small JSON records tied to jobs (e.g. upload batches), kept next to them."""
+    job_backend().save_record(key, data, ttl)
+
+
+def load_record(key: str) -> str | None:
+    return job_backend().load_record(key)
+
+
+def job_stats() -> dict[str, Any]:
+    return job_backend().stats()
+
+
+class RQJobBackend:
+    name = "rq"
+
+    def submit(self, func, args, kwargs, *, tenant_id, priority, job_timeout, meta) -> str:
+        from .scheduler import submit_job as schedule
+
+        return schedule(
+            func, args, kwargs, tenant_id=tenant_id, priority=priority, job_timeout=job_timeout, meta=meta
+        )
+
+    def fetch(self, job_id: str):
+        from rq.exceptions import NoSuchJobError
+        from rq.job import Job
+
+        from .queue import redis_conn
+
+        try:
+            return Job.fetch(job_id, connection=redis_conn)
+        except NoSuchJobError:
+            return None
+
+    def fetch_many(self, job_ids: list[str]) -> list:
+        from rq.job import Job
+
+        from .queue import redis_conn
+
+        return Job.fetch_many(job_ids, connection=redis_conn)
+
+    def current_job(self):
+        from rq import get_current_job
+
+        return get_current_job()
+
+    def save_record(self, key: str, data: str, ttl: int) -> None:
+        from .queue import redis_conn
+
+        redis_conn.set(key, data, ex=ttl)
+
+    def load_record(self, key: str) -> str | None:
+        from .queue import redis_conn
+
+        raw = redis_conn.get(key)
+        return raw.decode() if raw is not None else None
+
+    def stats(self) -> dict[str, Any]:
+        from .scheduler import scheduler_stats
+
+        return {"backend": self.name, **scheduler_stats()}
+
+
+class LocalBroker:
+    """In-process stand-in for Redis pub/sub, enough for job progress events."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._subscribers: dict[str, set[LocalPubSub]] = {}
+
+    def publish(self, channel: str, message: str) -> int:
+        with self._lock:
+            subscribers = list(self._subscribers.get(channel, ()))
+        for subscriber in subscribers:
+            subscriber.messages.put({"type": "message", "channel": channel, "data": message})
+        return len(subscribers)
+
+    def pubsub(self, ignore_subscribe_messages: bool = True) -> LocalPubSub:
+        return LocalPubSub(self)
+
+    def _subscribe(self, subscriber: LocalPubSub, channel: str) -> None:
+        with self._lock:
+            self._subscribers.setdefault(channel, set()).add(subscriber)
+
+    def _unsubscribe(self, subscriber: LocalPubSub) -> None:
+        with self._lock:
+            for channel in subscriber.channels:
+                self._subscribers.get(channel, set()).discard(subscriber)
+
+
+class LocalPubSub:
+    def __init__(self, broker: LocalBroker):
+        self.broker = broker
+        self.channels: set[str] = set()
+        self.messages: queue_module.Queue = queue_module.Queue()
+
+    def subscribe(self, *channels: str) -> None:
+        for channel in channels:
+            self.channels.add(channel)
+            self.broker._subscribe(self, channel)
+
+    def get_message(self, timeout: float = 0.0) -> dict | None:
+        try:
+            return self.messages.get(timeout=timeout) if timeout else self.messages.get_nowait()
+        except queue_module.Empty:
+            return None
+
+    def close(self) -> None:
+        self.broker._unsubscribe(self)
+
+
+@dataclass
+class LocalResult:
+    exc_string: str | None
+
+
+class LocalJob:
+    def __init__(self, func, args, kwargs, *, tenant: str, priority: str, meta: dict | None, connection: LocalBroker):
+        self.id = str(uuid.uuid4())
+        self.func = func
+        self.args = args
+        self.kwargs = kwargs
+        self.tenant = tenant
+        self.priority = priority
+        self.meta = {**(meta or {}), "tenant": tenant, "priority": priority}
+        self.connection = connection
+        self.status = "queued"
+        self.created_at = self.enqueued_at = datetime.now(timezone.utc)
+        self.started_at: datetime | None = None
+        self.ended_at: datetime | None = None
+        self.result: Any = None
+        self.exc_string: str | None = None
+
+    def get_status(self, refresh: bool = True) -> str:
+        return self.status
+
+    @property
+    def is_finished(self) -> bool:
+        return self.status == "finished"
+
+    @property
+    def is_failed(self) -> bool:
+        return self.status == "failed"
+
+    def refresh(self) -> None:
+        pass
+
+    def save_meta(self) -> None:
+        # meta is the registry's own dict; nothing to persist.
+        pass
+
+    def latest_result(self) -> LocalResult | None:
+        return LocalResult(self.exc_string) if self.ended_at else None
+
+
+class LocalJobBackend:
+    name = "local"
+
+    def __init__(self, workers: int, max_pending: int):
+        self.workers = max(1, workers)
+        self.max_pending = max_pending
+        self.broker = LocalBroker()
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._jobs: dict[str, LocalJob] = {}
+        self._pending: dict[str, dict[str, deque[LocalJob]]] = {priority: {} for priority in PRIORITIES}
+        self._running: dict[str, int] = {}
+        self._waits: dict[tuple[str, str], list[float]] = {}
+        self._records: dict[str, tuple[float, str]] = {}
+        self._cursor = 0
+        self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="local-job")
+
+    def submit(self, func, args, kwargs, *, tenant_id, priority, job_timeout, meta) -> str:
+        tenant = job_tenant(tenant_id)
+        job = LocalJob(func, args, kwargs, tenant=tenant, priority=priority, meta=meta, connection=self.broker)
+        with self._lock:
+            waiting = sum(len(jobs) for by_tenant in self._pending.values() for jobs in by_tenant.values())
+            if waiting >= self.max_pending:
+                raise JobQueueFull(waiting)
+            self._prune()
+            self._jobs[job.id] = job
+            self._pending[priority].setdefault(tenant, deque()).append(job)
+            self._dispatch()
+        return job.id
+
+    def fetch(self, job_id: str) -> LocalJob | None:
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def fetch_many(self, job_ids: list[str]) -> list[LocalJob | None]:
+        with self._lock:
+            return [self._jobs.get(job_id) for job_id in job_ids]
+
+    def current_job(self) -> LocalJob | None:
+        return getattr(self._local, "job", None)
+
+    def save_record(self, key: str, data: str, ttl: int) -> None:
+        with self._lock:
+            self._records[key] = (time.time() + ttl, data)
+
+    def load_record(self, key: str) -> str | None:
+        with self._lock:
+            expires, data = self._records.get(key, (0.0, None))
+        return data if expires > time.time() else None
+
+    def stats(self) -> dict[str, Any]:
+        tenants: dict[str, dict[str, Any]] = {}
+
+        def entry(tenant: str) -> dict[str, Any]:
+            return tenants.setdefault(tenant, {"pending": {}, "slots": 0, "wait": {}})
+
+        with self._lock:
+            for priority, by_tenant in self._pending.items():
+                for tenant, jobs in by_tenant.items():
+                    if jobs:
+                        entry(tenant)["pending"][priority] = len(jobs)
+            for tenant, running in self._running.items():
+                if running:
+                    entry(tenant)["slots"] = running
+            for (tenant, priority), (jobs, total, worst) in self._waits.items():
+                entry(tenant)["wait"][priority] = {
+                    "jobs": int(jobs),
+                    "avg_seconds": round(total / jobs, 2),
+                    "max_seconds": round(worst, 2),
+                }
+        return {
+            "backend": self.name,
+            "workers": self.workers,
+            "concurrency": settings.tenant_job_concurrency,
+            "tenants": tenants,
+        }
+
+    def _dispatch(self) -> None:
+        # Caller holds the lock. Admits while the pool has a free thread, so
+        # priority and round-robin order decide what runs next.
+        limit = max(1, settings.tenant_job_concurrency)
+        busy = sum(self._running.values())
+        for priority in PRIORITIES:
+            by_tenant = self._pending[priority]
+            tenants = sorted(tenant for tenant, jobs in by_tenant.items() if jobs)
+            if not tenants:
+                continue
+            self._cursor += 1
+            start = self._cursor % len(tenants)
+            active = tenants[start:] + tenants[:start]
+            while active and busy < self.workers:
+                still_active = []
+                for tenant in active:
+                    if busy >= self.workers:
+                        break
+                    jobs = by_tenant[tenant]
+                    if not jobs or self._running.get(tenant, 0) >= limit:
+                        continue
+                    job = jobs.popleft()
+                    self._running[tenant] = self._running.get(tenant, 0) + 1
+                    busy += 1
+                    self._executor.submit(self._run, job)
+                    still_active.append(tenant)
+                active = still_active
+            for tenant in tenants:
+                if not by_tenant[tenant]:
+                    del by_tenant[tenant]
+
+    def _run(self, job: LocalJob) -> None:
+        self._local.job = job
+        job.started_at = datetime.now(timezone.utc)
+        job.status = "started"
+        try:
+            job.result = job.func(*job.args, **job.kwargs)
+            job.status = "finished"
+        except Exception:
+            job.exc_string = traceback.format_exc()
+            job.status = "failed"
+            logger.exception("Local job {} failed", job.id)
+        finally:
+            job.ended_at = datetime.now(timezone.utc)
+            self._local.job = None
+            with self._lock:
+                self._running[job.tenant] -= 1
+                wait = (job.started_at - job.created_at).total_seconds()
+                jobs, total, worst = self._waits.get((job.tenant, job.priority), (0, 0.0, 0.0))
+                self._waits[(job.tenant, job.priority)] = [jobs + 1, total + wait, max(worst, wait)]
+                self._dispatch()
+
+    def _prune(self) -> None:
+        cutoff = time.time() - LOCAL_RESULT_TTL
+        expired = [
+            job_id for job_id, job in self._jobs.items()
+            if job.ended_at is not None and job.ended_at.timestamp() < cutoff
+        ]
+        for job_id in expired:
+            del self._jobs[job_id]
+        now = time.time()
+        for key in [key for key, (expires, _) in self._records.items() if expires <= now]:
+            del self._records[key]
+
+
+_backend: RQJobBackend | LocalJobBackend | None = None
+_backend_lock = threading.Lock()
+
+
+def job_backend() -> RQJobBackend | LocalJobBackend:
+    global _backend
+    with _backend_lock:
+        if _backend is None:
+            name = configured_job_backend()
+            if name == "local":
+                _backend = LocalJobBackend(settings.local_job_workers, settings.local_job_max_pending)
+            elif name == "rq":
+                _backend = RQJobBackend()
+            else:
+                raise ValueError(f"Unknown JOB_BACKEND: {name}")
+            logger.info("Job backend: {}", name)
+        return _backend
@@ -0,0 +1,23 @@
+"""Start method for the process pools the web process and jobs use."""
+from __future__ import annotations
+
+import multiprocessing
+from multiprocessing.context import BaseContext
+
+# Imported once by the fork server, so pool workers fork with them loaded.
+FORKSERVER_PRELOAD = ["app.core.hashing", "app.services.ingestion"]
+
+
+def pool_context() -> BaseContext:
+    """
+    ``forkserver`` (``spawn`` where it is unavailable) for ProcessPoolExecutor.
+    The pools are started from threads (gthread requests, the local job
+    backend); a plain fork copies the locks other threads hold at that moment
+    and the child can deadlock on them. The fork server is a single-threaded
+    process started once, so its children fork safely.
+    """
+    if "forkserver" not in multiprocessing.get_all_start_methods():
+        return multiprocessing.get_context("spawn")
+    context = multiprocessing.get_context("forkserver")
+    context.set_forkserver_preload(FORKSERVER_PRELOAD)
+    return context
@@ -1,6 +1,7 @@
 from redis import Redis
 from rq import Queue
 from .config import settings
+from .jobs import PRIORITIES
 
 redis_conn = Redis.from_url(
     settings.redis_url,
@@ -8,4 +9,10 @@ redis_conn = Redis.from_url(
     socket_connect_timeout=5,
     retry_on_timeout=True
 )
+# Jobs enqueued before the tenant scheduler (see scheduler.py); workers still drain it.
 queue = Queue('default', connection=redis_conn)
+# One queue per scheduling priority; workers listen on them in this order.
+priority_queues = {
+    name: Queue(name, connection=redis_conn)
+    for name in PRIORITIES
+}
@@ -0,0 +1,258 @@
+"""
+Tenant-aware job scheduling on top of RQ.
+
+Jobs are not pushed straight into an RQ queue. ``submit_job`` parks the job
+id in a per-tenant pending list (``sched:pending:<priority>:<tenant>``) and
+``dispatch`` admits jobs into the RQ queue of their priority, round-robin
+across tenants, while the tenant holds fewer than ``TENANT_JOB_CONCURRENCY``
+slots. A slot is a member of ``sched:slots:<tenant>`` (a sorted set scored by
+expiry) taken atomically with the pop of the pending job, and given back by
+the job's success/failure/stopped callbacks. Every submit and every finished
+job dispatches for all tenants. A work horse that is killed never runs the
+callbacks: ``app.worker`` calls ``reap_slots`` and ``dispatch`` in its
+periodic maintenance (``--maintenance-interval``), which gives back the slots
+of jobs no longer queued or running. ``SLOT_TTL_SECONDS`` is the last resort
+when no worker runs at all.
+
+With the default limit of 1 a tenant's ingestion jobs never run concurrently,
+and one school's 50-file import holds at most one job in the RQ queues while
+the other schools' uploads are admitted next to it.
+
+Priorities are separate RQ queues (``interactive``, ``bulk``, ``maintenance``);
+workers listen on them in that order. The slots are shared by all priorities:
+a tenant's maintenance job (risk retraining, account reconciliation) holds its
+slot like an upload does, so with the default limit an upload submitted while
+it runs waits for it. Pending interactive jobs are admitted first when the
+slot frees; nothing is preempted.
+"""
+from __future__ import annotations
+
+import time
+from typing import Any, Callable
+
+from loguru import logger
+from rq import Callback
+from rq.exceptions import NoSuchJobError
+from rq.job import Job, JobStatus
+
+from .config import settings
+from .jobs import PRIORITIES, job_tenant
+from .queue import priority_queues, redis_conn
+
+# A slot outlives the job timeout plus time spent in the RQ queue behind other
+# tenants; it only runs out when the callbacks never ran (work horse killed).
+SLOT_TTL_SECONDS = 2 * 3600
+
+# Statuses of a job that still holds its slot.
+_HOLDING_STATUSES = {JobStatus.QUEUED, JobStatus.STARTED, JobStatus.DEFERRED, JobStatus.SCHEDULED}
+
+# KEYS: slots, pending, tenants. ARGV: now, limit, expires, tenant.
+_ADMIT = redis_conn.register_script("""
+redis.call('ZREMRANGEBYSCORE', KEYS[1], '-inf', ARGV[1])
+if redis.call('ZCARD', KEYS[1]) >= tonumber(ARGV[2]) then
+    return false
+end
+local job_id = redis.call('LPOP', KEYS[2])
+if not job_id then
+    redis.call('SREM', KEYS[3], ARGV[4])
+    return false
+end
+redis.call('ZADD', KEYS[1], ARGV[3], job_id)
+return job_id
+""")
+
+# KEYS: wait hash. ARGV: seconds.
+_RECORD_WAIT = redis_conn.register_script("""
+redis.call('HINCRBY', KEYS[1], 'jobs', 1)
+redis.call('HINCRBYFLOAT', KEYS[1], 'total_seconds', ARGV[1])
+local max = tonumber(redis.call('HGET', KEYS[1], 'max_seconds') or '0')
+if tonumber(ARGV[1]) > max then
+    redis.call('HSET', KEYS[1], 'max_seconds', ARGV[1])
+end
+return 1
+""")
+
+
+def _tenant_key(tenant_id: int | None) -> str:
+    return job_tenant(tenant_id)
+
+
+def _pending_key(priority: str, tenant: str) -> str:
+    return f"sched:pending:{priority}:{tenant}"
+
+
+def _tenants_key(priority: str) -> str:
+    return f"sched:tenants:{priority}"
+
+
+def _slots_key(tenant: str) -> str:
+    return f"sched:slots:{tenant}"
+
+
+def _wait_key(tenant: str, priority: str) -> str:
+    return f"sched:wait:{tenant}:{priority}"
+
+
+def submit_job(
+    func: Callable[..., Any],
+    args: tuple = (),
+    kwargs: dict | None = None,
+    *,
+    tenant_id: int | None,
+    priority: str = "interactive",
+    job_timeout: int = 600,
+    meta: dict | None = None,
+) -> str:
+    """
+    Creates the RQ job ``func(*args, **kwargs)`` and schedules it for
+    ``tenant_id``; returns the job id. The job reports status ``queued``
+    while it waits for admission. Called through ``core.jobs.submit_job``.
+    """
+    tenant = _tenant_key(tenant_id)
+    job = Job.create(
+        func,
+        args=args,
+        kwargs=kwargs,
+        connection=redis_conn,
+        timeout=job_timeout,
+        status=JobStatus.QUEUED,
+        origin=priority,
+        meta={**(meta or {}), "tenant": tenant, "priority": priority},
+        on_success=Callback(_on_job_success),
+        on_failure=Callback(_on_job_failure),
+        on_stopped=Callback(_on_job_stopped),
+    )
+    job.save()
+    with redis_conn.pipeline() as pipe:
+        pipe.rpush(_pending_key(priority, tenant), job.id)
+        pipe.sadd(_tenants_key(priority), tenant)
+        pipe.execute()
+    dispatch()
+    return job.id
+
+
+def dispatch() -> int:
+    """
+    Admits pending jobs while their tenants have free slots, one job per
+    tenant per round, starting from a rotating tenant; higher priorities
+    first. Returns how many jobs were admitted.
+    """
+    admitted = 0
+    limit = max(1, settings.tenant_job_concurrency)
+    for priority in PRIORITIES:
+        tenants = sorted(member.decode() for member in redis_conn.smembers(_tenants_key(priority)))
+        if not tenants:
+            continue
+        start = redis_conn.incr(f"sched:cursor:{priority}") % len(tenants)
+        active = tenants[start:] + tenants[:start]
+        while active:
+            still_active = []
+            for tenant in active:
+                job_id = _admit(priority, tenant, limit)
+                if job_id is None:
+                    continue
+                _enqueue(priority, tenant, job_id)
+                admitted += 1
+                still_active.append(tenant)
+            active = still_active
+    return admitted
+
+
+def _admit(priority: str, tenant: str, limit: int) -> str | None:
+    now = time.time()
+    job_id = _ADMIT(
+        keys=[_slots_key(tenant), _pending_key(priority, tenant), _tenants_key(priority)],
+        args=[now, limit, now + SLOT_TTL_SECONDS, tenant],
+    )
+    return job_id.decode() if job_id else None
+
+
+def _enqueue(priority: str, tenant: str, job_id: str) -> None:
+    try:
+        job = Job.fetch(job_id, connection=redis_conn)
+    except NoSuchJobError:
+        # Deleted (or expired) while pending: give the slot back.
+        logger.warning("Scheduled job {} disappeared before admission", job_id)
+        redis_conn.zrem(_slots_key(tenant), job_id)
+        return
+    priority_queues[priority].enqueue_job(job)
+
+
+def _finish(job: Job) -> None:
+    tenant = job.meta.get("tenant")
+    priority = job.meta.get("priority", job.origin)
+    if tenant is None:
+        return
+    redis_conn.zrem(_slots_key(tenant), job.id)
+    if job.started_at and job.created_at:
+        wait = (job.started_at - job.created_at).total_seconds()
+        _RECORD_WAIT(keys=[_wait_key(tenant, priority)], args=[max(0.0, wait)])
+    dispatch()
+
+
+def reap_slots() -> int:
+    """
+    Gives back the slots of jobs that are gone or no longer queued/running
+    (their callbacks never ran); returns how many. Call ``dispatch`` after.
+    """
+    reaped = 0
+    for key in redis_conn.scan_iter(_slots_key("*")):
+        job_ids = [member.decode() for member in redis_conn.zrange(key, 0, -1)]
+        if not job_ids:
+            continue
+        jobs = Job.fetch_many(job_ids, connection=redis_conn)
+        stale = [
+            job_id for job_id, job in zip(job_ids, jobs)
+            if job is None or job.get_status(refresh=False) not in _HOLDING_STATUSES
+        ]
+        if stale:
+            logger.warning("Reaping {} scheduler slot(s) of {}: {}", len(stale), key.decode(), ", ".join(stale))
+            reaped += redis_conn.zrem(key, *stale)
+    return reaped
+
+
+# RQ callbacks: run in the work horse after the job, must be importable.
+def _on_job_success(job: Job, connection, result, *args, **kwargs) -> None:
+    _finish(job)
+
+
+def _on_job_failure(job: Job, connection, exc_type, exc_value, traceback) -> None:
+    _finish(job)
+
+
+def _on_job_stopped(job: Job, connection) -> None:
+    _finish(job)
+
+
+def scheduler_stats() -> dict[str, Any]:
+    """
+    Per tenant: pending jobs per priority, slots held (admitted or running)
+    and queue-wait times from submit to start.
+    """
+    tenants: dict[str, dict[str, Any]] = {}
+
+    def entry(tenant: str) -> dict[str, Any]:
+        return tenants.setdefault(tenant, {"pending": {}, "slots": 0, "wait": {}})
+
+    now = time.time()
+    for priority in PRIORITIES:
+        for key in redis_conn.scan_iter(_pending_key(priority, "*")):
+            tenant = key.decode().rsplit(":", 1)[1]
+            entry(tenant)["pending"][priority] = redis_conn.llen(key)
+    for key in redis_conn.scan_iter(_slots_key("*")):
+        tenant = key.decode().rsplit(":", 1)[1]
+        entry(tenant)["slots"] = redis_conn.zcount(key, now, "+inf")
+    for key in redis_conn.scan_iter(_wait_key("*", "*")):
+        _, _, tenant, priority = key.decode().split(":")
+        data = {k.decode(): float(v) for k, v in redis_conn.hgetall(key).items()}
+        jobs = int(data.get("jobs", 0))
+        entry(tenant)["wait"][priority] = {
+            "jobs": jobs,
+            "avg_seconds": round(data.get("total_seconds", 0.0) / jobs, 2) if jobs else 0.0,
+            "max_seconds": round(data.get("max_seconds", 0.0), 2),
+        }
+    return {
+        "concurrency": settings.tenant_job_concurrency,
+        "queued": {priority: len(queue) for priority, queue in priority_queues.items()},
+        "tenants": tenants,
+    }
@@ -1,22 +1,32 @@
 """Security helpers: password hashing and JWT setup."""
 from datetime import timedelta
+from typing import Sequence
 
 from flask_jwt_extended import JWTManager, create_access_token, create_refresh_token
-from passlib.context import CryptContext
 
 from .config import settings
+from .hashing import password_hasher
 
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 jwt = JWTManager()
 
 
 def hash_password(raw_password: str) -> str:
-    return pwd_context.hash(raw_password)
+    return password_hasher.hash(raw_password)
+
+
+def hash_passwords(raw_passwords: Sequence[str]) -> list[str]:
+    """Hashes many passwords at once, spread over the hashing pool (``PASSWORD_HASH_WORKERS``)."""
+    return password_hasher.hash_many(raw_passwords)
 
 
 def verify_password(raw_password: str, hashed_password: str) -> bool:
-    return pwd_context.verify(raw_password, hashed_password)
+    return password_hasher.verify(raw_password, hashed_password)
+
+
+def verify_and_update_password(raw_password: str, hashed_password: str) -> tuple[bool, str | None]:
+    """Like ``verify_password``; also returns a fresh hash when ``BCRYPT_ROUNDS`` changed."""
+    return password_hasher.verify_and_update(raw_password, hashed_password)
 
 
 def generate_tokens(identity: str, roles: list[str], extra_claims: dict[str, object] | None = None) -> dict[str, str]:
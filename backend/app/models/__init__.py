@@ -8,5 +8,6 @@ from .ocorrencia import Ocorrencia
 from .audit_log import AuditLog
 from .tenant import Tenant
 from .academic_year import AcademicYear
+from .risk_score import RiskScore
 
-__all__ = ["Aluno", "Nota", "Usuario", "Comunicado", "ComunicadoLeitura", "Ocorrencia", "AuditLog", "Tenant", "AcademicYear"]
+__all__ = ["Aluno", "Nota", "Usuario", "Comunicado", "ComunicadoLeitura", "Ocorrencia", "AuditLog", "Tenant", "AcademicYear", "RiskScore"]
@@ -1,5 +1,5 @@
 """Nota model."""
-from sqlalchemy import ForeignKey, Integer, Numeric, String
+from sqlalchemy import ForeignKey, Index, Integer, Numeric, String
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from ..core.database import Base
@@ -21,3 +21,9 @@ class Nota(Base, TenantYearMixin):
     situacao: Mapped[str | None] = mapped_column(String(20))
 
     aluno = relationship("Aluno", back_populates="notas")
+
+    __table_args__ = (
+        Index("ix_notas_aluno_id_academic_year_id", "aluno_id", "academic_year_id"),
+        # Conflict target of the bulk upsert in services.ingestion.
+        Index("uq_notas_aluno_disciplina_year", "aluno_id", "disciplina_normalizada", "academic_year_id", unique=True),
+    )
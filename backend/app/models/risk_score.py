@@ -0,0 +1,27 @@
+"""RiskScore model."""
+from datetime import datetime
+
+from sqlalchemy import DateTime, Float, ForeignKey, Index, String
+from sqlalchemy.orm import Mapped, mapped_column
+
+from ..core.database import Base
+from .base_mixin import TenantYearMixin
+
+
+class RiskScore(Base, TenantYearMixin):
+    """Precomputed risk probability of an aluno in a year (see services.risk_scores)."""
+
+    __tablename__ = "risk_scores"
+
+    id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
+    aluno_id: Mapped[int] = mapped_column(ForeignKey("alunos.id", ondelete="CASCADE"), nullable=False)
+    score: Mapped[float] = mapped_column(Float, nullable=False)
+    model_version: Mapped[str] = mapped_column(String(64), nullable=False)
+    computed_at: Mapped[datetime] = mapped_column(DateTime, nullable=False, default=datetime.utcnow)
+
+    __table_args__ = (
+        # Conflict target of the bulk upsert in services.risk_scores.
+        Index("uq_risk_scores_aluno_year", "aluno_id", "academic_year_id", unique=True),
+        # Listings and chat read the highest scores of a tenant/year.
+        Index("ix_risk_scores_tenant_year_score", "tenant_id", "academic_year_id", "score"),
+    )
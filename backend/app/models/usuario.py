@@ -1,5 +1,5 @@
 """Usuario model."""
-from sqlalchemy import Boolean, ForeignKey, String
+from sqlalchemy import Boolean, ForeignKey, Index, String, func
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from ..core.database import Base
@@ -27,3 +27,7 @@ class Usuario(Base):
     @property
     def tenant_name(self) -> str | None:
         return self.tenant.name if self.tenant else None
+
+
+# Sort key of the keyset-paginated /usuarios listing.
+Index("ix_usuarios_lower_username_id", func.lower(Usuario.username), Usuario.id)
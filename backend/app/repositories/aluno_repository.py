@@ -1,9 +1,14 @@
 from typing import List, Tuple, Optional
-from sqlalchemy import func, or_, select
+from sqlalchemy import Float, Row, cast, func, or_, select
 from sqlalchemy.orm import Session
 
 from app.models import Aluno, Nota
 from app.repositories.base import BaseRepository
+from app.repositories.risk_score_repository import stored_risk_score
+
+# Accepted ``sort`` values of the listing; "-" means descending. Missing
+# media / risk scores always sort last.
+LIST_SORTS = ("nome", "-nome", "media", "-media", "risk_score", "-risk_score")
 
 class AlunoRepository(BaseRepository[Aluno]):
     def __init__(self, session: Session):
@@ -15,15 +20,30 @@ class AlunoRepository(BaseRepository[Aluno]):
         per_page: int = 20,
         turno: Optional[str] = None,
         turma: Optional[str] = None,
-        query_text: Optional[str] = None
-    ) -> Tuple[List[Tuple[Aluno, float, int]], int]:
+        query_text: Optional[str] = None,
+        sort: str = "nome",
+        risk_min: Optional[float] = None,
+    ) -> Tuple[List[Row], int]:
         
         # Base query for count
         count_query = select(func.count(Aluno.id))
+
+        risk_score = stored_risk_score()
         
-        # Base query for data
+        # Base query for data: plain columns (no ORM entities) with numerics cast in SQL
+        # so rows can be serialized as-is.
         data_query = (
-            select(Aluno, func.avg(Nota.total).label("media"), func.sum(Nota.faltas).label("faltas"))
+            select(
+                Aluno.id,
+                Aluno.matricula,
+                Aluno.nome,
+                Aluno.turma,
+                Aluno.turno,
+                Aluno.status,
+                cast(func.avg(Nota.total), Float).label("media"),
+                func.coalesce(func.sum(Nota.faltas), 0).label("faltas"),
+                risk_score.label("risk_score"),
+            )
             .outerjoin(Nota)
             .group_by(Aluno.id)
         )
@@ -44,6 +64,8 @@ class AlunoRepository(BaseRepository[Aluno]):
                         Aluno.turma.ilike(like_term),
                     )
                 )
+            if risk_min is not None:
+                query = query.where(risk_score >= risk_min)
             return query
 
         # Execute count
@@ -52,9 +74,11 @@ class AlunoRepository(BaseRepository[Aluno]):
 
         # Execute data fetch
         final_data_query = apply_filters(data_query)
+        column = {"nome": Aluno.nome, "media": func.avg(Nota.total), "risk_score": risk_score}[sort.lstrip("-")]
+        order = column.desc() if sort.startswith("-") else column.asc()
         final_data_query = (
             final_data_query
-            .order_by(Aluno.nome)
+            .order_by(order.nulls_last(), Aluno.nome, Aluno.id)
             .offset((page - 1) * per_page)
             .limit(per_page)
         )
@@ -1,8 +1,8 @@
-from typing import List, Optional
-from sqlalchemy import select, desc
+from typing import Dict, List, Optional
+from sqlalchemy import Row, desc, false, func, select
 from sqlalchemy.orm import Session
 
-from app.models import Ocorrencia
+from app.models import Aluno, Ocorrencia, Usuario
 from app.repositories.base import BaseRepository
 
 class OcorrenciaRepository(BaseRepository[Ocorrencia]):
@@ -16,3 +16,33 @@ class OcorrenciaRepository(BaseRepository[Ocorrencia]):
             query = query.where(self.model.aluno_id == aluno_id)
             
         return self.session.execute(query).scalars().all()
+
+    def list_rows(self, aluno_id: Optional[int] = None) -> List[Row]:
+        """Same listing as ``list_filtered`` but as plain column rows with the aluno name joined."""
+        query = (
+            select(
+                Ocorrencia.id,
+                Ocorrencia.aluno_id,
+                Ocorrencia.autor_id,
+                Ocorrencia.tipo,
+                Ocorrencia.descricao,
+                # The model only maps ``data_registro``; ``resolvida`` is not mapped yet.
+                false().label("resolvida"),
+                Ocorrencia.data_registro.label("data_ocorrencia"),
+                Ocorrencia.data_registro.label("created_at"),
+                func.coalesce(Aluno.nome, "Desconhecido").label("aluno_nome"),
+            )
+            .outerjoin(Aluno, Ocorrencia.aluno_id == Aluno.id)
+            .order_by(desc(Ocorrencia.data_registro))
+        )
+        if aluno_id:
+            query = query.where(Ocorrencia.aluno_id == aluno_id)
+        return self.session.execute(query).all()
+
+    def get_autor_names(self, autor_ids: List[int]) -> Dict[int, str]:
+        if not autor_ids:
+            return {}
+        rows = self.session.execute(
+            select(Usuario.id, Usuario.username).where(Usuario.id.in_(autor_ids))
+        ).all()
+        return dict(rows)
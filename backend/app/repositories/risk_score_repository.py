@@ -0,0 +1,13 @@
+from sqlalchemy import select
+
+from app.models import Aluno, RiskScore
+
+
+def stored_risk_score():
+    """The aluno's stored score for its year, as a column for queries over ``Aluno`` (NULL until computed)."""
+    return (
+        select(RiskScore.score)
+        .where(RiskScore.aluno_id == Aluno.id, RiskScore.academic_year_id == Aluno.academic_year_id)
+        .correlate(Aluno)
+        .scalar_subquery()
+    )
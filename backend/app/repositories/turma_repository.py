@@ -1,5 +1,5 @@
 from typing import List, Tuple, Optional
-from sqlalchemy import func, distinct
+from sqlalchemy import Float, Row, and_, case, cast, distinct, func, select
 from sqlalchemy.orm import Session
 
 from app.models import Aluno, Nota
@@ -33,6 +33,7 @@ class TurmaRepository(BaseRepository[Aluno]):
         direct_match = (
             self.session.query(Aluno.turma)
             .filter(func.lower(Aluno.turma) == name_or_slug.lower())
+            .limit(1)
             .scalar()
         )
         if direct_match:
@@ -45,18 +46,65 @@ class TurmaRepository(BaseRepository[Aluno]):
                 return turma
         return None
 
-    def get_alunos_by_turma(self, turma_nome: str) -> List[Aluno]:
-        return (
-            self.session.query(Aluno)
-            .filter(Aluno.turma == turma_nome)
-            .order_by(Aluno.nome)
-            .all()
+    def get_detail_rows(
+        self,
+        turma_nome: str,
+        tenant_id: Optional[int] = None,
+        academic_year_id: Optional[int] = None,
+    ) -> List[Row]:
+        """
+        One round trip for the turma detail page: every aluno of the turma
+        left-joined to its notas, with the per-aluno average and situacao
+        computed by window functions over the same rows.
+
+        Tenant/year are filtered explicitly (``include_all_tenants``) because
+        the automatic ORM filter would put the Nota criteria in the WHERE
+        clause and drop alunos without notas from the outer join; the Nota
+        year goes in the ON clause instead.
+        """
+        total = cast(Nota.total, Float)
+        situacao = func.upper(Nota.situacao)
+        por_aluno = {"partition_by": Aluno.id}
+
+        def any_situacao(condition):
+            flag = case((and_(Nota.situacao.is_not(None), Nota.situacao != "", condition), 1), else_=0)
+            return func.max(flag).over(**por_aluno) == 1
+
+        situacao_aluno = case(
+            (any_situacao(situacao.in_(["REP", "REPROVADO"])), "REP"),
+            (any_situacao(situacao.not_in(["APR", "APROVADO", "ACC", "APCC", "AR"])), "REC"),
+            (any_situacao(situacao.in_(["ACC", "APCC"])), "APCC"),
+            (any_situacao(situacao == "AR"), "AR"),
+            else_="APR",
         )
 
-    def get_notas_for_alunos(self, aluno_ids: List[int]) -> List[Nota]:
-        return (
-            self.session.query(Nota)
-            .filter(Nota.aluno_id.in_(aluno_ids))
-            .order_by(Nota.aluno_id, Nota.disciplina)
-            .all()
+        stmt = (
+            select(
+                Aluno.id,
+                Aluno.nome,
+                Aluno.matricula,
+                Aluno.turma,
+                Aluno.turno,
+                cast(func.avg(Nota.total).over(**por_aluno), Float).label("media"),
+                situacao_aluno.label("situacao_aluno"),
+                Nota.id.label("nota_id"),
+                Nota.disciplina,
+                cast(Nota.trimestre1, Float).label("trimestre1"),
+                cast(Nota.trimestre2, Float).label("trimestre2"),
+                cast(Nota.trimestre3, Float).label("trimestre3"),
+                total.label("total"),
+                Nota.faltas,
+                Nota.situacao,
+            )
+            .where(Aluno.turma == turma_nome)
+            .order_by(Aluno.nome, Aluno.id, Nota.disciplina)
+            .execution_options(include_all_tenants=True)
         )
+        nota_join = Nota.aluno_id == Aluno.id
+        if tenant_id is not None:
+            stmt = stmt.where(Aluno.tenant_id == tenant_id)
+        if academic_year_id:
+            stmt = stmt.where(Aluno.academic_year_id == academic_year_id)
+            nota_join = and_(nota_join, Nota.academic_year_id == academic_year_id)
+        stmt = stmt.outerjoin(Nota, nota_join)
+        return self.session.execute(stmt).all()
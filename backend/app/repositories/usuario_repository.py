@@ -1,8 +1,8 @@
 from typing import List, Optional
-from sqlalchemy import select, or_, func
-from sqlalchemy.orm import Session, joinedload
+from sqlalchemy import Row, and_, select, or_, func
+from sqlalchemy.orm import Session
 
-from app.models import Usuario, Aluno
+from app.models import Usuario, Aluno, Tenant
 from app.repositories.base import BaseRepository
 
 class UsuarioRepository(BaseRepository[Usuario]):
@@ -20,41 +20,77 @@ class UsuarioRepository(BaseRepository[Usuario]):
             stmt = stmt.where(Usuario.id != exclude_id)
         return self.session.execute(stmt).first() is not None
 
-    def list_filtered(
-        self, 
-        skip: int = 0, 
-        limit: int = 20, 
-        query_text: Optional[str] = None, 
-        role: Optional[str] = None
-    ) -> tuple[List[Usuario], int]:
-        
-        # Build query
+    def list_page(
+        self,
+        limit: int = 20,
+        after: Optional[tuple[str, int]] = None,
+        skip: int = 0,
+        query_text: Optional[str] = None,
+        role: Optional[str] = None,
+        tenant_id: Optional[int] = None,
+    ) -> List[Row]:
+        """
+        Plain column rows (usuario + aluno + tenant name) ordered by
+        ``(lower(username), id)``. ``after`` is the sort key of the last row of
+        the previous page (keyset); ``skip`` is only used without it.
+        """
+        sort_key = func.lower(Usuario.username)
         stmt = (
-            select(Usuario)
-            .options(joinedload(Usuario.aluno))
-            .outerjoin(Aluno)
+            select(
+                Usuario.id,
+                Usuario.username,
+                Usuario.role,
+                Usuario.is_admin,
+                Usuario.aluno_id,
+                Usuario.photo_url,
+                Usuario.must_change_password,
+                Usuario.tenant_id,
+                Tenant.name.label("tenant_name"),
+                Aluno.nome.label("aluno_nome"),
+                Aluno.matricula.label("aluno_matricula"),
+                Aluno.turma.label("aluno_turma"),
+                Aluno.turno.label("aluno_turno"),
+                sort_key.label("sort_key"),
+            )
+            .outerjoin(Aluno, Usuario.aluno_id == Aluno.id)
+            .outerjoin(Tenant, Usuario.tenant_id == Tenant.id)
         )
-        
-        count_stmt = select(func.count(Usuario.id)).outerjoin(Aluno)
+        stmt = self._apply_filters(stmt, query_text, role, tenant_id)
+        if after is not None:
+            last_key, last_id = after
+            stmt = stmt.where(or_(sort_key > last_key, and_(sort_key == last_key, Usuario.id > last_id)))
+        elif skip:
+            stmt = stmt.offset(skip)
+        return self.session.execute(stmt.order_by(sort_key, Usuario.id).limit(limit)).all()
+
+    def count_filtered(
+        self,
+        query_text: Optional[str] = None,
+        role: Optional[str] = None,
+        tenant_id: Optional[int] = None,
+    ) -> int:
+        stmt = select(func.count(Usuario.id))
+        if query_text:
+            stmt = stmt.outerjoin(Aluno, Usuario.aluno_id == Aluno.id)
+        stmt = self._apply_filters(stmt, query_text, role, tenant_id)
+        return self.session.execute(stmt).scalar() or 0
 
+    @staticmethod
+    def _apply_filters(stmt, query_text: Optional[str], role: Optional[str], tenant_id: Optional[int]):
+        # Tenant is filtered explicitly: the session listener would also filter the
+        # outer-joined Aluno and drop every user without one.
+        stmt = stmt.execution_options(include_all_tenants=True)
+        if tenant_id is not None:
+            stmt = stmt.where(Usuario.tenant_id == tenant_id)
         if query_text:
             like = f"%{query_text}%"
-            filter_cond = or_(
-                Usuario.username.ilike(like),
-                Aluno.nome.ilike(like),
-                Aluno.matricula.ilike(like),
+            stmt = stmt.where(
+                or_(
+                    Usuario.username.ilike(like),
+                    Aluno.nome.ilike(like),
+                    Aluno.matricula.ilike(like),
+                )
             )
-            stmt = stmt.where(filter_cond)
-            count_stmt = count_stmt.where(filter_cond)
-
         if role:
             stmt = stmt.where(Usuario.role == role)
-            count_stmt = count_stmt.where(Usuario.role == role)
-
-        total = self.session.execute(count_stmt).scalar() or 0
-        
-        results = self.session.execute(
-            stmt.order_by(func.lower(Usuario.username)).offset(skip).limit(limit)
-        ).scalars().all()
-
-        return results, total
+        return stmt
@@ -29,6 +29,7 @@ class AlunoListSchema(AlunoBase):
     media: Optional[float] = None
     faltas: Optional[int] = None
     status: Optional[str] = None
+    risk_score: Optional[float] = None
 
 
 class AlunoDetailSchema(AlunoBase):
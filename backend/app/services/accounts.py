@@ -2,14 +2,18 @@
 from __future__ import annotations
 
 import re
+import time
+from typing import Sequence
 from unicodedata import normalize
 
 from loguru import logger
-from sqlalchemy import select
+from sqlalchemy import insert, select, update
 from sqlalchemy.orm import Session
 
-from ..core.security import hash_password
-from ..models import Aluno, Usuario
+from ..core.database import session_scope
+from ..core.security import hash_password, hash_passwords
+from ..models import AcademicYear, Aluno, Usuario
+from .usuario_service import invalidate_usuario_totals
 
 
 def _sanitize_first_name(full_name: str | None) -> str:
@@ -57,21 +61,151 @@ def ensure_aluno_user(session: Session, aluno: Aluno) -> Usuario:
     return usuario
 
 
-def ensure_all_aluno_users(session: Session) -> int:
-    """Provisiona contas para todos os alunos que ainda não possuem usuário."""
-    missing_stmt = (
-        select(Aluno)
-        .outerjoin(Usuario, Usuario.aluno_id == Aluno.id)
-        .where(Usuario.id.is_(None))
+def provision_aluno_users(
+    session: Session,
+    *,
+    tenant_id: int | None = None,
+    matriculas: Sequence[str] | None = None,
+) -> dict[str, int | float]:
+    """
+    Batched version of ``ensure_aluno_user``. Targets the given matriculas, or
+    every aluno without a linked user when ``matriculas`` is None. Usernames
+    are looked up in one query per chunk and the initial passwords are hashed
+    with ``hash_passwords`` before a single bulk insert. Nothing is committed
+    here: when ``created`` is non-zero the caller invalidates the usuario
+    totals (``invalidate_usuario_totals``) after its session commits.
+    """
+    started = time.perf_counter()
+    base = (
+        select(Aluno.id, Aluno.nome, Aluno.matricula, Aluno.tenant_id, AcademicYear.is_current)
+        .outerjoin(AcademicYear, AcademicYear.id == Aluno.academic_year_id)
+        .execution_options(include_all_tenants=True)
     )
-    alunos_sem_usuario = session.execute(missing_stmt).scalars().all()
-    if not alunos_sem_usuario:
+    if tenant_id is not None:
+        base = base.where(Aluno.tenant_id == tenant_id)
+    if matriculas is None:
+        alunos = session.execute(
+            base.outerjoin(Usuario, Usuario.aluno_id == Aluno.id).where(Usuario.id.is_(None))
+        ).all()
+    else:
+        alunos = []
+        for chunk in _chunks(list(matriculas)):
+            alunos.extend(session.execute(base.where(Aluno.matricula.in_(chunk))).all())
+
+    usernames = {aluno.id: build_aluno_username(aluno) for aluno in alunos}
+    by_username: dict[str, tuple[int, int | None]] = {}
+    linked: set[int] = set()
+    for chunk in _chunks(list(usernames.values())):
+        rows = session.execute(
+            select(Usuario.id, Usuario.username, Usuario.aluno_id)
+            .where(Usuario.username.in_(chunk))
+            .execution_options(include_all_tenants=True)
+        ).all()
+        by_username.update((row.username, (row.id, row.aluno_id)) for row in rows)
+    for chunk in _chunks(list(usernames)):
+        linked.update(session.execute(
+            select(Usuario.aluno_id)
+            .where(Usuario.aluno_id.in_(chunk))
+            .execution_options(include_all_tenants=True)
+        ).scalars())
+
+    relinks, pending = [], []
+    for aluno in alunos:
+        existing = by_username.get(usernames[aluno.id])
+        if existing is not None:
+            usuario_id, aluno_id = existing
+            # Same rule as ensure_aluno_user: the current year's aluno owns the login.
+            if aluno_id != aluno.id and aluno.is_current:
+                relinks.append({"id": usuario_id, "aluno_id": aluno.id})
+        elif aluno.id not in linked:
+            pending.append(aluno)
+
+    hashes = hash_passwords([aluno.matricula for aluno in pending])
+    if pending:
+        session.execute(insert(Usuario), [
+            {
+                "username": usernames[aluno.id],
+                "password_hash": password_hash,
+                "role": "aluno",
+                "aluno_id": aluno.id,
+                "tenant_id": aluno.tenant_id,
+                "must_change_password": True,
+            }
+            for aluno, password_hash in zip(pending, hashes)
+        ])
+    if relinks:
+        session.execute(update(Usuario), relinks)
+
+    elapsed = time.perf_counter() - started
+    if pending or relinks:
+        logger.info("Provisionadas {} contas de alunos ({} revinculadas) em {:.2f}s", len(pending), len(relinks), elapsed)
+    return {"created": len(pending), "linked": len(relinks), "seconds": round(elapsed, 3)}
+
+
+def reset_turma_passwords(
+    session: Session,
+    turma: str,
+    *,
+    tenant_id: int | None = None,
+    academic_year_id: int | None = None,
+) -> int:
+    """
+    Resets every aluno account of the turma back to the initial credential
+    (the matricula) and forces a password change; hashes go through the pool.
+    """
+    stmt = (
+        select(Usuario.id, Aluno.matricula)
+        .join(Aluno, Usuario.aluno_id == Aluno.id)
+        .where(Aluno.turma == turma, Usuario.role == "aluno")
+        .execution_options(include_all_tenants=True)
+    )
+    if tenant_id is not None:
+        stmt = stmt.where(Aluno.tenant_id == tenant_id)
+    if academic_year_id is not None:
+        stmt = stmt.where(Aluno.academic_year_id == academic_year_id)
+    rows = session.execute(stmt).all()
+    if not rows:
         return 0
 
-    created = 0
-    for aluno in alunos_sem_usuario:
-        ensure_aluno_user(session, aluno)
-        created += 1
+    hashes = hash_passwords([row.matricula for row in rows])
+    session.execute(update(Usuario), [
+        {"id": row.id, "password_hash": password_hash, "must_change_password": True}
+        for row, password_hash in zip(rows, hashes)
+    ])
+    logger.info("Senhas de {} alunos da turma {} redefinidas", len(rows), turma)
+    return len(rows)
+
+
+def ensure_all_aluno_users(session: Session, tenant_id: int | None = None) -> int:
+    """
+    Provisiona contas para todos os alunos que ainda não possuem usuário.
+    Após o commit, invalide os totais (``invalidate_usuario_totals``) se criou alguma.
+    """
+    return provision_aluno_users(session, tenant_id=tenant_id)["created"]
+
+
+def reconcile_aluno_users(tenant_id: int | None = None) -> dict[str, int | float]:
+    """RQ job: provisions every aluno of the tenant (all tenants when None) still without a user."""
+    with session_scope() as session:
+        result = provision_aluno_users(session, tenant_id=tenant_id)
+    if result["created"]:
+        invalidate_usuario_totals(tenant_id)
+    return result
+
+
+def enqueue_account_reconciliation(tenant_id: int | None) -> str | None:
+    """Schedules ``reconcile_aluno_users``; a queue outage only delays provisioning."""
+    from ..core.jobs import submit_job
+
+    try:
+        return submit_job(
+            reconcile_aluno_users, (tenant_id,), tenant_id=tenant_id, priority="maintenance", job_timeout=600
+        )
+    except Exception as exc:
+        logger.warning("Could not enqueue account reconciliation for tenant {}: {}", tenant_id, exc)
+        return None
+
 
-    logger.info("Provisionadas %s contas pendentes de alunos", created)
-    return created
+def _chunks(items: list, size: int = 500):
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
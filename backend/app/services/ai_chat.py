@@ -1,11 +1,18 @@
+import hashlib
+import json
 import re
+import threading
 from sqlalchemy import select, func, desc, case
 from sqlalchemy.orm import Session
 from ..models import Aluno, Nota, Comunicado, Ocorrencia
+from ..core.cache import cache_get, cache_set, data_version
 from ..core.database import SessionLocal
+from .intent_router import Intent, IntentRouter, Route
+from ..repositories.risk_score_repository import stored_risk_score
+from .risk_scores import HIGH_RISK, RISK_ALERT
 
 from loguru import logger
-from typing import TypedDict, List, Any, Optional
+from typing import Callable, NamedTuple, TypedDict, List, Any, Optional
 
 class AIResponse(TypedDict):
     text: str
@@ -13,26 +20,106 @@ class AIResponse(TypedDict):
     data: Optional[Any]
     chart_config: Optional[Any]
 
-class AIAnalystEngine:
+# Declaration order breaks score ties: the old routing order, except for
+# count_stats, last since "quantos/total" usually qualify another subject.
+INTENTS = (
+    Intent('chart_grades', ('grafico ... nota', 'compar ... media', 'desempenho ... turma', 'media ... disciplina', 'desempenho ... escola')),
+    Intent('risky_students', ('risco', 'reprovad', 'nota ... baix', 'vermelho', 'abaixo ... 50', 'perigo')),
+    Intent('report_faults', ('faltas', 'frequencia', 'ausencia', 'nao veio', 'infrequente', 'presenca')),
+    Intent('best_students', ('melhor ... aluno', 'maior ... nota', 'destaque', 'top ... aluno', 'medalha', 'excelencia')),
+    Intent('above_average', ('acima ... media',)),
+    Intent('below_average', ('abaixo ... media',)),
+    Intent('hardest_subjects', ('dificil', 'dificeis', 'complexa', 'pior ... nota', 'disciplina ... baix')),
+    Intent('status_stats', ('status', 'situacao', 'aprovad', 'recuperacao')),
+    Intent('notices', ('comunicado', 'aviso', 'mural', 'noticia', 'ultimas novidades')),
+    Intent('occurrences', ('ocorrencia', 'advertencia', 'elogio', 'comportamento', 'disciplinar')),
+    Intent('student_info', ('quem e', 'sobre o aluno', 'perfil de', 'perfil do', 'boletim do', 'situacao de', 'situacao do', 'dados de', 'dados do'), filters=('aluno_nome',)),
+    Intent('dropout_radar', (('abandon', 2), ('evasao', 2), 'desist', ('radar', 2))),
+    Intent('missing_grades', ('sem nota', 'faltando', 'incomplet', 'pendencia', 'nao lancad')),
+    Intent('evolution', ('melhorou', 'melhoraram', 'evolu', 'progresso', 'subiu', 'subiram', 'piorou', 'pioraram', 'queda', 'caiu', 'cairam')),
+    Intent('class_comparison', ('diferenca ... turma', 'ranking ... turma', 'turma ... melhor', 'turma ... pior', 'melhor turma', 'pior turma')),
+    Intent('count_stats', ('quantos', 'quantas', 'total', 'contar', 'numero de', 'quantidade')),
+)
+
+_FULL_TURMA_RE = re.compile(r'\b([1-9])\s*(?:º|O)?\s*ANO\s*([A-Z])\b')
+_COMPACT_TURMA_RE = re.compile(r'\b([1-9])\s*([A-Z])\b')
+_SERIE_RE = re.compile(r'([1-9])\s*ANO')
+_TRIMESTRE_RE = re.compile(r'([1-3])\s*(?:º|O)?\s*(?:TRIMESTRE|TRI)')
+_NAME_RE = re.compile(r'(?:DO ALUNO|SOBRE|QUEM [ÉE]|ALUNO)\s+([A-Z\s]{3,40})')
+_DECLINE_RE = re.compile(r'PIOR(?:OU|ARAM)|QUEDA|CA[IÍ](?:U|RAM)|REGREDI')
+
+# Answers are cached per (tenant, year, data version, intent, filters): a
+# write to the year's alunos/notas bumps the version, so old entries are
+# never read again and just expire. Stored risk scores change without a
+# bump; their refresh deletes the tenant's entries (services.risk_scores).
+CHAT_CACHE_TIMEOUT = 900
+# Filters _filter_alunos reads (turmas win over turno).
+SCOPE_FILTERS = ('turmas', 'turno')
+
+
+class _Handler(NamedTuple):
+    fn: Callable[[Session, dict], AIResponse]
+    # Filters the answer depends on: the cache key, so phrasings that only
+    # differ elsewhere share an entry.
+    filters: tuple[str, ...] = ()
+    # False when the answer reads data the version does not track.
+    cached: bool = True
+    # Scoped through _filter_alunos, which ignores turno when turmas are given.
+    turmas_override_turno: bool = True
+
+
+class ChatCacheStats:
+    """Hits/misses per intent, per process (like ``cache_stats``); ``bypass`` = not cacheable right now."""
+
     def __init__(self):
-        self.intent_patterns = {
-            'chart_grades': [r'gr[áa]fico.*not[as]', r'comparar.*m[ée]dia', r'desempenho.*turma', r'm[ée]dias.*disciplina', r'desempenho.*escola'],
-            'risky_students': [r'risco', r'reprovad', r'not[as].*baix[as]', r'vermelho', r'abaixo.*50', r'perigo'],
-            'best_students': [r'melhor.*aluno', r'maior.*not[as]', r'destaque', r'top.*aluno', r'medalha', r'excel[êe]ncia'],
-            'count_stats': [r'quantos', r'total', r'contar', r'n[úu]mero de', r'quantidade'],
-            'report_faults': [r'faltas', r'frequ[êe]ncia', r'aus[êe]ncias', r'n[ãa]o veio', r'infrequente', r'presen[çc]a'],
-            'notices': [r'comunicado', r'aviso', r'mural', r'not[íi]cia', r'[úu]ltimas novidades'],
-            'occurrences': [r'ocorr[êe]ncia', r'advert[êe]ncia', r'elogio', r'comportamento', r'disciplinar'],
-            'student_info': [r'quem [ée]', r'sobre o aluno', r'perfil de', r'boletim do', r'situa[çc][ãa]o de', r'dados de'],
-            'dropout_radar': [r'abandono', r'evas[ãa]o', r'desistir', r'radar'],
-            'evolution': [r'melhorou', r'evolu', r'progresso', r'subiu', r'piorou', r'queda'],
-            'missing_grades': [r'sem not[as]', r'faltando', r'incompleto', r'pend[êe]ncia'],
-            'class_comparison': [r'diferen[çc]a.*turma', r'ranking.*turma', r'turma.*melhor']
-        }
+        self._lock = threading.Lock()
+        self._counts: dict[str, dict[str, int]] = {}
+
+    def record(self, intent: str, outcome: str) -> None:
+        with self._lock:
+            counts = self._counts.setdefault(intent, {"hits": 0, "misses": 0, "bypass": 0})
+            counts[outcome] += 1
 
+    def stats(self) -> dict[str, dict[str, float]]:
+        with self._lock:
+            result = {}
+            for intent, counts in sorted(self._counts.items()):
+                lookups = counts["hits"] + counts["misses"]
+                result[intent] = {**counts, "hit_rate": round(counts["hits"] / lookups, 4) if lookups else 0.0}
+            return result
 
+    def reset(self) -> None:
+        with self._lock:
+            self._counts.clear()
 
 
+class AIAnalystEngine:
+    def __init__(self):
+        self.router = IntentRouter(INTENTS)
+        self.cache_stats = ChatCacheStats()
+        self.handlers = {
+            # Filters on turmas and turno together.
+            'chart_grades': _Handler(self._generate_grade_chart, ('trimestre', *SCOPE_FILTERS), turmas_override_turno=False),
+            'risky_students': _Handler(self._analyze_risk, SCOPE_FILTERS),
+            'count_stats': _Handler(self._analyze_stats),
+            'report_faults': _Handler(self._analyze_faults),
+            'best_students': _Handler(self._analyze_best_students, SCOPE_FILTERS),
+            'above_average': _Handler(lambda session, filters: self._analyze_performance(session, filters, above_avg=True), SCOPE_FILTERS),
+            'below_average': _Handler(lambda session, filters: self._analyze_performance(session, filters, above_avg=False), SCOPE_FILTERS),
+            'hardest_subjects': _Handler(self._analyze_hardest_subjects),
+            'status_stats': _Handler(self._analyze_status_stats, SCOPE_FILTERS),
+            # Comunicados and ocorrências do not bump the data version.
+            'notices': _Handler(self._analyze_comunicados, cached=False),
+            'occurrences': _Handler(self._analyze_ocorrencias, ('aluno_nome',), cached=False),
+            'student_info': _Handler(self._lookup_student, ('aluno_nome',)),
+            'dropout_radar': _Handler(self._analyze_dropout_radar, SCOPE_FILTERS),
+            'missing_grades': _Handler(self._analyze_missing_grades),
+            'evolution': _Handler(self._analyze_evolution, ('queda', *SCOPE_FILTERS)),
+            'class_comparison': _Handler(self._analyze_class_comparison, SCOPE_FILTERS),
+        }
+        missing = {intent.name for intent in INTENTS} - set(self.handlers)
+        if missing:
+            raise RuntimeError(f"Intents without a handler: {sorted(missing)}")
 
     def _extract_filters(self, message: str) -> dict:
         """Extracts filters like Class (Turma), Discipline, or Student Name from message."""
@@ -42,13 +129,11 @@ class AIAnalystEngine:
         # 1. Extract Turmas (e.g., "6A", "9º ANO D") - Support Multiple
         turmas_found = []
         # Pattern for "7º ANO B" or "7 ANO B"
-        full_matches = re.finditer(r'\b([1-9])\s*(?:º|O)?\s*ANO\s*([A-Z])\b', msg_upper)
-        for m in full_matches:
+        for m in _FULL_TURMA_RE.finditer(msg_upper):
             turmas_found.append(f"{m.group(1)}º ANO {m.group(2)}")
             
         # Pattern for "6A" or "9B"
-        compact_matches = re.finditer(r'\b([1-9])\s*([A-Z])\b', msg_upper)
-        for m in compact_matches:
+        for m in _COMPACT_TURMA_RE.finditer(msg_upper):
             val = f"{m.group(1)}º ANO {m.group(2)}"
             if val not in turmas_found:
                 turmas_found.append(val)
@@ -56,7 +141,7 @@ class AIAnalystEngine:
         if turmas_found:
             filters['turmas'] = turmas_found
         elif 'ANO' in msg_upper:
-            ano_match = re.search(r'([1-9])\s*ANO', msg_upper)
+            ano_match = _SERIE_RE.search(msg_upper)
             if ano_match:
                 filters['serie'] = ano_match.group(1)
         
@@ -66,82 +151,29 @@ class AIAnalystEngine:
         if 'NOTURNO' in msg_upper or 'NOITE' in msg_upper: filters['turno'] = 'Noturno'
 
         # 3. Extract Trimester
-        tri_match = re.search(r'([1-3])\s*(?:º|O)?\s*(?:TRIMESTRE|TRI)', msg_upper)
+        tri_match = _TRIMESTRE_RE.search(msg_upper)
         if tri_match:
             filters['trimestre'] = int(tri_match.group(1))
 
         # 4. Extract Student Name
-        name_match = re.search(r'(?:DO ALUNO|SOBRE|QUEM [ÉE]|ALUNO)\s+([A-Z\s]{3,40})', msg_upper)
+        name_match = _NAME_RE.search(msg_upper)
         if name_match:
             filters['aluno_nome'] = name_match.group(1).strip()
 
-        return filters
+        # 5. Direction of change ("who got worse")
+        if _DECLINE_RE.search(msg_upper):
+            filters['queda'] = True
 
+        return filters
 
+    def route(self, message: str) -> tuple[Route, dict]:
+        """Filters are extracted once and shared by routing and the handler."""
+        filters = self._extract_filters(message)
+        return self.router.route(message, filters), filters
 
-
-
-    def process_query(self, message: str) -> AIResponse:
-        session = SessionLocal()
-        message_lower = message.lower()
-        try:
-            filters = self._extract_filters(message)
-            
-            # 1. CHART INTENT: Grade Comparison
-            if any(re.search(p, message_lower) for p in self.intent_patterns['chart_grades']):
-                return self._generate_grade_chart(session, filters)
-
-            # 2. LIST INTENT: Risky Students
-            if any(re.search(p, message_lower) for p in self.intent_patterns['risky_students']):
-                return self._analyze_risk(session, filters)
-
-            # 3. STATS INTENT: Counts
-            if any(re.search(p, message_lower) for p in self.intent_patterns['count_stats']):
-                return self._analyze_stats(session, filters)
-
-            # 4. REPORT INTENT: Faults
-            if any(re.search(p, message_lower) for p in self.intent_patterns['report_faults']):
-                return self._analyze_faults(session, filters)
-
-            # 5. LIST INTENT: Best Students
-            if any(re.search(p, message_lower) for p in self.intent_patterns['best_students']):
-                return self._analyze_best_students(session, filters)
-
-            # 6. LIST INTENT: Above/Below Average (generic fallback for 'media')
-            if 'acima' in message_lower and 'm[ée]dia' in message_lower:
-                 return self._analyze_performance(session, filters, above_avg=True)
-            if 'abaixo' in message_lower and 'm[ée]dia' in message_lower:
-                 return self._analyze_performance(session, filters, above_avg=False)
-
-            # 7. CHART INTENT: Hardest Subjects
-            if any(re.search(p, message_lower) for p in [r'dif[íi]cil', r'complexa', r'pior.*not[as]', r'disciplina.*baix[as]']):
-                 return self._analyze_hardest_subjects(session, filters)
-
-            # 8. CHART INTENT: Status Distribution
-            if any(re.search(p, message_lower) for p in [r'status', r'situa[çc][ãa]o', r'aprovad', r'recupera[çc][ãa]o']):
-                 return self._analyze_status_stats(session, filters)
-
-
-            # 9. INFO INTENT: Notices
-            if any(re.search(p, message_lower) for p in self.intent_patterns['notices']):
-                return self._analyze_comunicados(session, filters)
-
-            # 10. INFO INTENT: Occurrences
-            if any(re.search(p, message_lower) for p in self.intent_patterns['occurrences']):
-                return self._analyze_ocorrencias(session, filters)
-
-            # 11. LOOKUP INTENT: Student details
-            if any(re.search(p, message_lower) for p in self.intent_patterns['student_info']) or filters.get('aluno_nome'):
-                return self._lookup_student(session, filters)
-
-            # 12. SPECIAL INTENT: Dropout Radar
-            if any(re.search(p, message_lower) for p in self.intent_patterns['dropout_radar']):
-                return self._analyze_dropout_radar(session, filters)
-
-            # 13. SPECIAL INTENT: Missing Grades
-            if any(re.search(p, message_lower) for p in self.intent_patterns['missing_grades']):
-                return self._analyze_missing_grades(session, filters)
-
+    def process_query(self, message: str, tenant_id: int | None = None, academic_year_id: int | None = None) -> AIResponse:
+        route, filters = self.route(message)
+        if route.intent is None:
             # Default conversational fallback
             return {
                 "text": "Sou o AI FreiRonaldo. Posso ajudar com:\n"
@@ -157,8 +189,54 @@ class AIAnalystEngine:
                 "chart_config": None
             }
 
+        logger.debug("Chat routed to {} (scores {})", route.intent, route.scores)
+        handler = self.handlers[route.intent]
+        cache_key = self._cache_key(route.intent, handler, filters, tenant_id, academic_year_id)
+        if cache_key is None:
+            self.cache_stats.record(route.intent, "bypass")
+        else:
+            cached = cache_get(cache_key)
+            if cached is not None:
+                self.cache_stats.record(route.intent, "hits")
+                return json.loads(cached)
+            self.cache_stats.record(route.intent, "misses")
+
+        session = SessionLocal()
+        try:
+            response = handler.fn(session, filters)
         finally:
             session.close()
+        if cache_key is not None:
+            cache_set(cache_key, json.dumps(response, default=str), timeout=CHAT_CACHE_TIMEOUT)
+        return response
+
+    @staticmethod
+    def _cache_key(intent: str, handler: _Handler, filters: dict, tenant_id: int | None, academic_year_id: int | None) -> str | None:
+        """None when the answer must not be cached (untracked data, no tenant or year, unknown data version)."""
+        # Without a year no write bumps data_version:<tenant>:None.
+        if not handler.cached or tenant_id is None or academic_year_id is None:
+            return None
+        version = data_version(tenant_id, academic_year_id)
+        if version is None:
+            return None
+        relevant = {}
+        for key in handler.filters:
+            value = filters.get(key)
+            if value:
+                relevant[key] = sorted(set(value)) if key == 'turmas' else value
+        if handler.turmas_override_turno and 'turmas' in relevant:
+            relevant.pop('turno', None)
+        digest = hashlib.sha1(json.dumps(relevant, sort_keys=True).encode()).hexdigest()[:16]
+        return f"chat:{tenant_id}:{academic_year_id}:v{version}:{intent}:{digest}"
+
+    @staticmethod
+    def _filter_alunos(query, filters: dict):
+        """Applies the extracted turma(s) / turno filters to a query over ``Aluno``."""
+        if filters.get('turmas'):
+            query = query.where(Aluno.turma.in_(filters['turmas']))
+        elif filters.get('turno'):
+            query = query.where(Aluno.turno == filters['turno'])
+        return query
 
     def _generate_grade_chart(self, session: Session, filters: dict) -> AIResponse:
         """Generates a dataset for a chart comparing grades."""
@@ -200,18 +278,16 @@ class AIAnalystEngine:
 
 
     def _analyze_risk(self, session: Session, filters: dict) -> AIResponse:
-        """List students at risk."""
-        query = select(Aluno.nome, Aluno.turma, func.avg(Nota.total).label('media'))\
+        """List students at risk, by their stored risk score (see services.risk_scores)."""
+        risk_score = stored_risk_score()
+        query = select(Aluno.nome, Aluno.turma, func.avg(Nota.total).label('media'), risk_score.label('risco'))\
             .join(Nota)\
+            .where(risk_score >= RISK_ALERT)\
             .group_by(Aluno.id)\
-            .having(func.avg(Nota.total) < 50)\
-            .order_by("media")\
+            .order_by(desc('risco'))\
             .limit(10)
         
-        if filters.get('turmas'):
-            query = query.where(Aluno.turma.in_(filters['turmas']))
-        elif filters.get('turno'):
-            query = query.where(Aluno.turno == filters['turno'])
+        query = self._filter_alunos(query, filters)
 
 
         results = session.execute(query).all()
@@ -219,11 +295,14 @@ class AIAnalystEngine:
         if not results:
              return {"text": "Não encontrei alunos em risco crítico com os filtros atuais.", "type": "text", "data": None, "chart_config": None}
 
-        table_data = [{"Aluno": r.nome, "Turma": r.turma, "Média": round(r.media, 1)} for r in results]
+        table_data = [
+            {"Aluno": r.nome, "Turma": r.turma, "Média": round(float(r.media or 0), 1), "Risco": f"{r.risco:.0%}"}
+            for r in results
+        ]
 
         return {
             # Dynamic text generation based on data
-            "text": f"Encontrei {len(results)} alunos com desempenho abaixo do esperado (Média < 60). A situação mais crítica é de {results[0].nome}.",
+            "text": f"Encontrei {len(results)} alunos com risco de reprovação acima de {RISK_ALERT:.0%}. A situação mais crítica é de {results[0].nome}.",
             "type": "table",
             "data": table_data,
             "chart_config": None
@@ -270,8 +349,7 @@ class AIAnalystEngine:
             .order_by(desc('media'))\
             .limit(5)
         
-        if filters.get('turma'):
-             query = query.where(Aluno.turma == filters['turma'])
+        query = self._filter_alunos(query, filters)
 
         results = session.execute(query).all()
         data = [{"Aluno": r.nome, "Turma": r.turma, "Média": round(r.media, 1)} for r in results]
@@ -298,8 +376,7 @@ class AIAnalystEngine:
             .order_by(desc('media') if above_avg else 'media')\
             .limit(10)
 
-        if filters.get('turma'):
-             query = query.where(Aluno.turma == filters['turma'])
+        query = self._filter_alunos(query, filters)
 
         results = session.execute(query).all()
         
@@ -344,8 +421,8 @@ class AIAnalystEngine:
             .where(Nota.situacao != None)\
             .group_by(Nota.situacao)
         
-        if filters.get('turma'):
-            query = query.join(Aluno).where(Aluno.turma == filters['turma'])
+        if filters.get('turmas') or filters.get('turno'):
+            query = self._filter_alunos(query.join(Aluno), filters)
             
         results = session.execute(query).all()
         data = [{"name": r.situacao, "value": r[1]} for r in results if r.situacao]
@@ -438,30 +515,83 @@ class AIAnalystEngine:
         }
 
     def _analyze_dropout_radar(self, session: Session, filters: dict) -> AIResponse:
-        """Identify students at high risk based on multi-factor analysis (grades + attendance)."""
-        # Criteria: Media < 50 AND Faltas > 10
-        # This is a simplified version of the Radar de Abandono
-        query = select(Aluno.nome, Aluno.turma, func.avg(Nota.total).label('media'), func.sum(Nota.faltas).label('faltas'))\
+        """Identify students at high risk (stored score, which weighs grades + attendance), most absent first."""
+        risk_score = stored_risk_score()
+        query = select(Aluno.nome, Aluno.turma, func.sum(Nota.faltas).label('faltas'), risk_score.label('risco'))\
             .join(Nota)\
+            .where(risk_score >= HIGH_RISK)\
             .group_by(Aluno.id)\
-            .having(func.avg(Nota.total) < 50)\
-            .having(func.sum(Nota.faltas) > 10)\
             .order_by(desc('faltas'))\
             .limit(10)
 
+        query = self._filter_alunos(query, filters)
+
         results = session.execute(query).all()
         
         if not results:
             return {"text": "Excelente notícia! O radar não detectou alunos em risco iminente de abandono com os critérios atuais.", "type": "text", "data": None}
             
-        data = [{"Aluno": r.nome, "Turma": r.turma, "Risco": "Crítico", "Faltas": r.faltas} for r in results]
+        data = [{"Aluno": r.nome, "Turma": r.turma, "Risco": f"{r.risco:.0%}", "Faltas": r.faltas} for r in results]
         return {
-            "text": f"⚠️ **Alerta de Abandono**: Identifiquei {len(results)} alunos com alta taxa de infrequência e baixas notas. Recomendo intervenção imediata.",
+            "text": f"⚠️ **Alerta de Abandono**: Identifiquei {len(results)} alunos com risco acima de {HIGH_RISK:.0%}, considerando notas, faltas e ocorrências. Recomendo intervenção imediata.",
             "type": "table",
             "data": data,
             "chart_config": None
         }
 
+    def _analyze_evolution(self, session: Session, filters: dict) -> AIResponse:
+        """Students whose average changed most from the 1st to the latest trimester."""
+        inicio = func.avg(Nota.trimestre1)
+        atual = func.avg(func.coalesce(Nota.trimestre3, Nota.trimestre2))
+        variacao = (atual - inicio).label('variacao')
+        queda = filters.get('queda', False)
+        query = select(Aluno.nome, Aluno.turma, inicio.label('inicio'), atual.label('atual'), variacao)\
+            .join(Nota)\
+            .where(Nota.trimestre1.isnot(None), func.coalesce(Nota.trimestre3, Nota.trimestre2).isnot(None))\
+            .group_by(Aluno.id)\
+            .having(variacao < 0 if queda else variacao > 0)\
+            .order_by(variacao if queda else desc(variacao))\
+            .limit(10)
+        query = self._filter_alunos(query, filters)
+
+        results = session.execute(query).all()
+        direction = "queda" if queda else "melhora"
+        if not results:
+            return {"text": f"Não encontrei alunos com {direction} de média entre o 1º trimestre e o mais recente.", "type": "text", "data": None, "chart_config": None}
+
+        data = [
+            {"Aluno": r.nome, "Turma": r.turma, "1º Tri": round(float(r.inicio), 1), "Atual": round(float(r.atual), 1), "Variação": f"{float(r.variacao):+.1f}"}
+            for r in results
+        ]
+        return {
+            "text": f"Alunos com maior {direction} de média entre o 1º trimestre e o mais recente:",
+            "type": "table",
+            "data": data,
+            "chart_config": None
+        }
+
+    def _analyze_class_comparison(self, session: Session, filters: dict) -> AIResponse:
+        """Ranks turmas by grade average."""
+        query = select(Aluno.turma, Aluno.turno, func.avg(Nota.total).label('media'), func.count(func.distinct(Aluno.id)).label('alunos'))\
+            .join(Nota)\
+            .group_by(Aluno.turma, Aluno.turno)\
+            .order_by(desc('media'))
+        query = self._filter_alunos(query, filters)
+
+        results = [r for r in session.execute(query).all() if r.media is not None]
+        if not results:
+            return {"text": "Não há notas suficientes para comparar as turmas.", "type": "text", "data": None, "chart_config": None}
+
+        data = [
+            {"Posição": i, "Turma": r.turma, "Turno": r.turno, "Média": round(float(r.media), 1), "Alunos": r.alunos}
+            for i, r in enumerate(results, start=1)
+        ]
+        best, worst = results[0], results[-1]
+        text = f"Ranking de {len(results)} turmas por média. {best.turma} lidera com {float(best.media):.1f}"
+        if len(results) > 1:
+            text += f"; {worst.turma} tem a menor média ({float(worst.media):.1f}), {float(best.media) - float(worst.media):.1f} pontos abaixo."
+        return {"text": text, "type": "table", "data": data, "chart_config": None}
+
     def _analyze_missing_grades(self, session: Session, filters: dict) -> AIResponse:
         """Find students who have disciplinas without grades."""
         # Simple count of students who have NO grades at all or incomplete ones
@@ -486,5 +616,5 @@ class AIAnalystEngine:
 # Singleton instance
 ai_engine = AIAnalystEngine()
 
-def process_chat_message(message: str) -> dict:
-    return ai_engine.process_query(message)
+def process_chat_message(message: str, tenant_id: int | None = None, academic_year_id: int | None = None) -> dict:
+    return ai_engine.process_query(message, tenant_id, academic_year_id)
@@ -1,112 +1,271 @@
-import pandas as pd
-from sklearn.linear_model import LogisticRegression
-from sqlalchemy import select
+"""
+Risk model features, training and scoring.
+
+Scoring (``score_alunos``) only needs NumPy: models are stored as
+``LinearRiskModel`` coefficients. sklearn is imported inside
+``train_risk_model``, which runs as a worker job, so web processes never
+load it.
+"""
+import numpy as np
+from sqlalchemy import case, func, select
 from loguru import logger
-import pickle
-from pathlib import Path
-from ..models import Aluno, Nota
+import hashlib
+import json
+import threading
+import time
+from typing import Iterable
+from ..models import Aluno, Nota, Ocorrencia
+from ..core.cache import cache_delete, cache_get, cache_set
 from ..core.database import SessionLocal
+from .risk_models import LinearRiskModel, models, save_model, scope_name
+
+FEATURES = ["mean_score", "low_grades", "faltas", "ocorrencias"]
+LOW_GRADE = 60
+# Stored with every model: scoring ignores models built on other features.
+FEATURE_SCHEMA = hashlib.sha256(json.dumps({"features": FEATURES, "low_grade": LOW_GRADE}).encode()).hexdigest()[:16]
+# A requested training is not requested again for this long (unless it starts).
+TRAINING_REQUEST_TTL = 3600
+# Aluno ids per IN (...) in feature extraction.
+FEATURE_CHUNK_SIZE = 500
+# Rows fetched per round trip while streaming the training matrix.
+TRAINING_BATCH_SIZE = 5000
+
+
+# Requested trainings per scope (monotonic deadline), besides the shared cache marker.
+_training_requested: dict[str, float] = {}
+_training_lock = threading.Lock()
+
+
+def _feature_statement(aluno_ids: list[int] | None = None, tenant_id: int | None = None):
+    """
+    ``(aluno_id, *FEATURES)`` per aluno: notas and ocorrências are aggregated
+    in grouped subqueries and outer-joined, so alunos without either get
+    zeros. Missing totals count as 0.
+    """
+    score = func.coalesce(Nota.total, 0)
+    notas = select(
+        Nota.aluno_id.label("aluno_id"),
+        func.avg(score).label("mean_score"),
+        func.sum(case((score < LOW_GRADE, 1), else_=0)).label("low_grades"),
+        func.sum(func.coalesce(Nota.faltas, 0)).label("faltas"),
+    ).group_by(Nota.aluno_id)
+    ocorrencias = select(
+        Ocorrencia.aluno_id.label("aluno_id"),
+        func.count().label("ocorrencias"),
+    ).group_by(Ocorrencia.aluno_id)
+    alunos = select(Aluno.id)
+    if aluno_ids is not None:
+        notas = notas.where(Nota.aluno_id.in_(aluno_ids))
+        ocorrencias = ocorrencias.where(Ocorrencia.aluno_id.in_(aluno_ids))
+        alunos = alunos.where(Aluno.id.in_(aluno_ids))
+    if tenant_id is not None:
+        notas = notas.where(Nota.tenant_id == tenant_id)
+        ocorrencias = ocorrencias.where(Ocorrencia.tenant_id == tenant_id)
+        alunos = alunos.where(Aluno.tenant_id == tenant_id)
+    notas = notas.subquery()
+    ocorrencias = ocorrencias.subquery()
+    return (
+        alunos.add_columns(
+            func.coalesce(notas.c.mean_score, 0),
+            func.coalesce(notas.c.low_grades, 0),
+            func.coalesce(notas.c.faltas, 0),
+            func.coalesce(ocorrencias.c.ocorrencias, 0),
+        )
+        .outerjoin(notas, notas.c.aluno_id == Aluno.id)
+        .outerjoin(ocorrencias, ocorrencias.c.aluno_id == Aluno.id)
+        .order_by(Aluno.id)
+    )
 
-MODEL_PATH = Path(__file__).resolve().parents[3] / "data" / "risk_model.pkl"
 
-def train_risk_model():
+def load_training_matrix(session, tenant_id: int | None = None) -> tuple[np.ndarray, np.ndarray]:
+    """
+    ``(aluno_ids, X)`` for every aluno (of the tenant, when given), with X in
+    ``FEATURES`` order. One count plus one grouped query, streamed in
+    ``TRAINING_BATCH_SIZE`` partitions straight into preallocated arrays.
+    """
+    count = select(func.count()).select_from(Aluno)
+    if tenant_id is not None:
+        count = count.where(Aluno.tenant_id == tenant_id)
+    n = session.execute(count).scalar_one()
+    ids = np.empty(n, dtype=np.int64)
+    X = np.empty((n, len(FEATURES)), dtype=np.float64)
+
+    filled = 0
+    result = session.execute(
+        _feature_statement(tenant_id=tenant_id).execution_options(yield_per=TRAINING_BATCH_SIZE)
+    )
+    for rows in result.partitions():
+        # Alunos inserted after the count are left for the next training.
+        rows = rows[:n - filled]
+        if not rows:
+            break
+        block = np.asarray(rows, dtype=np.float64)
+        ids[filled:filled + len(rows)] = block[:, 0]
+        X[filled:filled + len(rows)] = block[:, 1:]
+        filled += len(rows)
+    result.close()
+    return ids[:filled], X[:filled]
+
+
+def risk_labels(X: np.ndarray) -> np.ndarray:
+    """Heuristic target: 2+ low grades or more than 15 faltas means risk."""
+    low_grades = X[:, FEATURES.index("low_grades")]
+    faltas = X[:, FEATURES.index("faltas")]
+    return ((low_grades >= 2) | (faltas > 15)).astype(np.int8)
+
+
+def train_risk_model(tenant_id: int | None = None, refresh_scores: bool = True) -> dict | None:
     """
     Trains a simple logistic regression model to predict failure risk.
     Since we lack historical data, we use current data with heuristic labelling as a 'bootstrap'.
+    Runs as a job (see ``request_training``). The model is stored as a new,
+    active version for the tenant (every tenant's data and the ``global``
+    scope when None) and the tenant's stored risk scores are recomputed
+    with it; returns its metadata.
     """
+    from sklearn.linear_model import LogisticRegression
+
+    _clear_training_request(tenant_id)
+    started = time.perf_counter()
     session = SessionLocal()
     try:
-        # 1. Fetch Data
-        stm = select(Aluno)
-        alunos = session.execute(stm).scalars().all()
-        
-        data = []
-        for aluno in alunos:
-            # Aggregate grades
-            total_score = 0
-            low_grades_count = 0
-            faltas = 0
-            
-            for nota in aluno.notas:
-                # Use total or estimate based on trimesters
-                score = float(nota.total or 0)
-                if score < 60:
-                    low_grades_count += 1
-                total_score += score
-                faltas += (nota.faltas or 0)
-            
-            # Heuristic Target: If > 2 low grades OR > 15 faltas -> Risk
-            is_risk = 1 if (low_grades_count >= 2 or faltas > 15) else 0
-            
-            data.append({
-                "mean_score": total_score / len(aluno.notas) if aluno.notas else 0,
-                "low_grades": low_grades_count,
-                "faltas": faltas,
-                "target": is_risk
-            })
-            
-        if not data:
-            logger.warning("No data to train model.")
-            return
-            
-        df = pd.DataFrame(data)
-        
-        # 2. Train Model
-        X = df[["mean_score", "low_grades", "faltas"]]
-        y = df["target"]
-        
+        _, X = load_training_matrix(session, tenant_id)
+        y = risk_labels(X)
+
+        if len(X) == 0 or len(np.unique(y)) < 2:
+            logger.warning("Not enough data to train risk model for {} ({} alunos).", scope_name(tenant_id), len(X))
+            return None
+
         model = LogisticRegression()
         model.fit(X, y)
-        
-        # 3. Save
-        with open(MODEL_PATH, "wb") as f:
-            pickle.dump(model, f)
-            
-        logger.info(f"Risk model trained on {len(df)} records. Accuracy: {model.score(X, y):.2f}")
-        
+        accuracy = float(model.score(X, y))
+        seconds = round(time.perf_counter() - started, 3)
+
+        meta = save_model(tenant_id, LinearRiskModel.from_estimator(model, FEATURES), {
+            "alunos": len(X),
+            "positives": int(y.sum()),
+            "accuracy": round(accuracy, 4),
+            "seconds": seconds,
+            "features": FEATURES,
+            "feature_schema": FEATURE_SCHEMA,
+        })
+        logger.info(f"Risk model trained on {len(X)} records in {seconds}s. Accuracy: {accuracy:.2f}")
     finally:
         session.close()
 
-def predict_risk(aluno_id: int) -> float:
+    if refresh_scores and tenant_id is not None:
+        from .risk_scores import refresh_risk_scores
+
+        refresh_risk_scores(tenant_id)
+    return meta
+
+
+def enqueue_risk_training(tenant_id: int | None = None) -> str | None:
+    """Schedules ``train_risk_model`` at maintenance priority; None when the queue is unreachable."""
+    from ..core.jobs import submit_job
+
+    try:
+        return submit_job(train_risk_model, (tenant_id,), tenant_id=tenant_id, priority="maintenance", job_timeout=1800)
+    except Exception as exc:
+        logger.warning("Could not enqueue risk model training: {}", exc)
+        return None
+
+
+def _training_marker(tenant_id: int | None) -> str:
+    return f"risk_model:training_requested:{scope_name(tenant_id)}"
+
+
+def _clear_training_request(tenant_id: int | None) -> None:
+    with _training_lock:
+        _training_requested.pop(scope_name(tenant_id), None)
+    cache_delete(_training_marker(tenant_id))
+
+
+def request_training(tenant_id: int | None = None) -> str | None:
     """
-    Returns probability of risk (0.0 to 1.0) for a given student.
+    Schedules ``train_risk_model`` for the tenant unless a training is already
+    pending (in this process or, through the cache, any other); returns the job id.
+    """
+    scope = scope_name(tenant_id)
+    now = time.monotonic()
+    with _training_lock:
+        if _training_requested.get(scope, 0) > now or cache_get(_training_marker(tenant_id)) is not None:
+            return None
+        _training_requested[scope] = now + TRAINING_REQUEST_TTL
+    job_id = enqueue_risk_training(tenant_id)
+    if job_id is None:
+        with _training_lock:
+            _training_requested.pop(scope, None)
+        return None
+    cache_set(_training_marker(tenant_id), job_id, timeout=TRAINING_REQUEST_TTL)
+    logger.info("Risk model training scheduled for {} (job {})", scope, job_id)
+    return job_id
+
+
+def _active_model(tenant_id: int | None) -> tuple[LinearRiskModel, dict] | None:
+    """
+    ``(model, meta)`` of the tenant's active model, else of the global one.
+    Training is requested when the tenant's model is missing or was built on
+    other features.
+    """
+    for scope in dict.fromkeys((tenant_id, None)):
+        loaded = models.get(scope)
+        if loaded is not None and loaded[1].get("feature_schema") == FEATURE_SCHEMA and loaded[0].features == FEATURES:
+            if scope != tenant_id:
+                request_training(tenant_id)
+            return loaded
+    request_training(tenant_id)
+    return None
+
+
+def extract_features(session, aluno_ids: Iterable[int]) -> dict[int, tuple[float, ...]]:
+    """
+    ``FEATURES`` per aluno from one grouped query per chunk of ids (the same
+    statement training uses). Unknown ids get zeros.
+    """
+    ids = list(dict.fromkeys(aluno_ids))
+    features = {aluno_id: (0.0,) * len(FEATURES) for aluno_id in ids}
+    for start in range(0, len(ids), FEATURE_CHUNK_SIZE):
+        stm = _feature_statement(ids[start:start + FEATURE_CHUNK_SIZE])
+        for aluno_id, *values in session.execute(stm):
+            features[aluno_id] = tuple(float(value) for value in values)
+    return features
+
+
+def score_alunos(aluno_ids: Iterable[int], tenant_id: int | None = None) -> tuple[dict[int, float], str | None]:
     """
-    if not MODEL_PATH.exists():
-        logger.info("Model not found, training new one...")
-        train_risk_model()
-        
+    Probability of risk (0.0 to 1.0) per aluno with the tenant's model (from
+    memory), and that model's version: features from one aggregate query,
+    one NumPy dot product. Empty when no model is available yet
+    (training is scheduled in the background, never run here).
+    """
+    ids = list(dict.fromkeys(aluno_ids))
+    if not ids:
+        return {}, None
+    loaded = _active_model(tenant_id)
+    if loaded is None:
+        return {}, None
+    model, meta = loaded
+
     try:
-        with open(MODEL_PATH, "rb") as f:
-            model = pickle.load(f)
-            
-        session = SessionLocal()
-        aluno = session.get(Aluno, aluno_id)
-        if not aluno:
-            return 0.0
-            
-        # Extract features
-        total_score = 0
-        low_grades_count = 0
-        faltas = 0
-        for nota in aluno.notas:
-            score = float(nota.total or 0)
-            if score < 60:
-                low_grades_count += 1
-            total_score += score
-            faltas += (nota.faltas or 0)
-            
-        features = pd.DataFrame([{
-            "mean_score": total_score / len(aluno.notas) if aluno.notas else 0,
-            "low_grades": low_grades_count,
-            "faltas": faltas
-        }])
-        
-        # Predict probability of class 1 (Risk)
-        risk_prob = model.predict_proba(features)[0][1]
-        return float(risk_prob)
-        
+        with SessionLocal() as session:
+            features = extract_features(session, ids)
+        X = np.array([features[aluno_id] for aluno_id in ids], dtype=np.float64)
+        # Probability of class 1 (Risk)
+        probabilities = model.predict_proba(X)
+        return {aluno_id: float(p) for aluno_id, p in zip(ids, probabilities)}, meta.get("version")
     except Exception as e:
         logger.error(f"Prediction failed: {e}")
-        return 0.0
-    finally:
-        session.close()
+        return {}, None
+
+
+def predict_risk_batch(aluno_ids: Iterable[int], tenant_id: int | None = None) -> dict[int, float]:
+    """Scores only, see ``score_alunos``."""
+    return score_alunos(aluno_ids, tenant_id)[0]
+
+
+def predict_risk(aluno_id: int, tenant_id: int | None = None) -> float:
+    """
+    Returns probability of risk (0.0 to 1.0) for a given student.
+    """
+    return predict_risk_batch([aluno_id], tenant_id).get(aluno_id, 0.0)
@@ -3,11 +3,12 @@ from sqlalchemy.orm import Session
 from math import ceil
 
 from app.repositories.aluno_repository import AlunoRepository
+from app.core.cache import bump_data_version
+from app.services.accounts import enqueue_account_reconciliation
 from app.services.audit import log_action
+from app.services.turma_service import invalidate_turma_cache
 from app.schemas.aluno import (
-    AlunoPaginatedResponse, 
     AlunoListSchema, 
-    PaginationMeta,
     AlunoDetailSchema,
     NotaSchema
 )
@@ -23,42 +24,35 @@ class AlunoService:
         per_page: int,
         turno: Optional[str] = None,
         turma: Optional[str] = None,
-        query_text: Optional[str] = None
-    ) -> AlunoPaginatedResponse:
-        
-        results, total = self.repository.get_paginated_with_average(
+        query_text: Optional[str] = None,
+        sort: str = "nome",
+        risk_min: Optional[float] = None,
+    ) -> dict:
+        """
+        Returns the paginated listing as plain dicts ready for jsonify.
+        Rows come straight from SQL (numerics already cast to float), so no
+        per-row Pydantic model is built on this hot path. ``risk_score`` is
+        the stored score (None until computed).
+        """
+        rows, total = self.repository.get_paginated_with_average(
             page=page,
             per_page=per_page,
             turno=turno,
             turma=turma,
-            query_text=query_text
+            query_text=query_text,
+            sort=sort,
+            risk_min=risk_min,
         )
 
-        items = []
-        for aluno, media, faltas in results:
-            items.append(
-                AlunoListSchema(
-                    id=aluno.id,
-                    matricula=aluno.matricula,
-                    nome=aluno.nome,
-                    turma=aluno.turma,
-                    turno=aluno.turno,
-                    status=aluno.status,
-                    media=float(media) if media is not None else None,
-                    faltas=int(faltas) if faltas is not None else 0
-                )
-            )
-
-
-        return AlunoPaginatedResponse(
-            items=items,
-            meta=PaginationMeta(
-                page=page,
-                per_page=per_page,
-                total=total,
-                pages=ceil(total / per_page) if total else 0
-            )
-        )
+        return {
+            "items": [row._asdict() for row in rows],
+            "meta": {
+                "page": page,
+                "per_page": per_page,
+                "total": total,
+                "pages": ceil(total / per_page) if total else 0,
+            },
+        }
 
     def get_aluno_details(self, aluno_id: int) -> Optional[AlunoDetailSchema]:
         aluno, media, notas = self.repository.get_with_notes(aluno_id)
@@ -82,6 +76,9 @@ class AlunoService:
     def create_aluno(self, data: dict) -> AlunoListSchema:
         aluno = self.repository.create(data)
         log_action(self.repository.session, self.user_id, "CREATE", "Aluno", aluno.id, data)
+        invalidate_turma_cache(aluno.tenant_id, aluno.academic_year_id, aluno.turma)
+        bump_data_version(aluno.tenant_id, aluno.academic_year_id)
+        enqueue_account_reconciliation(aluno.tenant_id)
         return AlunoListSchema(
             id=aluno.id,
             matricula=aluno.matricula,
@@ -96,9 +93,12 @@ class AlunoService:
         if not aluno:
             return None
         
+        turma_anterior = aluno.turma
         # Note: simplistic diff, just use data
         updated = self.repository.update(aluno, data)
         log_action(self.repository.session, self.user_id, "UPDATE", "Aluno", aluno_id, data)
+        invalidate_turma_cache(updated.tenant_id, updated.academic_year_id, turma_anterior, updated.turma)
+        bump_data_version(updated.tenant_id, updated.academic_year_id)
         return AlunoListSchema(
             id=updated.id,
             matricula=updated.matricula,
@@ -109,9 +109,15 @@ class AlunoService:
         )
 
     def delete_aluno(self, aluno_id: int) -> bool:
+        aluno = self.repository.get(aluno_id)
+        if not aluno:
+            return False
+        tenant_id, academic_year_id, turma = aluno.tenant_id, aluno.academic_year_id, aluno.turma
         success = self.repository.delete(aluno_id)
         if success:
             log_action(self.repository.session, self.user_id, "DELETE", "Aluno", aluno_id)
+            invalidate_turma_cache(tenant_id, academic_year_id, turma)
+            bump_data_version(tenant_id, academic_year_id)
         return success
 
     def get_bulletin_data(self, aluno_id: int) -> Optional[dict]:
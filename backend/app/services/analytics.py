@@ -5,6 +5,7 @@ from sqlalchemy import func, select
 from sqlalchemy.orm import Session
 
 from ..models import Aluno, Nota
+from ..repositories.risk_score_repository import stored_risk_score
 
 
 @dataclass(slots=True)
@@ -118,27 +119,21 @@ def build_teacher_dashboard(session: Session, query: str | None = None, turno: s
     # We can't easily apply WHERE after GROUP BY/HAVING in this structure without subqueries or careful ordering.
     # Instead, we apply filters to the JOIN source.
     # Re-writing query:
-    stm_risk = select(Aluno, func.avg(Nota.total).label("media")).join(Nota)
+    # Stored scores (services.risk_scores): no model inference on this request.
+    stm_risk = select(Aluno, func.avg(Nota.total).label("media"), stored_risk_score().label("risk_score")).join(Nota)
     stm_risk = apply_filters(stm_risk)
     stm_risk = stm_risk.group_by(Aluno.id).having(func.avg(Nota.total) < 60).order_by("media").limit(10)
 
     risky_students = session.execute(stm_risk).all()
     
     alerts = []
-    # Import locally to avoid circular dependencies if any
-    try:
-        from .ai_predictor import predict_risk
-    except ImportError:
-        def predict_risk(aid): return 0.5
-
-    for aluno, media in risky_students:
-        score = predict_risk(aluno.id)
+    for aluno, media, score in risky_students:
         alerts.append({
             "id": aluno.id,
             "nome": aluno.nome,
             "turma": aluno.turma,
             "media": round(media, 1),
-            "risk_score": score
+            "risk_score": score or 0.0
         })
 
     # 3. Classes Count
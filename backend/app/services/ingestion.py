@@ -1,21 +1,38 @@
 """PDF ingestion helpers used by the uploads endpoint."""
 from __future__ import annotations
 
-from dataclasses import dataclass, field
+from bisect import bisect_right
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field, fields
+import gzip
+import hashlib
+from itertools import repeat
+import json
 import re
 from pathlib import Path
-from typing import Iterable, Sequence
+import time
+from typing import Iterable, Iterator, NamedTuple, Sequence
 from unicodedata import normalize as u_normalize
 from uuid import uuid4
 
 import pdfplumber
+from pdfplumber import utils as pdf_utils
 from loguru import logger
-from sqlalchemy import select
+from sqlalchemy import insert, select, update
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
 from sqlalchemy.orm import Session
 
+from ..core.cache import bump_data_version, cache_get, cache_set, data_version
+from ..core.config import settings
 from ..core.database import SessionLocal, session_scope
+from ..core.processes import pool_context
 from ..models import Aluno, Nota, AcademicYear, Tenant
-from .accounts import ensure_aluno_user
+from . import upload_store
+from .accounts import provision_aluno_users
+from .usuario_service import invalidate_usuario_totals
+from .job_progress import JobProgress
+from .turma_service import invalidate_turma_cache
 
 
 @dataclass(slots=True)
@@ -39,6 +56,47 @@ class ParsedAlunoRecord:
     notas: list[ParsedNotaRecord] = field(default_factory=list)
 
 
+@dataclass(slots=True)
+class IngestionDiff:
+    """Rows a batch of parsed records would write, computed against the current DB state."""
+
+    aluno_inserts: list[dict] = field(default_factory=list)
+    aluno_updates: list[dict] = field(default_factory=list)
+    aluno_ids: dict[str, int] = field(default_factory=dict)
+    # New and changed notas per matricula; ``aluno_id`` is filled in on write.
+    nota_rows: dict[str, list[dict]] = field(default_factory=dict)
+    touched: set[tuple[int | None, str]] = field(default_factory=set)
+    counts: dict[str, int] = field(default_factory=lambda: dict.fromkeys(
+        ("alunos_new", "alunos_changed", "alunos_unchanged", "notas_new", "notas_changed", "notas_unchanged", "notas_removed"),
+        0,
+    ))
+    changes: list[dict] = field(default_factory=list)
+
+    def summary(self) -> dict:
+        counts = self.counts
+        return {
+            "alunos": {
+                "new": counts["alunos_new"],
+                "changed": counts["alunos_changed"],
+                "unchanged": counts["alunos_unchanged"],
+            },
+            "notas": {
+                "new": counts["notas_new"],
+                "changed": counts["notas_changed"],
+                "unchanged": counts["notas_unchanged"],
+                "removed": counts["notas_removed"],
+            },
+        }
+
+
+class ParsedPage(NamedTuple):
+    """What a single page yields; small enough to ship back from a pool worker."""
+
+    number: int
+    year: int | None
+    students: list[tuple[dict[str, str | None], list[ParsedNotaRecord]]]
+
+
 STUDENT_META_PATTERN = re.compile(
     r"Aluno\(a\):\s*(?P<nome>.+?)\s+Matr[ií]cula:\s*(?P<matricula>\d+)",
     re.IGNORECASE | re.DOTALL,
@@ -49,26 +107,100 @@ BOLETIM_YEAR_PATTERN = re.compile(
     re.IGNORECASE
 )
 
+# Bump when parse_pdf output changes so cached parse results are not reused.
+PARSE_CACHE_VERSION = 1
+_NOTA_FIELDS = [f.name for f in fields(ParsedNotaRecord)]
+# Seconds an "applied parse result" marker (one per tenant/year/result digest) is kept.
+APPLIED_MARKER_TIMEOUT = 30 * 24 * 3600
+# Matriculas per IN (...) prefetch; keeps bound parameters well under SQLite's limit.
+BULK_CHUNK_SIZE = 500
+NOTA_UPSERT_COLUMNS = ("disciplina", "trimestre1", "trimestre2", "trimestre3", "total", "faltas", "situacao", "tenant_id")
+# Compared against the stored nota to decide whether a row is written at all.
+NOTA_DIFF_FIELDS = ("disciplina", "trimestre1", "trimestre2", "trimestre3", "total", "faltas", "situacao")
+ALUNO_DIFF_FIELDS = ("nome", "turma", "turno", "academic_year_id")
+# Per-aluno entries kept in a dry-run result; counts always cover everything.
+DIFF_DETAIL_LIMIT = 1000
+
+
+from ..core.jobs import submit_job
+
+def enqueue_pdf(filepath: Path, *, turno: str | None = None, turma: str | None = None, tenant_id: int | None = None, academic_year_id: int | None = None, dry_run: bool = False, meta: dict | None = None, priority: str = "interactive") -> str:
+    job_id = submit_job(
+        process_pdf,
+        (filepath,),
+        {
+            "turno": turno,
+            "turma": turma,
+            "tenant_id": tenant_id,
+            "academic_year_id": academic_year_id,
+            "dry_run": dry_run,
+        },
+        tenant_id=tenant_id,
+        priority=priority,
+        job_timeout=600,
+        meta=meta,
+    )
+    logger.info("Enqueued job {} ({}) for file {}", job_id, priority, filepath.name)
+    return job_id
+
+
+def process_pdf(filepath: Path, *, turno: str | None = None, turma: str | None = None, tenant_id: int | None = None, academic_year_id: int | None = None, dry_run: bool = False) -> dict[str, any]:
+    """
+    Parses the boletim and writes what differs from the DB. With ``dry_run``
+    nothing is written (not even a new AcademicYear) and the result carries
+    the per-aluno diff under ``changes``. Progress is published to the RQ
+    job's meta (see ``JobProgress``).
+    """
+    progress = JobProgress.for_current_job()
+    try:
+        result = _process_pdf(
+            filepath, progress, turno=turno, turma=turma,
+            tenant_id=tenant_id, academic_year_id=academic_year_id, dry_run=dry_run,
+        )
+    except Exception as exc:
+        progress.fail(str(exc))
+        raise
+    progress.finish(alunos=result["count"], skipped=result["skipped"], dry_run=dry_run)
+    return result
 
-from ..core.queue import queue
 
-def enqueue_pdf(filepath: Path, *, turno: str | None = None, turma: str | None = None, tenant_id: int | None = None, academic_year_id: int | None = None) -> str:
-    job = queue.enqueue(
-        process_pdf, 
-        filepath, 
-        turno=turno, 
-        turma=turma, 
-        tenant_id=tenant_id, 
-        academic_year_id=academic_year_id,
-        job_timeout=600
-    )
-    logger.info("Enqueued job {} for file {}", job.id, filepath.name)
-    return job.id
+def warm_parse_cache(filepath: Path, *, turno: str | None = None, turma: str | None = None) -> bool:
+    """
+    Parses the boletim into its parse cache without touching the DB, so a
+    later ``process_pdf`` only writes; returns False when it was cached already.
+    """
+    return not _parse_cached(filepath, JobProgress(), turno=turno, turma=turma)[4]
 
 
-def process_pdf(filepath: Path, *, turno: str | None = None, turma: str | None = None, tenant_id: int | None = None, academic_year_id: int | None = None) -> dict[str, any]:
+def _parse_cached(
+    filepath: Path, progress: JobProgress, *, turno: str | None, turma: str | None
+) -> tuple[str, list[ParsedAlunoRecord], int | None, list[str], bool]:
+    """``(digest, records, year, errors, from_cache)``; parse results are cached per blob and turno/turma."""
     errors: list[str] = []
-    records, extracted_year = parse_pdf(filepath, errors, turno=turno, turma=turma)
+    digest = upload_store.file_digest(filepath)
+    cache_name = _parse_cache_name(turno, turma)
+    cached = upload_store.read_sidecar(digest, cache_name)
+    if cached is not None:
+        records, extracted_year, errors = _decode_parse_result(gzip.decompress(cached))
+        logger.info("Parse cache hit for {} ({})", filepath.name, digest[:12])
+        return digest, records, extracted_year, errors, True
+    records, extracted_year = parse_pdf(filepath, errors, turno=turno, turma=turma, progress=progress)
+    encoded = _encode_parse_result(records, extracted_year, errors)
+    upload_store.write_sidecar(digest, cache_name, gzip.compress(encoded, mtime=0))
+    return digest, records, extracted_year, errors, False
+
+
+def _process_pdf(
+    filepath: Path,
+    progress: JobProgress,
+    *,
+    turno: str | None,
+    turma: str | None,
+    tenant_id: int | None,
+    academic_year_id: int | None,
+    dry_run: bool,
+) -> dict[str, any]:
+    digest, records, extracted_year, errors, cached = _parse_cached(filepath, progress, turno=turno, turma=turma)
     
     # Resolve academic year if extracted from PDF
     if extracted_year and tenant_id:
@@ -77,34 +209,132 @@ def process_pdf(filepath: Path, *, turno: str | None = None, turma: str | None =
                 AcademicYear.tenant_id == tenant_id,
                 AcademicYear.label == str(extracted_year)
             ).first()
-            if not year_obj:
+            if not year_obj and dry_run:
+                # Year not created yet: everything in the boletim would be new.
+                academic_year_id = None
+            elif not year_obj:
                 year_obj = AcademicYear(tenant_id=tenant_id, label=str(extracted_year), is_current=False)
                 session.add(year_obj)
                 session.commit()
                 logger.info("Created new AcademicYear {} for tenant {}", extracted_year, tenant_id)
-            academic_year_id = year_obj.id
+            if year_obj:
+                academic_year_id = year_obj.id
 
     count = 0
+    stats = {}
+    accounts = {}
+    result = {"sha256": digest, "parse_cached": cached, "skipped": False, "dry_run": dry_run, "diff": {}}
     if not records:
         msg = f"Nenhum registro encontrado no boletim {filepath.name}"
         logger.warning(msg)
         errors.append(msg)
-    else:
-        count = apply_records(records, tenant_id=tenant_id, academic_year_id=academic_year_id)
-    
-    return {"count": count, "logs": errors}
+        return {"count": count, "logs": errors, "stats": stats, "accounts": accounts, **result}
+
+    # This parse result was already applied to this tenant/year and nothing was written since: no DB
+    # work. Keyed by digest so re-uploading a whole batch skips every file, not just a repeated last one.
+    result_digest = hashlib.sha256(_encode_parse_result(records, extracted_year, [])).hexdigest()
+    marker_key = f"ingest:applied:{tenant_id}:{academic_year_id}:{result_digest}"
+    version = data_version(tenant_id, academic_year_id)
+    marker = cache_get(marker_key)
+    if not dry_run and version is not None and marker is not None and marker.decode() == str(version):
+        logger.info("Boletim {} unchanged since last import, skipping DB phase", filepath.name)
+        return {"count": len(records), "logs": errors, "stats": stats, "accounts": accounts, **result, "skipped": True}
+
+    started = time.perf_counter()
+    summary = sync_records(
+        records, tenant_id=tenant_id, academic_year_id=academic_year_id, dry_run=dry_run, progress=progress
+    )
+    elapsed = time.perf_counter() - started
+    count = len({record.matricula for record in records})
+    result["diff"] = summary
+    if dry_run:
+        logger.info("Dry run of {}: {}", filepath.name, summary["alunos"])
+        return {"count": count, "logs": errors, "stats": stats, "accounts": accounts, **result}
+
+    notas = sum(len(record.notas) for record in records)
+    stats = {
+        "alunos": count,
+        "notas": notas,
+        "notas_written": summary["notas"]["new"] + summary["notas"]["changed"],
+        "seconds": round(elapsed, 3),
+        "rows_per_second": round((count + notas) / elapsed, 1) if elapsed else None,
+    }
+    logger.info("Applied {} alunos / {} notas in {:.2f}s: {}", count, notas, elapsed, summary)
+    version = data_version(tenant_id, academic_year_id)
+    if version is not None:
+        cache_set(marker_key, str(version), timeout=APPLIED_MARKER_TIMEOUT)
+
+    # Grades are already committed; account provisioning (bcrypt) runs as its own stage.
+    progress.phase("accounts")
+    try:
+        with session_scope() as session:
+            accounts = provision_aluno_users(
+                session, tenant_id=tenant_id, matriculas=[record.matricula for record in records]
+            )
+        # After the commit, so a concurrent listing cannot cache the old total again.
+        if accounts["created"]:
+            invalidate_usuario_totals(tenant_id)
+    except Exception as exc:
+        logger.exception("Account provisioning failed for {}", filepath.name)
+        errors.append(f"Falha ao provisionar contas de alunos: {exc}")
+
+    if stats["notas_written"] or summary["notas"]["removed"] or summary["alunos"]["new"]:
+        from .risk_scores import after_ingestion
+
+        turmas = {record.turma for record in records}
+        # Records without a turma keep their current one: rescore the whole year.
+        after_ingestion(tenant_id, academic_year_id, None if None in turmas else turmas)
+
+    return {"count": count, "logs": errors, "stats": stats, "accounts": accounts, **result}
 
 
 def apply_records(records: Sequence[ParsedAlunoRecord], tenant_id: int | None = None, academic_year_id: int | None = None) -> int:
+    """Writes the records (see ``sync_records``) and returns how many alunos they cover."""
+    summary = sync_records(records, tenant_id=tenant_id, academic_year_id=academic_year_id)
+    return sum(summary["alunos"].values())
+
+
+def sync_records(
+    records: Sequence[ParsedAlunoRecord],
+    tenant_id: int | None = None,
+    academic_year_id: int | None = None,
+    *,
+    dry_run: bool = False,
+    progress: JobProgress | None = None,
+) -> dict:
+    """
+    Diffs parsed records against the DB and writes only what changed: existing
+    alunos and their notas for the year are prefetched with a few ``IN``
+    queries, new alunos are bulk inserted, changed ones bulk updated, and new
+    or changed notas go through a batched ``INSERT ... ON CONFLICT DO UPDATE``.
+    Unchanged rows are not written and their turmas' caches are left alone.
+    Returns the diff summary; with ``dry_run`` nothing is written and the
+    per-aluno changes are included under ``changes``.
+    Student accounts are not touched here, see ``provision_aluno_users``.
+    """
     if not records:
-        return 0
+        return IngestionDiff().summary()
+    # Last occurrence wins, as it did when records were applied one by one.
+    by_matricula = {record.matricula: record for record in records}
+    progress = progress or JobProgress()
+    progress.phase("diffing", total=len(by_matricula), unit="alunos")
     session = SessionLocal()
     try:
-        for record in records:
-            aluno = _upsert_aluno(session, record, tenant_id=tenant_id, academic_year_id=academic_year_id)
-            _upsert_notas(session, aluno, record.notas, tenant_id=tenant_id, academic_year_id=academic_year_id)
+        diff = _diff_records(session, by_matricula, tenant_id, academic_year_id, details=dry_run, progress=progress)
+        summary = diff.summary()
+        if dry_run:
+            summary["changes"] = diff.changes[:DIFF_DETAIL_LIMIT]
+            summary["truncated"] = len(diff.changes) > DIFF_DETAIL_LIMIT
+            session.rollback()
+            return summary
+        progress.phase("writing", total=sum(len(rows) for rows in diff.nota_rows.values()), unit="notas", **summary)
+        _write_diff(session, diff)
         session.commit()
-        return len(records)
+        for year_id, turma in diff.touched:
+            invalidate_turma_cache(tenant_id, year_id, turma)
+        for year_id in {year_id for year_id, _ in diff.touched}:
+            bump_data_version(tenant_id, year_id)
+        return summary
     except Exception:
         session.rollback()
         raise
@@ -112,74 +342,228 @@ def apply_records(records: Sequence[ParsedAlunoRecord], tenant_id: int | None =
         session.close()
 
 
-def parse_pdf(filepath: Path, errors: list[str], *, turno: str | None = None, turma: str | None = None) -> tuple[list[ParsedAlunoRecord], int | None]:
-    parsed: dict[str, ParsedAlunoRecord] = {}
-    extracted_year = None
+def parse_pdf(
+    filepath: Path,
+    errors: list[str],
+    *,
+    turno: str | None = None,
+    turma: str | None = None,
+    workers: int | None = None,
+    progress: JobProgress | None = None,
+) -> tuple[list[ParsedAlunoRecord], int | None]:
+    """
+    Parses every page of the boletim. With ``workers > 1`` (default:
+    ``INGESTION_WORKERS``) page ranges are parsed in a process pool; results
+    are merged in page order, so the output is the same as a sequential run.
+    """
+    workers = settings.ingestion_workers if workers is None else workers
+    progress = progress or JobProgress()
     with pdfplumber.open(str(filepath)) as pdf:
-        for page in pdf.pages:
-            text = page.extract_text() or ""
-            
-            # Try to extract year once
-            if extracted_year is None:
-                year_match = BOLETIM_YEAR_PATTERN.search(text)
-                if year_match:
-                    extracted_year = int(year_match.group("year"))
-
-            tables = page.extract_tables() or []
-            student_metas = _extract_student_meta(text)
-            if not student_metas:
-                # msg = f"Página {page.page_number} sem metadados (ignorada)."
-                # logger.warning(msg)
-                # errors.append(msg)
-                # Omit noise, only log real issues if needed
-                continue
+        total_pages = len(pdf.pages)
+        progress.phase("parsing", total=total_pages, unit="pages", records=0)
+        started = time.perf_counter()
+        parallel = workers > 1 and total_pages > settings.ingestion_pages_per_task
+        if not parallel:
+            pages = _track_pages((_parse_page(page) for page in pdf.pages), progress)
+            parsed = _merge_pages(pages, errors, turno=turno, turma=turma)
+    if parallel:
+        pages = _parse_pages_parallel(filepath, total_pages, workers, settings.ingestion_pages_per_task)
+        parsed = _merge_pages(_track_pages(pages, progress), errors, turno=turno, turma=turma)
+    elapsed = time.perf_counter() - started
+    logger.info(
+        "Parsed {} ({} pages) in {:.2f}s, {:.1f} ms/page",
+        filepath.name, total_pages, elapsed, elapsed / total_pages * 1000 if total_pages else 0.0,
+    )
+    return parsed
 
-            for idx, meta in enumerate(student_metas):
-                matricula = meta.get("matricula")
-                if not matricula:
-                    errors.append(f"Página {page.page_number}: Aluno sem matrícula ignorado.")
-                    continue
 
-                registro = parsed.setdefault(
-                    matricula,
-                    ParsedAlunoRecord(
-                        matricula=matricula,
-                        nome=meta.get("nome") or "Aluno sem nome",
-                        turma=meta.get("turma") or turma,
-                        turno=meta.get("turno") or turno,
-                    ),
+def _track_pages(pages: Iterable[ParsedPage], progress: JobProgress) -> Iterator[ParsedPage]:
+    students = 0
+    for done, page in enumerate(pages, start=1):
+        students += len(page.students)
+        progress.advance(done, records=students)
+        yield page
+
+
+def infer_turma_turno(filepath: Path, max_pages: int = 3) -> tuple[str | None, str | None]:
+    """Turma and turno from the first "Turma:" line found in the boletim's first pages."""
+    for text in _first_pages_text(filepath, max_pages):
+        for meta in _extract_student_meta(text):
+            if meta.get("turma"):
+                return meta["turma"], meta.get("turno")
+    return None, None
+
+
+def infer_boletim_year(filepath: Path, max_pages: int = 3) -> int | None:
+    """Year of the first "BOLETIM ESCOLAR - YYYY" header in the boletim's first pages."""
+    for text in _first_pages_text(filepath, max_pages):
+        match = BOLETIM_YEAR_PATTERN.search(text)
+        if match:
+            return int(match.group("year"))
+    return None
+
+
+def _first_pages_text(filepath: Path, max_pages: int) -> Iterator[str]:
+    with pdfplumber.open(str(filepath)) as pdf:
+        for page in pdf.pages[:max_pages]:
+            yield page.extract_text() or ""
+            page.close()
+
+
+def _parse_pages_parallel(filepath: Path, total_pages: int, workers: int, pages_per_task: int) -> Iterator[ParsedPage]:
+    starts = range(0, total_pages, pages_per_task)
+    stops = [min(start + pages_per_task, total_pages) for start in starts]
+    logger.info("Parsing {} ({} pages) with {} processes", filepath.name, total_pages, min(workers, len(starts)))
+    with ProcessPoolExecutor(max_workers=min(workers, len(starts)), mp_context=pool_context()) as pool:
+        # map() yields chunks in submission order, which keeps the merge deterministic.
+        for chunk in pool.map(_parse_page_range, repeat(str(filepath)), starts, stops):
+            yield from chunk
+
+
+def _parse_page_range(filepath: str, start: int, stop: int) -> list[ParsedPage]:
+    """Process pool entry point: opens the PDF on its own and parses pages ``[start, stop)``."""
+    with pdfplumber.open(filepath, pages=range(start + 1, stop + 1)) as pdf:
+        return [_parse_page(page) for page in pdf.pages]
+
+
+def _parse_page(page) -> ParsedPage:
+    try:
+        return _parse_page_content(page)
+    finally:
+        # Drop the page's objects and layout now rather than when the whole PDF closes.
+        page.close()
+
+
+def _parse_page_content(page) -> ParsedPage:
+    text, tables = _extract_page_layout(page)
+    year_match = BOLETIM_YEAR_PATTERN.search(text)
+    student_metas = _extract_student_meta(text)
+    if tables and (not student_metas or not year_match):
+        # Header or student lines drawn inside a ruled box: read the whole page's text.
+        text = page.extract_text() or ""
+        year_match = BOLETIM_YEAR_PATTERN.search(text)
+        student_metas = _extract_student_meta(text)
+    year = int(year_match.group("year")) if year_match else None
+    if not student_metas:
+        return ParsedPage(page.page_number, year, [])
+
+    students: list[tuple[dict[str, str | None], list[ParsedNotaRecord]]] = []
+    for idx, meta in enumerate(student_metas):
+        table_rows: Sequence[Sequence[Sequence[str | None]]] = []
+        if idx < len(tables) and tables[idx]:
+            table_rows = [tables[idx]]
+
+        notas = []
+        for row in _extract_rows(table_rows):
+            disciplina = row.get("disciplina")
+            if not disciplina:
+                continue
+            notas.append(
+                ParsedNotaRecord(
+                    disciplina=disciplina.strip(),
+                    disciplina_normalizada=_normalize_disciplina(disciplina),
+                    trimestre1=_parse_float(row.get("trimestre1")),
+                    trimestre2=_parse_float(row.get("trimestre2")),
+                    trimestre3=_parse_float(row.get("trimestre3")),
+                    total=_parse_float(row.get("total")),
+                    faltas=_parse_int(row.get("faltas")),
+                    situacao=_clean_text(row.get("situacao")),
                 )
-                if meta.get("nome"):
-                    registro.nome = meta["nome"].strip()
-                if meta.get("turma"):
-                    registro.turma = meta["turma"]
-                elif turma:
-                    registro.turma = turma
-                if meta.get("turno"):
-                    registro.turno = meta["turno"]
-                elif turno:
-                    registro.turno = turno
-
-                table_rows: Sequence[Sequence[Sequence[str | None]]] = []
-                if idx < len(tables) and tables[idx]:
-                    table_rows = [tables[idx]]
-
-                for row in _extract_rows(table_rows):
-                    disciplina = row.get("disciplina")
-                    if not disciplina:
-                        continue
-                    registro.notas.append(
-                        ParsedNotaRecord(
-                            disciplina=disciplina.strip(),
-                            disciplina_normalizada=_normalize_disciplina(disciplina),
-                            trimestre1=_parse_float(row.get("trimestre1")),
-                            trimestre2=_parse_float(row.get("trimestre2")),
-                            trimestre3=_parse_float(row.get("trimestre3")),
-                            total=_parse_float(row.get("total")),
-                            faltas=_parse_int(row.get("faltas")),
-                            situacao=_clean_text(row.get("situacao")),
-                        )
-                    )
+            )
+        students.append((meta, notas))
+    return ParsedPage(page.page_number, year, students)
+
+
+def _extract_page_layout(page) -> tuple[str, list[list[list[str | None]]]]:
+    """
+    The page's free text (outside ruled tables) and its tables, from one pass
+    over ``page.chars``. ``extract_text()`` + ``extract_tables()`` cluster every
+    char for the text and then rescan all chars once per table row; here each
+    char is routed once to its table cell or to the free text, and only the
+    free text is clustered into lines. Cell text matches ``Table.extract()``.
+    """
+    chars = page.chars
+    tables = page.find_tables()
+    if not tables:
+        return pdf_utils.extract_text(chars), []
+
+    layouts = []
+    for table in tables:
+        rows = [row.cells for row in table.rows]
+        layouts.append((table.bbox, [row.bbox[1] for row in table.rows], [row.bbox[3] for row in table.rows], rows))
+    routed = [[[[] for _ in cells] for cells in rows] for _, _, _, rows in layouts]
+    free = []
+    for char in chars:
+        # Same midpoint rule as Table.extract.
+        h_mid = (char["x0"] + char["x1"]) / 2
+        v_mid = (char["top"] + char["bottom"]) / 2
+        inside = False
+        for t, ((x0, top, x1, bottom), tops, bottoms, rows) in enumerate(layouts):
+            if not (x0 <= h_mid < x1 and top <= v_mid < bottom):
+                continue
+            inside = True
+            r = bisect_right(tops, v_mid) - 1
+            if r < 0 or v_mid >= bottoms[r]:
+                continue
+            for c, cell in enumerate(rows[r]):
+                if cell is not None and cell[0] <= h_mid < cell[2] and cell[1] <= v_mid < cell[3]:
+                    routed[t][r][c].append(char)
+        if not inside:
+            free.append(char)
+
+    extracted = [
+        [
+            [
+                None if cell is None else (pdf_utils.extract_text(cell_chars) if cell_chars else "")
+                for cell, cell_chars in zip(cells, row_chars)
+            ]
+            for cells, row_chars in zip(rows, table_chars)
+        ]
+        for (_, _, _, rows), table_chars in zip(layouts, routed)
+    ]
+    return pdf_utils.extract_text(free), extracted
+
+
+def _merge_pages(
+    pages: Iterable[ParsedPage],
+    errors: list[str],
+    *,
+    turno: str | None = None,
+    turma: str | None = None,
+) -> tuple[list[ParsedAlunoRecord], int | None]:
+    parsed: dict[str, ParsedAlunoRecord] = {}
+    extracted_year = None
+    for page in pages:
+        # Year comes from the first page that carries the boletim header
+        if extracted_year is None:
+            extracted_year = page.year
+
+        for meta, notas in page.students:
+            matricula = meta.get("matricula")
+            if not matricula:
+                errors.append(f"Página {page.number}: Aluno sem matrícula ignorado.")
+                continue
+
+            registro = parsed.setdefault(
+                matricula,
+                ParsedAlunoRecord(
+                    matricula=matricula,
+                    nome=meta.get("nome") or "Aluno sem nome",
+                    turma=meta.get("turma") or turma,
+                    turno=meta.get("turno") or turno,
+                ),
+            )
+            if meta.get("nome"):
+                registro.nome = meta["nome"].strip()
+            if meta.get("turma"):
+                registro.turma = meta["turma"]
+            elif turma:
+                registro.turma = turma
+            if meta.get("turno"):
+                registro.turno = meta["turno"]
+            elif turno:
+                registro.turno = turno
+            registro.notas.extend(notas)
     return list(parsed.values()), extracted_year
 
 
@@ -277,64 +661,209 @@ def _extract_rows(tables: Sequence[Sequence[Sequence[str | None]]]) -> Iterable[
 
 
 
-def _upsert_aluno(session: Session, record: ParsedAlunoRecord, tenant_id: int | None = None, academic_year_id: int | None = None) -> Aluno:
-    stmt = select(Aluno).where(
-        Aluno.matricula == record.matricula,
-        Aluno.tenant_id == tenant_id
-    )
-    aluno = session.execute(stmt).scalar_one_or_none()
-    if aluno is None:
-        aluno = Aluno(
-            matricula=record.matricula,
-            nome=record.nome,
-            turma=record.turma or "",
-            turno=record.turno or "",
-            tenant_id=tenant_id,
-            academic_year_id=academic_year_id
-        )
-        session.add(aluno)
-        session.flush()
-        ensure_aluno_user(session, aluno)
-        return aluno
-    aluno.nome = record.nome or aluno.nome
-    aluno.academic_year_id = academic_year_id # Update to current processing year
-    if record.turma:
-        aluno.turma = record.turma
-    if record.turno:
-        aluno.turno = record.turno
-    ensure_aluno_user(session, aluno)
-    return aluno
-
-
-def _upsert_notas(session: Session, aluno: Aluno, notas: Sequence[ParsedNotaRecord], tenant_id: int | None = None, academic_year_id: int | None = None) -> None:
-    for nota_data in notas:
-        stmt = select(Nota).where(
-            Nota.aluno_id == aluno.id,
-            Nota.disciplina_normalizada == nota_data.disciplina_normalizada,
-            Nota.tenant_id == tenant_id,
-            Nota.academic_year_id == academic_year_id
-        )
-        existing = session.execute(stmt).scalars().all()
-        nota = existing[0] if existing else None
-        for duplicate in existing[1:]:
-            session.delete(duplicate)
-        if nota is None:
-            nota = Nota(
-                aluno_id=aluno.id,
-                disciplina=nota_data.disciplina,
-                disciplina_normalizada=nota_data.disciplina_normalizada,
-                tenant_id=tenant_id,
-                academic_year_id=academic_year_id
-            )
-            session.add(nota)
+def _diff_records(
+    session: Session,
+    records: dict[str, ParsedAlunoRecord],
+    tenant_id: int | None,
+    academic_year_id: int | None,
+    *,
+    details: bool,
+    progress: JobProgress,
+) -> IngestionDiff:
+    diff = IngestionDiff()
+    existing = {}
+    for chunk in _chunks(list(records), BULK_CHUNK_SIZE):
+        rows = session.execute(
+            select(Aluno.id, Aluno.matricula, Aluno.nome, Aluno.turma, Aluno.turno, Aluno.academic_year_id)
+            .where(Aluno.tenant_id == tenant_id, Aluno.matricula.in_(chunk))
+        ).all()
+        existing.update((row.matricula, row) for row in rows)
+
+    current_notas: dict[int, dict[str, tuple]] = {}
+    for chunk in _chunks([row.id for row in existing.values()], BULK_CHUNK_SIZE):
+        rows = session.execute(
+            select(Nota.aluno_id, Nota.disciplina_normalizada, *(getattr(Nota, name) for name in NOTA_DIFF_FIELDS))
+            .where(Nota.aluno_id.in_(chunk), Nota.academic_year_id == academic_year_id)
+        ).all()
+        for row in rows:
+            current_notas.setdefault(row.aluno_id, {})[row.disciplina_normalizada] = _nota_key(row)
+
+    for done, (matricula, record) in enumerate(records.items(), start=1):
+        progress.advance(done)
+        current = existing.get(matricula)
+        change: dict = {"matricula": matricula, "nome": record.nome}
+        if current is None:
+            diff.aluno_inserts.append({
+                "matricula": matricula,
+                "nome": record.nome,
+                "turma": record.turma or "",
+                "turno": record.turno or "",
+                "tenant_id": tenant_id,
+                "academic_year_id": academic_year_id,
+            })
+            diff.touched.add((academic_year_id, record.turma or ""))
+            notas = {nota.disciplina_normalizada: nota for nota in record.notas}
+            diff.nota_rows[matricula] = [_nota_row(nota, tenant_id, academic_year_id) for nota in notas.values()]
+            diff.counts["notas_new"] += len(notas)
+            diff.counts["alunos_new"] += 1
+            if details:
+                change["status"] = "new"
+                change["notas"] = [{"disciplina": nota.disciplina, "status": "new"} for nota in notas.values()]
+                diff.changes.append(change)
+            continue
+
+        diff.aluno_ids[matricula] = current.id
+        values = {
+            "id": current.id,
+            "nome": record.nome or current.nome,
+            "turma": record.turma or current.turma,
+            "turno": record.turno or current.turno,
+            "academic_year_id": academic_year_id,
+        }
+        changed_fields = {
+            key: [getattr(current, key), values[key]]
+            for key in ALUNO_DIFF_FIELDS
+            if values[key] != getattr(current, key)
+        }
+        if changed_fields:
+            diff.aluno_updates.append(values)
+
+        stored = current_notas.get(current.id, {})
+        # Last row for a disciplina wins, as the upsert would have it.
+        notas = {nota.disciplina_normalizada: nota for nota in record.notas}
+        nota_changes = []
+        rows = []
+        for key, nota in notas.items():
+            before = stored.get(key)
+            after = _nota_key(nota)
+            if before == after:
+                continue
+            rows.append(_nota_row(nota, tenant_id, academic_year_id))
+            item = {"disciplina": nota.disciplina, "status": "new" if before is None else "changed"}
+            if before is not None:
+                item["changes"] = {
+                    name: [old, new] for name, old, new in zip(NOTA_DIFF_FIELDS, before, after) if old != new
+                }
+            nota_changes.append(item)
+
+        new_notas = sum(1 for item in nota_changes if item["status"] == "new")
+        diff.counts["notas_new"] += new_notas
+        diff.counts["notas_changed"] += len(nota_changes) - new_notas
+        diff.counts["notas_unchanged"] += len(notas) - len(nota_changes)
+        # Reported only: a boletim missing a disciplina does not delete its grades.
+        removed = [
+            {"disciplina": stored_key[0], "status": "removed"}
+            for key, stored_key in stored.items()
+            if key not in notas
+        ]
+        diff.counts["notas_removed"] += len(removed)
+
+        if rows:
+            diff.nota_rows[matricula] = rows
+        if changed_fields or rows:
+            diff.counts["alunos_changed"] += 1
+            # The turma the aluno is leaving also needs its cached detail dropped.
+            diff.touched.add((current.academic_year_id, current.turma))
+            diff.touched.add((academic_year_id, values["turma"]))
         else:
-            nota.disciplina = nota_data.disciplina
-        nota.trimestre1 = nota_data.trimestre1
-        nota.trimestre2 = nota_data.trimestre2
-        nota.trimestre3 = nota_data.trimestre3
-        nota.total = nota_data.total
-        nota.faltas = nota_data.faltas or 0
-        nota.situacao = nota_data.situacao
+            diff.counts["alunos_unchanged"] += 1
+        if details and (changed_fields or nota_changes or removed):
+            change["status"] = "changed" if changed_fields or rows else "unchanged"
+            if changed_fields:
+                change["fields"] = changed_fields
+            change["notas"] = nota_changes + removed
+            diff.changes.append(change)
+    return diff
+
+
+def _write_diff(session: Session, diff: IngestionDiff) -> None:
+    if diff.aluno_inserts:
+        result = session.execute(insert(Aluno).returning(Aluno.id, Aluno.matricula), diff.aluno_inserts)
+        diff.aluno_ids.update((row.matricula, row.id) for row in result)
+    if diff.aluno_updates:
+        session.execute(update(Aluno), diff.aluno_updates)
+
+    rows = []
+    for matricula, nota_rows in diff.nota_rows.items():
+        aluno_id = diff.aluno_ids[matricula]
+        rows.extend({**row, "aluno_id": aluno_id} for row in nota_rows)
+    if not rows:
+        return
+    insert_fn = postgresql_insert if session.get_bind().dialect.name == "postgresql" else sqlite_insert
+    stmt = insert_fn(Nota.__table__)
+    # Only new and changed notas reach this point; the conflict clause covers
+    # the changed ones and rows a concurrent import inserted meanwhile.
+    stmt = stmt.on_conflict_do_update(
+        index_elements=["aluno_id", "disciplina_normalizada", "academic_year_id"],
+        set_={column: stmt.excluded[column] for column in NOTA_UPSERT_COLUMNS},
+    )
+    # executemany: compiled once, sent in batches by the driver / insertmanyvalues.
+    session.execute(stmt, rows)
+
+
+def _nota_row(nota: ParsedNotaRecord, tenant_id: int | None, academic_year_id: int | None) -> dict:
+    return {
+        "disciplina": nota.disciplina,
+        "disciplina_normalizada": nota.disciplina_normalizada,
+        "trimestre1": nota.trimestre1,
+        "trimestre2": nota.trimestre2,
+        "trimestre3": nota.trimestre3,
+        "total": nota.total,
+        "faltas": nota.faltas or 0,
+        "situacao": nota.situacao,
+        "tenant_id": tenant_id,
+        "academic_year_id": academic_year_id,
+    }
+
+
+def _nota_key(source) -> tuple:
+    """Comparable ``NOTA_DIFF_FIELDS`` of a parsed nota or a DB row, at column precision."""
+    def number(value):
+        return None if value is None else round(float(value), 2)
+
+    return (
+        source.disciplina,
+        number(source.trimestre1),
+        number(source.trimestre2),
+        number(source.trimestre3),
+        number(source.total),
+        source.faltas or 0,
+        source.situacao,
+    )
+
+
+def _parse_cache_name(turno: str | None, turma: str | None) -> str:
+    # turno/turma are fallbacks baked into the records, so they are part of the key.
+    key = hashlib.sha256(f"{PARSE_CACHE_VERSION}|{turno or ''}|{turma or ''}".encode()).hexdigest()[:16]
+    return f"parsed-{key}.json.gz"
+
+
+def _encode_parse_result(records: Sequence[ParsedAlunoRecord], year: int | None, errors: list[str]) -> bytes:
+    """Compact, deterministic JSON: one list per aluno and per nota, fields in dataclass order."""
+    payload = {
+        "v": PARSE_CACHE_VERSION,
+        "year": year,
+        "errors": errors,
+        "alunos": [
+            [r.matricula, r.nome, r.turma, r.turno, [[getattr(n, f) for f in _NOTA_FIELDS] for n in r.notas]]
+            for r in records
+        ],
+    }
+    return json.dumps(payload, ensure_ascii=False, separators=(",", ":")).encode()
+
+
+def _decode_parse_result(data: bytes) -> tuple[list[ParsedAlunoRecord], int | None, list[str]]:
+    payload = json.loads(data)
+    records = [
+        ParsedAlunoRecord(matricula, nome, turma, turno, [ParsedNotaRecord(*nota) for nota in notas])
+        for matricula, nome, turma, turno, notas in payload["alunos"]
+    ]
+    return records, payload["year"], payload["errors"]
+
+
+def _chunks(items: list, size: int) -> Iterator[list]:
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
 
 
 def _normalize_header(value: str | None) -> str | None:
@@ -0,0 +1,140 @@
+"""
+Intent routing for the chat (``AIAnalystEngine``).
+
+Every intent is a list of cues written over normalized text (lowercase, no
+accents). A cue is one or more word stems, each matching the start of a
+word:
+
+    "risco"              a word starting with "risco"
+    "nao veio"           "nao" immediately followed by "veio..."
+    "melhor ... aluno"   "melhor..." and, later in the message, "aluno..."
+
+All cues are compiled into one stem index, so a message is tokenized once and
+each word is looked up by its prefixes; cue progress is tracked in the same
+pass. An intent scores the sum of its matched cues' weights (by default the
+number of stems, so specific cues outweigh single words) plus one per
+extracted filter it lists in ``filters``. The highest score wins; ties go to
+the intent declared first. ``tests/data/chat_queries.jsonl`` is the routing
+regression corpus and ``scripts/bench_intent_router.py`` its benchmark.
+"""
+from __future__ import annotations
+
+import re
+import unicodedata
+from dataclasses import dataclass, field
+from typing import Iterable
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+_GAP = "..."
+
+
+def normalize(text: str) -> str:
+    """Lowercase without accents ("Évasão" -> "evasao", "7º" -> "7o")."""
+    decomposed = unicodedata.normalize("NFKD", text)
+    return "".join(c for c in decomposed if not unicodedata.combining(c)).lower()
+
+
+@dataclass(frozen=True)
+class Intent:
+    name: str
+    cues: tuple[str | tuple[str, int], ...]
+    # Extracted filter keys that count as a cue of weight 1 when present.
+    filters: tuple[str, ...] = ()
+
+
+@dataclass(frozen=True)
+class Route:
+    intent: str | None
+    score: int
+    scores: dict[str, int] = field(default_factory=dict)
+
+
+@dataclass(frozen=True)
+class _Cue:
+    intent: int
+    weight: int
+    stems: tuple[str, ...]
+    # Per stem after the first: must it follow the previous one directly?
+    adjacent: tuple[bool, ...]
+
+
+class IntentRouter:
+    def __init__(self, intents: Iterable[Intent]):
+        self.intents = list(intents)
+        self._cues: list[_Cue] = []
+        # stem -> [(cue index, stem position in the cue)], later positions first
+        self._index: dict[str, list[tuple[int, int]]] = {}
+        for intent_idx, intent in enumerate(self.intents):
+            for spec in intent.cues:
+                text, weight = spec if isinstance(spec, tuple) else (spec, None)
+                cue = self._compile(intent_idx, text, weight)
+                cue_idx = len(self._cues)
+                self._cues.append(cue)
+                for position, stem in enumerate(cue.stems):
+                    self._index.setdefault(stem, []).append((cue_idx, position))
+        for hits in self._index.values():
+            hits.sort(key=lambda hit: -hit[1])
+        self._stem_lengths = sorted({len(stem) for stem in self._index})
+
+    @staticmethod
+    def _compile(intent_idx: int, text: str, weight: int | None) -> _Cue:
+        stems, adjacent = [], []
+        for group in text.split(_GAP):
+            words = normalize(group).split()
+            if not words:
+                raise ValueError(f"empty cue group in {text!r}")
+            for word_idx, word in enumerate(words):
+                if stems:
+                    adjacent.append(word_idx > 0)
+                stems.append(word)
+        return _Cue(intent_idx, weight if weight is not None else len(stems), tuple(stems), tuple(adjacent))
+
+    def route(self, message: str, filters: dict | None = None) -> Route:
+        matched = self._match(normalize(message))
+        scores = [0] * len(self.intents)
+        for cue_idx in matched:
+            cue = self._cues[cue_idx]
+            scores[cue.intent] += cue.weight
+        if filters:
+            for intent_idx, intent in enumerate(self.intents):
+                scores[intent_idx] += sum(1 for key in intent.filters if filters.get(key))
+
+        best = max(range(len(scores)), key=lambda i: (scores[i], -i)) if scores else None
+        nonzero = {self.intents[i].name: s for i, s in enumerate(scores) if s}
+        if best is None or scores[best] == 0:
+            return Route(None, 0, nonzero)
+        return Route(self.intents[best].name, scores[best], nonzero)
+
+    def _match(self, text: str) -> set[int]:
+        """Indexes of the cues found in ``text``, in one pass over its words."""
+        matched: set[int] = set()
+        # cue index -> (stems matched so far, position of the last one)
+        progress: dict[int, tuple[int, int]] = {}
+        for position, token in enumerate(_TOKEN_RE.findall(text)):
+            for length in self._stem_lengths:
+                if length > len(token):
+                    break
+                for cue_idx, stem_pos in self._index.get(token[:length], ()):
+                    if cue_idx in matched:
+                        continue
+                    cue = self._cues[cue_idx]
+                    if stem_pos == 0:
+                        done, last = progress.get(cue_idx, (0, -1))
+                        # Restart unless the next stem may come after a gap anyway.
+                        if done <= 1 or cue.adjacent[done - 1]:
+                            done, last = 1, position
+                        else:
+                            continue
+                    else:
+                        done, last = progress.get(cue_idx, (0, -1))
+                        if done != stem_pos or last == position:
+                            continue
+                        if cue.adjacent[stem_pos - 1] and last != position - 1:
+                            continue
+                        done, last = done + 1, position
+                    if done == len(cue.stems):
+                        matched.add(cue_idx)
+                        progress.pop(cue_idx, None)
+                    else:
+                        progress[cue_idx] = (done, last)
+        return matched
@@ -0,0 +1,140 @@
+"""
+Progress reporting for RQ jobs.
+
+``JobProgress`` keeps ``job.meta["progress"]`` up to date (phase, done/total,
+ETA) and publishes each update on a Redis channel; ``stream_events`` turns
+that channel into a server-sent event stream for the uploads API.
+"""
+from __future__ import annotations
+
+import json
+import time
+from typing import Any, Iterator
+
+from loguru import logger
+
+from ..core.config import settings
+
+TERMINAL_PHASES = {"finished", "failed"}
+TERMINAL_STATUSES = {"finished", "failed", "stopped", "canceled"}
+HEARTBEAT_SECONDS = 15.0
+
+
+def progress_channel(job_id: str) -> str:
+    return f"jobs:progress:{job_id}"
+
+
+class JobProgress:
+    """
+    Reports the progress of the current RQ job. Updates within a phase are
+    throttled to one per ``JOB_PROGRESS_INTERVAL`` seconds; phase changes and
+    the last item of a phase always go out. Without a job (CLI, tests) every
+    call is a no-op apart from keeping ``state``.
+    """
+
+    def __init__(self, job=None, interval: float | None = None):
+        self.job = job
+        self.interval = settings.job_progress_interval if interval is None else interval
+        self.state: dict[str, Any] = {"phase": "queued", "done": 0, "total": None, "eta_seconds": None}
+        self._phase_started = time.monotonic()
+        self._last_publish = 0.0
+
+    @classmethod
+    def for_current_job(cls) -> JobProgress:
+        from ..core.jobs import current_job
+
+        return cls(current_job())
+
+    def phase(self, name: str, total: int | None = None, **extra: Any) -> None:
+        self._phase_started = time.monotonic()
+        self.state = {"phase": name, "done": 0, "total": total, "eta_seconds": None, **extra}
+        self._publish()
+
+    def advance(self, done: int, **extra: Any) -> None:
+        self.state.update(extra, done=done)
+        now = time.monotonic()
+        total = self.state["total"]
+        last = total is not None and done >= total
+        if not last and now - self._last_publish < self.interval:
+            return
+        elapsed = now - self._phase_started
+        if total and done and not last:
+            self.state["eta_seconds"] = round(elapsed / done * (total - done), 1)
+        else:
+            self.state["eta_seconds"] = 0 if last else None
+        self._publish()
+
+    def finish(self, **extra: Any) -> None:
+        self.phase("finished", **extra)
+
+    def fail(self, error: str) -> None:
+        self.phase("failed", error=error)
+
+    def _publish(self) -> None:
+        self._last_publish = time.monotonic()
+        if self.job is None:
+            return
+        payload = {**self.state, "updated_at": time.time()}
+        try:
+            self.job.meta["progress"] = payload
+            self.job.save_meta()
+            self.job.connection.publish(progress_channel(self.job.id), json.dumps(payload, default=str))
+        except Exception as exc:
+            # Progress is best effort; never fail the import because of it.
+            logger.warning("Could not publish progress for job {}: {}", self.job.id, exc)
+
+
+def job_snapshot(job) -> dict[str, Any]:
+    job.refresh()
+    status = job.get_status(refresh=False)
+    return {
+        "job_id": job.id,
+        "status": status,
+        "progress": job.meta.get("progress"),
+        "result": job.result if status == "finished" else None,
+    }
+
+
+def stream_events(job, *, timeout: float | None = None) -> Iterator[str]:
+    """
+    Yields SSE frames for ``job``: a ``status`` snapshot, then ``progress``
+    events as the worker publishes them, and a final ``status`` once RQ has
+    stored the outcome. Ends after ``JOB_EVENTS_TIMEOUT`` seconds; clients
+    reconnect and get a fresh snapshot.
+    """
+    timeout = settings.job_events_timeout if timeout is None else timeout
+    pubsub = job.connection.pubsub(ignore_subscribe_messages=True)
+    # Subscribe before the snapshot so no update falls in between.
+    pubsub.subscribe(progress_channel(job.id))
+    try:
+        snapshot = job_snapshot(job)
+        yield _sse("status", snapshot)
+        if snapshot["status"] in TERMINAL_STATUSES:
+            return
+        deadline = time.monotonic() + timeout
+        last_sent = time.monotonic()
+        ending = False
+        while time.monotonic() < deadline:
+            message = pubsub.get_message(timeout=1.0)
+            now = time.monotonic()
+            if message is not None:
+                data = message["data"].decode() if isinstance(message["data"], bytes) else message["data"]
+                yield f"event: progress\ndata: {data}\n\n"
+                last_sent = now
+                ending = ending or json.loads(data).get("phase") in TERMINAL_PHASES
+                continue
+            # The job reports "finished" just before RQ stores its result, so poll briefly after it.
+            if ending or now - last_sent >= HEARTBEAT_SECONDS:
+                status = job.get_status(refresh=True)
+                if status in TERMINAL_STATUSES:
+                    yield _sse("status", job_snapshot(job))
+                    return
+                if now - last_sent >= HEARTBEAT_SECONDS:
+                    yield ": keep-alive\n\n"
+                    last_sent = now
+    finally:
+        pubsub.close()
+
+
+def _sse(event: str, data: dict[str, Any]) -> str:
+    return f"event: {event}\ndata: {json.dumps(data, default=str)}\n\n"
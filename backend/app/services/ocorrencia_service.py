@@ -11,30 +11,21 @@ class OcorrenciaService:
         self.repository = OcorrenciaRepository(session)
         self.user_id = user_id
 
-    def list_ocorrencias(self, aluno_id: Optional[int] = None) -> List[OcorrenciaSchema]:
+    def list_ocorrencias(self, aluno_id: Optional[int] = None) -> List[dict]:
         """
         Lists occurrences. Access control should be handled by the caller/controller 
         to decide IF the user can see this aluno_id, but the service handles the filtering.
+        Returns plain dicts (same keys as OcorrenciaSchema) built from column rows.
         """
-        results = self.repository.list_filtered(aluno_id)
-        
-        # Manually mapping to Schema to include convenient strings
-        # Ideally this should be done by the schema or a mapper function
-        schemas = []
-        for o in results:
-            schemas.append(OcorrenciaSchema(
-                id=o.id,
-                aluno_id=o.aluno_id,
-                autor_id=o.autor_id,
-                tipo=o.tipo,
-                descricao=o.descricao,
-                resolvida=o.resolvida,
-                data_ocorrencia=o.data_ocorrencia,
-                created_at=o.created_at,
-                aluno_nome=o.aluno.nome if o.aluno else "Desconhecido",
-                autor_nome=o.autor.username if o.autor else "Sistema"
-            ))
-        return schemas
+        rows = self.repository.list_rows(aluno_id)
+        autores = self.repository.get_autor_names(list({r.autor_id for r in rows}))
+
+        items = []
+        for row in rows:
+            item = row._asdict()
+            item["autor_nome"] = autores.get(row.autor_id, "Sistema")
+            items.append(item)
+        return items
 
     def create(self, data: OcorrenciaCreate) -> OcorrenciaSchema:
         dt = datetime.now()
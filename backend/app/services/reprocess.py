@@ -0,0 +1,247 @@
+"""
+Bulk reprocessing of the boletins already in the upload folder.
+
+``flask reprocess-pdfs`` either enqueues every upload for the RQ workers or,
+with ``--local``, processes them here: a process pool parses the PDFs into
+the parse cache (no DB access) and this process imports them one at a time,
+so the tenant's writes stay serialized as in the queue (no racing inserts of
+the same aluno, no duplicate AcademicYear). Local runs append the content
+hash of each finished file to a checkpoint file, so an interrupted run picks
+up where it stopped.
+"""
+from __future__ import annotations
+
+import os
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Callable, Iterable, Iterator
+
+from loguru import logger
+
+from ..core.config import settings
+from . import upload_store
+
+CHECKPOINT_SUFFIX = ".checkpoint"
+
+
+@dataclass(frozen=True)
+class UploadFile:
+    path: Path
+    digest: str
+    turno: str | None
+    turma: str | None
+
+
+@dataclass
+class ReprocessSummary:
+    processed: int = 0
+    skipped: int = 0
+    failed: int = 0
+    other_year: int = 0
+    alunos: int = 0
+    notas: int = 0
+    seconds: float = 0.0
+    failures: list[tuple[str, str]] = field(default_factory=list)
+
+    def as_dict(self) -> dict:
+        return {
+            "processed": self.processed,
+            "skipped": self.skipped,
+            "failed": self.failed,
+            "other_year": self.other_year,
+            "alunos": self.alunos,
+            "notas": self.notas,
+            "seconds": round(self.seconds, 2),
+            "files_per_second": round(self.processed / self.seconds, 2) if self.seconds else None,
+            "alunos_per_second": round(self.alunos / self.seconds, 1) if self.seconds else None,
+        }
+
+
+def collect_upload_files() -> list[UploadFile]:
+    """
+    Every upload under the upload folder, once per content hash. Turno and
+    turma are taken from ``<turno>/<turma>/<file>.pdf`` when the path has them.
+    """
+    root = Path(settings.upload_folder)
+    files: list[UploadFile] = []
+    seen: set[str] = set()
+    for path in sorted(upload_store.iter_upload_links()):
+        digest = upload_store.upload_digest(path)
+        if digest in seen:
+            continue
+        seen.add(digest)
+        parts = path.relative_to(root).parts
+        files.append(UploadFile(
+            path=path,
+            digest=digest,
+            turno=parts[0] if len(parts) >= 2 else None,
+            turma=parts[1] if len(parts) >= 3 else None,
+        ))
+    return files
+
+
+def default_checkpoint_path(tenant_slug: str, year_label: str | None) -> Path:
+    return upload_store.store_root() / f"reprocess-{tenant_slug}-{year_label or 'all'}{CHECKPOINT_SUFFIX}"
+
+
+class Checkpoint:
+    """Append-only file of finished content hashes, one per line."""
+
+    def __init__(self, path: Path):
+        self.path = path
+        self.done: set[str] = set()
+        if path.exists():
+            self.done = {line.strip() for line in path.read_text().splitlines() if line.strip()}
+
+    def __contains__(self, digest: str) -> bool:
+        return digest in self.done
+
+    def add(self, digest: str) -> None:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.path, "a") as handle:
+            handle.write(f"{digest}\n")
+            handle.flush()
+            os.fsync(handle.fileno())
+        self.done.add(digest)
+
+    def reset(self) -> None:
+        self.path.unlink(missing_ok=True)
+        self.done.clear()
+
+
+def matches_year(path: Path, year_label: str | None) -> bool:
+    """True without a target year or when the boletim's header year is unknown or matches."""
+    if year_label is None:
+        return True
+    from .ingestion import infer_boletim_year
+
+    year = infer_boletim_year(path)
+    return year is None or str(year) == year_label
+
+
+def run_local(
+    files: Iterable[UploadFile],
+    *,
+    tenant_id: int,
+    academic_year_id: int | None,
+    year_label: str | None,
+    checkpoint: Checkpoint,
+    workers: int,
+    on_result: Callable[[UploadFile, dict | None, str | None], None] | None = None,
+) -> ReprocessSummary:
+    """
+    Runs ``process_pdf`` for each file not in the checkpoint, in this process
+    and in order of parse completion; with ``workers`` > 1 the parsing runs
+    ahead in a pool. Each file is its own transaction; a failed file is
+    reported and left out of the checkpoint so the next run retries it.
+    """
+    summary = ReprocessSummary()
+    pending = []
+    for upload in files:
+        if upload.digest in checkpoint:
+            summary.skipped += 1
+        else:
+            pending.append(upload)
+
+    def record(upload: UploadFile, result: dict | None, error: str | None) -> None:
+        if error is not None:
+            summary.failed += 1
+            summary.failures.append((str(upload.path), error))
+        elif result.get("other_year"):
+            summary.other_year += 1
+            checkpoint.add(upload.digest)
+        else:
+            summary.processed += 1
+            summary.alunos += result.get("count", 0)
+            summary.notas += result.get("stats", {}).get("notas", 0)
+            checkpoint.add(upload.digest)
+        if on_result is not None:
+            on_result(upload, result, error)
+
+    started = time.perf_counter()
+    args = dict(tenant_id=tenant_id, academic_year_id=academic_year_id, year_label=year_label)
+    if workers <= 1:
+        _init_worker(dispose_engine=False)
+        for upload in pending:
+            try:
+                record(upload, reprocess_one(upload, **args), None)
+            except Exception as exc:
+                logger.exception("Reprocessing {} failed", upload.path)
+                record(upload, None, str(exc))
+    else:
+        _init_worker(dispose_engine=False)
+        for upload, parsed, error in _run_pool(pending, workers, year_label):
+            if error is None and parsed.get("other_year"):
+                record(upload, parsed, None)
+                continue
+            if error is None:
+                try:
+                    # Parse cache hit: only the DB writes happen here.
+                    record(upload, reprocess_one(upload, **args), None)
+                    continue
+                except Exception as exc:
+                    logger.exception("Reprocessing {} failed", upload.path)
+                    error = str(exc)
+            record(upload, None, error)
+    summary.seconds = time.perf_counter() - started
+    logger.info("Reprocessed uploads: {}", summary.as_dict())
+    return summary
+
+
+def _run_pool(pending: list[UploadFile], workers: int, year_label: str | None) -> Iterator[tuple[UploadFile, dict | None, str | None]]:
+    # Keep at most 2 * workers files in flight so a large folder is not queued up front.
+    queue = iter(pending)
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) as pool:
+        in_flight = {}
+        for upload in queue:
+            in_flight[pool.submit(parse_one, upload, year_label)] = upload
+            if len(in_flight) >= workers * 2:
+                break
+        while in_flight:
+            done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+            for future in done:
+                upload = in_flight.pop(future)
+                try:
+                    yield upload, future.result(), None
+                except Exception as exc:
+                    yield upload, None, str(exc)
+                next_upload = next(queue, None)
+                if next_upload is not None:
+                    in_flight[pool.submit(parse_one, next_upload, year_label)] = next_upload
+
+
+def _init_worker(dispose_engine: bool = True) -> None:
+    from ..core.database import engine
+    from ..core.hashing import password_hasher
+
+    # Parallelism comes from the files: no nested page or bcrypt pools.
+    settings.ingestion_workers = 1
+    password_hasher.workers = 1
+    if dispose_engine:
+        # Connections inherited through fork belong to the parent.
+        engine.dispose(close=False)
+
+
+def parse_one(upload: UploadFile, year_label: str | None) -> dict:
+    """Pool entry point: fills the parse cache for one boletim; never touches the DB."""
+    from .ingestion import warm_parse_cache
+
+    if not matches_year(upload.path, year_label):
+        return {"other_year": True}
+    return {"parsed": warm_parse_cache(upload.path, turno=upload.turno, turma=upload.turma)}
+
+
+def reprocess_one(upload: UploadFile, *, tenant_id: int, academic_year_id: int | None, year_label: str | None) -> dict:
+    """Imports one boletim, or reports it as belonging to another year."""
+    from .ingestion import process_pdf
+
+    if not matches_year(upload.path, year_label):
+        return {"other_year": True}
+    result = process_pdf(
+        upload.path, turno=upload.turno, turma=upload.turma,
+        tenant_id=tenant_id, academic_year_id=academic_year_id,
+    )
+    # The logs can be long; the parent only needs the counters.
+    return {key: result[key] for key in ("count", "stats", "skipped") if key in result}
@@ -0,0 +1,253 @@
+"""
+Risk model artifacts, per tenant and version.
+
+    <RISK_MODEL_DIR>/<scope>/<version>.coef   coefficients (JSON: features, weights, intercept)
+    <RISK_MODEL_DIR>/<scope>/<version>.json   metadata (training size, accuracy, feature schema hash)
+    <RISK_MODEL_DIR>/<scope>/ACTIVE           the version used for scoring
+
+``<scope>`` is the tenant id, or ``global`` for a model trained on every
+tenant (scoring falls back to it for tenants without a model). Every file is
+written under a temporary name and renamed, model first and ACTIVE last, so
+a reader never sees a partial artifact. ``ModelCache`` keeps the active
+models in memory; see ``ai_predictor`` for training and scoring.
+
+Models are stored as ``LinearRiskModel`` (plain coefficients scored with
+NumPy), not as pickled estimators: loading and scoring them needs neither
+sklearn nor pandas, so web processes never import either. Versions written
+as ``.pkl`` by older releases are not loaded; the next training replaces them.
+"""
+from __future__ import annotations
+
+import json
+import os
+import threading
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Callable, Sequence
+from uuid import uuid4
+
+import numpy as np
+from loguru import logger
+
+from ..core.config import settings
+from ..core.exceptions import NotFoundError
+
+GLOBAL_SCOPE = "global"
+ACTIVE_FILENAME = "ACTIVE"
+# Versions kept per scope besides the active one.
+KEEP_VERSIONS = 5
+# How long a cached model is trusted before ACTIVE is read again.
+ACTIVE_CHECK_SECONDS = 30.0
+MODEL_SUFFIX = ".coef"
+
+
+class LinearRiskModel:
+    """
+    A fitted binary logistic regression as coefficients: ``predict_proba``
+    is ``sigmoid(X @ weights + intercept)``, the same probabilities sklearn's
+    ``LogisticRegression.predict_proba`` gives for the positive class.
+    """
+
+    __slots__ = ("features", "weights", "intercept")
+
+    def __init__(self, features: Sequence[str], weights: Sequence[float], intercept: float):
+        self.features = list(features)
+        self.weights = np.asarray(weights, dtype=np.float64)
+        self.intercept = float(intercept)
+        if self.weights.shape != (len(self.features),):
+            raise ValueError(f"{len(self.features)} features but weights of shape {self.weights.shape}")
+
+    @classmethod
+    def from_estimator(cls, estimator: Any, features: Sequence[str]) -> "LinearRiskModel":
+        """From a fitted binary ``LogisticRegression`` (read through its attributes; sklearn is not imported)."""
+        if len(estimator.classes_) != 2:
+            raise ValueError(f"expected a binary classifier, got classes {list(estimator.classes_)}")
+        return cls(features, estimator.coef_[0], estimator.intercept_[0])
+
+    def predict_proba(self, X: np.ndarray) -> np.ndarray:
+        """Probability of the positive class per row of X (columns in ``features`` order)."""
+        z = np.asarray(X, dtype=np.float64) @ self.weights + self.intercept
+        # 1 / (1 + exp(-z)) without overflow for large |z|.
+        return np.exp(-np.logaddexp(0.0, -z))
+
+    def to_json(self) -> bytes:
+        return json.dumps({
+            "features": self.features,
+            "weights": self.weights.tolist(),
+            "intercept": self.intercept,
+        }).encode()
+
+    @classmethod
+    def from_json(cls, data: bytes | str) -> "LinearRiskModel":
+        raw = json.loads(data)
+        return cls(raw["features"], raw["weights"], raw["intercept"])
+
+
+def model_root() -> Path:
+    return Path(settings.risk_model_dir)
+
+
+def scope_name(tenant_id: int | None) -> str:
+    return GLOBAL_SCOPE if tenant_id is None else str(tenant_id)
+
+
+def parse_scope(scope: str) -> int | None:
+    """Inverse of ``scope_name``; raises ValueError for anything else."""
+    return None if scope == GLOBAL_SCOPE else int(scope)
+
+
+def _write_atomic(path: Path, data: bytes) -> None:
+    tmp_path = path.with_name(f"{path.name}.{uuid4().hex}.tmp")
+    with open(tmp_path, "wb") as f:
+        f.write(data)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+
+def _new_version() -> str:
+    # Sorts chronologically (to the microsecond).
+    now = datetime.now(timezone.utc)
+    return f"{now:%Y%m%dT%H%M%S}-{now:%f}{uuid4().hex[:4]}"
+
+
+def active_version(tenant_id: int | None) -> str | None:
+    try:
+        return (model_root() / scope_name(tenant_id) / ACTIVE_FILENAME).read_text().strip() or None
+    except OSError:
+        return None
+
+
+def save_model(
+    tenant_id: int | None, model: LinearRiskModel, meta: dict[str, Any], *, activate: bool = True
+) -> dict[str, Any]:
+    """Stores a new version of the tenant's model and (by default) activates it; returns its metadata."""
+    directory = model_root() / scope_name(tenant_id)
+    directory.mkdir(parents=True, exist_ok=True)
+    version = _new_version()
+    meta = {
+        **meta,
+        "version": version,
+        "tenant_id": tenant_id,
+        "trained_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+    }
+    _write_atomic(directory / f"{version}{MODEL_SUFFIX}", model.to_json())
+    _write_atomic(directory / f"{version}.json", json.dumps(meta, indent=2).encode())
+    if activate:
+        _write_atomic(directory / ACTIVE_FILENAME, version.encode())
+        models.invalidate(tenant_id)
+    _prune(directory)
+    logger.info("Saved risk model {} for {}", version, scope_name(tenant_id))
+    return meta
+
+
+def list_versions(tenant_id: int | None) -> list[dict[str, Any]]:
+    """Metadata of every stored version, newest first, with an ``active`` flag."""
+    directory = model_root() / scope_name(tenant_id)
+    active = active_version(tenant_id)
+    versions = []
+    for path in sorted(directory.glob("*.json"), reverse=True):
+        try:
+            meta = json.loads(path.read_text())
+        except (OSError, ValueError):
+            continue
+        versions.append({**meta, "active": meta.get("version") == active})
+    return versions
+
+
+def list_scopes() -> list[str]:
+    root = model_root()
+    if not root.is_dir():
+        return []
+    return sorted(path.name for path in root.iterdir() if path.is_dir())
+
+
+def activate_version(tenant_id: int | None, version: str) -> dict[str, Any]:
+    """Points the tenant's ACTIVE at a stored version (e.g. to roll back a retrain)."""
+    directory = model_root() / scope_name(tenant_id)
+    meta_path = directory / f"{version}.json"
+    if version != Path(version).name or not meta_path.is_file() or not (directory / f"{version}{MODEL_SUFFIX}").is_file():
+        raise NotFoundError("Versão do modelo", version)
+    _write_atomic(directory / ACTIVE_FILENAME, version.encode())
+    models.invalidate(tenant_id)
+    logger.info("Activated risk model {} for {}", version, scope_name(tenant_id))
+    return {**json.loads(meta_path.read_text()), "active": True}
+
+
+def _prune(directory: Path) -> None:
+    active = (directory / ACTIVE_FILENAME).read_text().strip() if (directory / ACTIVE_FILENAME).exists() else None
+    versions = sorted((path.stem for path in directory.glob("*.json")), reverse=True)
+    for version in [v for v in versions if v != active][KEEP_VERSIONS:]:
+        for suffix in (MODEL_SUFFIX, ".pkl", ".json"):
+            (directory / f"{version}{suffix}").unlink(missing_ok=True)
+
+
+class _Entry:
+    __slots__ = ("version", "model", "meta", "checked_at")
+
+    def __init__(self, version: str | None, model: Any, meta: dict[str, Any] | None, checked_at: float):
+        self.version = version
+        self.model = model
+        self.meta = meta
+        self.checked_at = checked_at
+
+
+class ModelCache:
+    """
+    Active model per scope, in memory. ACTIVE is re-read at most every
+    ``check_seconds`` per scope (so scoring does no disk I/O per request) and
+    the artifact only when it names another version. Versions activated in
+    this process are picked up at once; in other processes within
+    ``check_seconds``.
+    """
+
+    def __init__(self, check_seconds: float = ACTIVE_CHECK_SECONDS, clock: Callable[[], float] = time.monotonic):
+        self.check_seconds = check_seconds
+        self.clock = clock
+        self._lock = threading.Lock()
+        self._entries: dict[str, _Entry] = {}
+
+    def get(self, tenant_id: int | None) -> tuple[LinearRiskModel, dict[str, Any]] | None:
+        """``(model, meta)`` of the active version, or None when the scope has none."""
+        scope = scope_name(tenant_id)
+        now = self.clock()
+        entry = self._entries.get(scope)
+        if entry is None or now - entry.checked_at >= self.check_seconds:
+            with self._lock:
+                entry = self._entries.get(scope)
+                if entry is None or now - entry.checked_at >= self.check_seconds:
+                    entry = self._load(tenant_id, entry, now)
+                    self._entries[scope] = entry
+        return (entry.model, entry.meta) if entry.model is not None else None
+
+    def _load(self, tenant_id: int | None, previous: _Entry | None, now: float) -> _Entry:
+        version = active_version(tenant_id)
+        if previous is not None and previous.version == version:
+            previous.checked_at = now
+            return previous
+        if version is None:
+            return _Entry(None, None, None, now)
+        directory = model_root() / scope_name(tenant_id)
+        try:
+            model = LinearRiskModel.from_json((directory / f"{version}{MODEL_SUFFIX}").read_bytes())
+            meta = json.loads((directory / f"{version}.json").read_text())
+        except (OSError, ValueError, KeyError, TypeError) as exc:
+            logger.error("Could not load risk model {} for {}: {}", version, scope_name(tenant_id), exc)
+            if previous is None:
+                return _Entry(None, None, None, now)
+            previous.checked_at = now
+            return previous
+        logger.info("Loaded risk model {} for {}", version, scope_name(tenant_id))
+        return _Entry(version, model, meta, now)
+
+    def invalidate(self, tenant_id: int | None) -> None:
+        with self._lock:
+            self._entries.pop(scope_name(tenant_id), None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+models = ModelCache()
@@ -0,0 +1,134 @@
+"""
+Precomputed risk scores per aluno/year (``RiskScore``).
+
+``refresh_risk_scores`` recomputes them in bulk, as a maintenance job, when
+the tenant's model is retrained (which every import that changes grades
+requests) or another version is activated. The teacher dashboard, ``/alunos`` and the
+chat only read the stored scores: no inference on the request path.
+``RISK_ALERT`` and ``HIGH_RISK`` are the one definition of "at risk".
+"""
+from __future__ import annotations
+
+import time
+from datetime import datetime
+from typing import Iterable
+
+from loguru import logger
+from sqlalchemy import select
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+
+from ..core.cache import cache_delete_pattern
+from ..core.config import settings
+from ..core.database import SessionLocal, session_scope
+from ..models import Aluno, RiskScore
+
+# Probability from which an aluno is listed as at risk / flagged for dropout.
+RISK_ALERT = 0.5
+HIGH_RISK = 0.75
+# Alunos scored (and upserted) per round.
+REFRESH_CHUNK_SIZE = 500
+
+
+def refresh_risk_scores(
+    tenant_id: int,
+    academic_year_id: int | None = None,
+    turmas: Iterable[str] | None = None,
+) -> dict[str, int | float | str | None]:
+    """
+    Job: scores the tenant's alunos (of one year and/or turmas, when given)
+    with its active model and upserts one ``RiskScore`` per aluno/year.
+    Without a model nothing is written (training gets scheduled instead).
+    """
+    from .ai_predictor import score_alunos
+
+    started = time.perf_counter()
+    stm = select(Aluno.id, Aluno.academic_year_id).where(Aluno.tenant_id == tenant_id).order_by(Aluno.id)
+    if academic_year_id is not None:
+        stm = stm.where(Aluno.academic_year_id == academic_year_id)
+    turmas = sorted(set(turmas)) if turmas is not None else None
+    if turmas is not None:
+        stm = stm.where(Aluno.turma.in_(turmas))
+    with SessionLocal() as session:
+        years = dict(session.execute(stm).all())
+
+    ids = list(years)
+    written = 0
+    version = None
+    for start in range(0, len(ids), REFRESH_CHUNK_SIZE):
+        scores, version = score_alunos(ids[start:start + REFRESH_CHUNK_SIZE], tenant_id)
+        if not scores:
+            break
+        now = datetime.utcnow()
+        rows = [
+            {
+                "aluno_id": aluno_id,
+                "score": score,
+                "model_version": version,
+                "computed_at": now,
+                "tenant_id": tenant_id,
+                "academic_year_id": years[aluno_id],
+            }
+            for aluno_id, score in scores.items()
+        ]
+        with session_scope() as session:
+            _upsert(session, rows)
+        written += len(rows)
+
+    if written:
+        cache_delete_pattern(f"dashboard_professor:{tenant_id}:*")
+        # Chat answers are keyed by the data version, which a refresh does not bump.
+        cache_delete_pattern(f"chat:{tenant_id}:*")
+    seconds = round(time.perf_counter() - started, 3)
+    logger.info(
+        "Refreshed {} risk scores for tenant {} (year {}, turmas {}) with model {} in {}s",
+        written, tenant_id, academic_year_id, turmas, version, seconds,
+    )
+    return {"alunos": written, "model_version": version, "seconds": seconds}
+
+
+def _upsert(session, rows: list[dict]) -> None:
+    insert_fn = postgresql_insert if session.get_bind().dialect.name == "postgresql" else sqlite_insert
+    stmt = insert_fn(RiskScore.__table__)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=["aluno_id", "academic_year_id"],
+        set_={column: stmt.excluded[column] for column in ("score", "model_version", "computed_at", "tenant_id")},
+    )
+    session.execute(stmt, rows)
+
+
+def request_risk_refresh(
+    tenant_id: int,
+    academic_year_id: int | None = None,
+    turmas: Iterable[str] | None = None,
+) -> str | None:
+    """Schedules ``refresh_risk_scores`` at maintenance priority; a queue outage only delays it."""
+    from ..core.jobs import submit_job
+
+    turmas = sorted(set(turmas)) if turmas is not None else None
+    try:
+        return submit_job(
+            refresh_risk_scores, (tenant_id, academic_year_id, turmas),
+            tenant_id=tenant_id, priority="maintenance", job_timeout=1800,
+        )
+    except Exception as exc:
+        logger.warning("Could not enqueue risk score refresh for tenant {}: {}", tenant_id, exc)
+        return None
+
+
+def after_ingestion(tenant_id: int | None, academic_year_id: int | None, turmas: Iterable[str] | None) -> None:
+    """
+    An import changed these turmas' grades: retrain the tenant's model, which
+    rescores the whole tenant. When a training is already pending (the request
+    is deduplicated) it may have read the grades before this import, so only
+    these turmas are rescored. RISK_REFRESH_AFTER_INGESTION, off by default in tests.
+    """
+    enabled = settings.risk_refresh_after_ingestion
+    if enabled is None:
+        enabled = settings.environment != "test"
+    if not enabled or tenant_id is None:
+        return
+    from .ai_predictor import request_training
+
+    if request_training(tenant_id) is None:
+        request_risk_refresh(tenant_id, academic_year_id, turmas)
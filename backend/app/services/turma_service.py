@@ -1,26 +1,23 @@
 from unicodedata import normalize
-from statistics import mean
-from typing import Optional, List, Dict
+from typing import Optional, List
 from sqlalchemy.orm import Session
 
+from app.core.cache import cache_delete
 from app.repositories.turma_repository import TurmaRepository
 from app.schemas.turma import (
     TurmaListResponse, 
-    TurmaSummarySchema, 
-    TurmaDetailResponse, 
-    AlunoTurmaDetailSchema,
-    NotaSimplificadaSchema
+    TurmaSummarySchema
 )
-from app.models import Nota
+
+# Nota columns of TurmaRepository.get_detail_rows exposed per grade
+_NOTA_FIELDS = ("disciplina", "trimestre1", "trimestre2", "trimestre3", "total", "faltas", "situacao")
 
 class TurmaService:
     def __init__(self, session: Session):
         self.repository = TurmaRepository(session)
 
     def _slugify(self, value: str) -> str:
-        normalized = normalize("NFKD", value).encode("ascii", "ignore").decode("ascii")
-        slug = "".join(ch if ch.isalnum() else "-" for ch in normalized.strip().lower())
-        return "-".join(filter(None, slug.split("-")))
+        return _slugify(value)
 
     def list_turmas(self) -> TurmaListResponse:
         rows = self.repository.get_summaries()
@@ -39,82 +36,62 @@ class TurmaService:
         
         return TurmaListResponse(items=items, total=len(items))
 
-    def get_turma_detail(self, turma_nome_or_slug: str) -> Optional[TurmaDetailResponse]:
+    def get_turma_detail(
+        self,
+        turma_nome_or_slug: str,
+        tenant_id: Optional[int] = None,
+        academic_year_id: Optional[int] = None,
+    ) -> Optional[dict]:
         turma_real = self.repository.get_real_name(turma_nome_or_slug, self._slugify)
         if not turma_real:
             return None
 
-        alunos = self.repository.get_alunos_by_turma(turma_real)
-        if not alunos:
-            return TurmaDetailResponse(turma=turma_real, turno="", total=0, alunos=[])
+        rows = self.repository.get_detail_rows(turma_real, tenant_id, academic_year_id)
+        if not rows:
+            return {"turma": turma_real, "turno": "", "total": 0, "alunos": []}
 
-        aluno_ids = [a.id for a in alunos]
-        notas = self.repository.get_notas_for_alunos(aluno_ids)
+        # Rows come ordered by aluno; media/situacao are already computed in SQL.
+        alunos_payload: List[dict] = []
+        current: Optional[dict] = None
+        for row in rows:
+            if current is None or current["id"] != row.id:
+                current = {
+                    "id": row.id,
+                    "nome": row.nome,
+                    "matricula": row.matricula,
+                    "turma": row.turma,
+                    "turno": row.turno,
+                    "media": round(row.media, 1) if row.media is not None else None,
+                    "situacao": row.situacao_aluno,
+                    "notas": [],
+                }
+                alunos_payload.append(current)
+            if row.nota_id is not None:
+                current["notas"].append({field: getattr(row, field) for field in _NOTA_FIELDS})
 
-        notas_por_aluno: Dict[int, List[Nota]] = {aid: [] for aid in aluno_ids}
-        for nota in notas:
-            notas_por_aluno[nota.aluno_id].append(nota)
+        return {
+            "turma": turma_real,
+            "turno": alunos_payload[0]["turno"],
+            "total": len(alunos_payload),
+            "alunos": alunos_payload,
+        }
 
-        alunos_payload = []
-        for aluno in alunos:
-            notas_aluno = notas_por_aluno.get(aluno.id, [])
-            media_total = self._calcular_media(notas_aluno)
-            situacao = self._calcular_situacao(notas_aluno)
-            
-            # Map Nota model to Schema
-            notas_schema = [
-                NotaSimplificadaSchema(
-                    disciplina=n.disciplina,
-                    trimestre1=float(n.trimestre1) if n.trimestre1 is not None else None,
-                    trimestre2=float(n.trimestre2) if n.trimestre2 is not None else None,
-                    trimestre3=float(n.trimestre3) if n.trimestre3 is not None else None,
-                    total=float(n.total) if n.total is not None else None,
-                    faltas=n.faltas,
-                    situacao=n.situacao
-                ) for n in notas_aluno
-            ]
 
-            alunos_payload.append(
-                AlunoTurmaDetailSchema(
-                    id=aluno.id,
-                    nome=aluno.nome,
-                    matricula=aluno.matricula,
-                    turma=aluno.turma,
-                    turno=aluno.turno,
-                    media=media_total,
-                    situacao=situacao,
-                    notas=notas_schema
-                )
-            )
+def turma_detail_cache_key(tenant_id: Optional[int], academic_year_id: Optional[int], turma: str) -> str:
+    """Cache key for ``GET /turmas/<turma>/alunos``; keyed by slug so names and slugs share it."""
+    return f"cache:{tenant_id}:{academic_year_id}:turma_detail:{_slugify(turma)}"
 
-        return TurmaDetailResponse(
-            turma=turma_real,
-            turno=alunos[0].turno,
-            total=len(alunos_payload),
-            alunos=alunos_payload
-        )
 
-    def _calcular_media(self, notas: List[Nota]) -> Optional[float]:
-        valores = [float(n.total) for n in notas if n.total is not None]
-        if not valores:
-            return None
-        return round(mean(valores), 1)
-
-    def _calcular_situacao(self, notas: List[Nota]) -> str:
-        situacoes = [str(n.situacao).upper() for n in notas if n.situacao]
-        if not situacoes:
-            return "APR" # Default to APR if no data? Or unknown. Logic copied from orig.
-            
-        if any(sit in {"REP", "REPROVADO"} for sit in situacoes):
-            return "REP"
-        
-        if any(sit not in {"APR", "APROVADO", "ACC", "APCC", "AR"} for sit in situacoes):
-            return "REC"
-            
-        if any(sit in {"ACC", "APCC"} for sit in situacoes):
-            return "APCC"
+def invalidate_turma_cache(tenant_id: Optional[int], academic_year_id: Optional[int], *turmas: Optional[str]) -> None:
+    """Drops the cached detail of the given turmas (also the entry cached without a year)."""
+    keys = set()
+    for turma in filter(None, turmas):
+        keys.add(turma_detail_cache_key(tenant_id, academic_year_id, turma))
+        keys.add(turma_detail_cache_key(tenant_id, None, turma))
+    cache_delete(*keys)
 
-        if any(sit == "AR" for sit in situacoes):
-            return "AR"
 
-        return "APR"
+def _slugify(value: str) -> str:
+    normalized = normalize("NFKD", value).encode("ascii", "ignore").decode("ascii")
+    slug = "".join(ch if ch.isalnum() else "-" for ch in normalized.strip().lower())
+    return "-".join(filter(None, slug.split("-")))
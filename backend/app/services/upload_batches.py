@@ -0,0 +1,216 @@
+"""
+Batch uploads: many boletins (loose PDFs or ZIP archives) stored and fanned
+out as one ingestion job per file, tracked under a single batch id. The
+request only stores the files; each job reads its PDF's turma/turno.
+"""
+from __future__ import annotations
+
+import json
+import time
+import zipfile
+from collections import Counter
+from pathlib import Path
+from typing import Any, BinaryIO, Iterable, Iterator
+from uuid import uuid4
+
+from loguru import logger
+from werkzeug.utils import secure_filename
+
+from ..core.config import settings
+from ..core.jobs import current_job, fetch_jobs, load_record, save_record, submit_job
+from . import upload_store
+from .ingestion import infer_turma_turno, process_pdf
+from .job_progress import JobProgress
+
+# Uncompressed size limit per ZIP member, against archive bombs.
+MAX_MEMBER_BYTES = 100 * 1024 * 1024
+TERMINAL_STATUSES = {"finished", "failed", "stopped", "canceled", "expired"}
+
+
+def batch_key(batch_id: str) -> str:
+    return f"uploads:batch:{batch_id}"
+
+
+def create_batch(
+    uploads: Iterable[tuple[str, BinaryIO]],
+    *,
+    tenant_id: int | None,
+    academic_year_id: int | None,
+    turno: str | None = None,
+    turma: str | None = None,
+) -> dict[str, Any]:
+    """
+    Stores every PDF by content and enqueues one ``process_batch_file`` job
+    per file; reading the PDF (turma/turno) happens in the job, not in the
+    request. ``turno``/``turma`` are used only when the PDF does not name them.
+    Returns the batch record (accepted files with job ids, rejected ones with a reason).
+    """
+    batch_id = uuid4().hex
+    accepted: list[dict[str, Any]] = []
+    rejected: list[dict[str, str]] = []
+    names: set[str] = set()
+    try:
+        for filename, stream, error in _expand(uploads):
+            if error:
+                rejected.append({"filename": filename, "error": error})
+                continue
+            if len(accepted) >= settings.upload_batch_max_files:
+                rejected.append({"filename": filename, "error": "limite de arquivos por lote excedido"})
+                continue
+
+            try:
+                # ZIP members are inflated while stored: a damaged one fails here
+                # (zlib.error, BadZipFile, NotImplementedError for unknown methods...).
+                blob, digest = upload_store.save_upload(stream, None)
+            except Exception as exc:
+                logger.warning("Could not store {} in batch {}: {}", filename, batch_id, exc)
+                rejected.append({"filename": filename, "error": "arquivo corrompido"})
+                continue
+
+            link_name = filename
+            if filename in names:
+                # Same name for a different file in this batch (e.g. two ZIPs): keep both.
+                link_name = f"{Path(filename).stem}-{digest[:8]}{Path(filename).suffix}"
+            names.add(link_name)
+            job_id = submit_job(
+                process_batch_file,
+                (blob, link_name),
+                {"turno": turno, "turma": turma, "tenant_id": tenant_id, "academic_year_id": academic_year_id},
+                tenant_id=tenant_id,
+                priority="bulk",
+                job_timeout=600,
+                meta={"batch_id": batch_id, "filename": filename},
+            )
+            accepted.append({"filename": filename, "sha256": digest, "job_id": job_id})
+    finally:
+        # Saved even if the loop breaks: the jobs already enqueued stay trackable.
+        record = {
+            "batch_id": batch_id,
+            "tenant_id": tenant_id,
+            "created_at": time.time(),
+            "files": accepted,
+            "rejected": rejected,
+        }
+        if accepted:
+            save_record(batch_key(batch_id), json.dumps(record), settings.upload_batch_ttl)
+    logger.info("Batch {}: {} files enqueued, {} rejected", batch_id, len(accepted), len(rejected))
+    return record
+
+
+def process_batch_file(
+    blob: Path,
+    link_name: str,
+    *,
+    turno: str | None = None,
+    turma: str | None = None,
+    tenant_id: int | None = None,
+    academic_year_id: int | None = None,
+) -> dict[str, Any]:
+    """
+    Job of one batch file: reads turma/turno from the PDF (``turno``/``turma``
+    as fallback), links the upload under ``<turno>/<turma>/<link_name>`` and
+    ingests it. The turma/turno used are kept in the job meta for ``batch_status``.
+    """
+    progress = JobProgress.for_current_job()
+    try:
+        try:
+            inferred_turma, inferred_turno = infer_turma_turno(blob)
+        except Exception as exc:
+            raise ValueError("PDF ilegível") from exc
+        file_turma = inferred_turma or turma
+        file_turno = inferred_turno or turno
+        if not file_turma or not file_turno:
+            raise ValueError("turma/turno não encontrados no PDF")
+    except ValueError as exc:
+        progress.fail(str(exc))
+        raise
+
+    job = current_job()
+    if job is not None:
+        job.meta.update(turma=file_turma, turno=file_turno)
+        job.save_meta()
+    link = Path(settings.upload_folder) / upload_store.path_segment(file_turno) / upload_store.path_segment(file_turma) / link_name
+    upload_store.link_upload(blob, link)
+    return process_pdf(link, turno=file_turno, turma=file_turma, tenant_id=tenant_id, academic_year_id=academic_year_id)
+
+
+def batch_status(batch_id: str, tenant_id: int | None) -> dict[str, Any] | None:
+    """Aggregate state of a batch, or None when it is unknown (or belongs to another tenant)."""
+    raw = load_record(batch_key(batch_id))
+    if raw is None:
+        return None
+    record = json.loads(raw)
+    if record["tenant_id"] != tenant_id:
+        return None
+
+    files = record["files"]
+    jobs = fetch_jobs([entry["job_id"] for entry in files])
+    counts: Counter[str] = Counter()
+    alunos = 0
+    items = []
+    for entry, job in zip(files, jobs):
+        status = str(job.get_status(refresh=False)) if job is not None else "expired"
+        counts[status] += 1
+        item = {**entry, "status": status, "progress": job.meta.get("progress") if job is not None else None}
+        if job is not None:
+            # Known once the job has read the PDF.
+            item.update(turma=job.meta.get("turma"), turno=job.meta.get("turno"))
+        if status == "finished" and isinstance(job.result, dict):
+            result = job.result
+            alunos += result.get("count", 0)
+            item["result"] = {
+                "count": result.get("count", 0),
+                "skipped": result.get("skipped", False),
+                "diff": {key: value for key, value in (result.get("diff") or {}).items() if key != "changes"},
+                "warnings": len(result.get("logs") or []),
+            }
+        elif status == "failed" and job is not None:
+            latest = job.latest_result()
+            if latest is not None and latest.exc_string:
+                item["error"] = latest.exc_string.strip().splitlines()[-1]
+        items.append(item)
+
+    done = sum(counts[status] for status in TERMINAL_STATUSES)
+    return {
+        "batch_id": batch_id,
+        "status": "finished" if done == len(files) else "running",
+        "total": len(files),
+        "done": done,
+        "counts": dict(counts),
+        "alunos": alunos,
+        "files": items,
+        "rejected": record["rejected"],
+    }
+
+
+def _expand(uploads: Iterable[tuple[str, BinaryIO]]) -> Iterator[tuple[str, BinaryIO | None, str | None]]:
+    """Yields ``(filename, stream, error)`` for each PDF, unpacking ZIP archives."""
+    for name, stream in uploads:
+        filename = secure_filename(Path(name).name)
+        if filename.lower().endswith(".zip"):
+            yield from _zip_members(filename, stream)
+        elif filename.lower().endswith(".pdf"):
+            yield filename, stream, None
+        else:
+            yield filename or name, None, "apenas arquivos PDF ou ZIP"
+
+
+def _zip_members(archive_name: str, stream: BinaryIO) -> Iterator[tuple[str, BinaryIO | None, str | None]]:
+    try:
+        archive = zipfile.ZipFile(stream)
+    except zipfile.BadZipFile:
+        yield archive_name, None, "ZIP inválido"
+        return
+    with archive:
+        for info in archive.infolist():
+            member = Path(info.filename)
+            if info.is_dir() or "__MACOSX" in member.parts or member.name.startswith("."):
+                continue
+            filename = secure_filename(member.name)
+            if not filename.lower().endswith(".pdf"):
+                continue
+            if info.file_size > MAX_MEMBER_BYTES:
+                yield filename, None, "arquivo muito grande"
+                continue
+            with archive.open(info) as member_stream:
+                yield filename, member_stream, None
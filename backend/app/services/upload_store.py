@@ -0,0 +1,189 @@
+"""
+Content-addressed storage for uploaded boletins.
+
+Blobs live in ``<UPLOAD_FOLDER>/.store/blobs/<aa>/<sha256>.pdf``; the familiar
+``<turno>/<turma>/<filename>`` path is a link to the blob, so identical
+uploads share one file. Derived data (e.g. parse results) is kept in
+sidecar files next to the blob and removed with it by ``collect_garbage``.
+"""
+from __future__ import annotations
+
+import hashlib
+import os
+import re
+import shutil
+import time
+from pathlib import Path
+from typing import BinaryIO
+from uuid import uuid4
+
+from loguru import logger
+
+from ..core.config import settings
+
+STORE_DIRNAME = ".store"
+CHUNK_SIZE = 1024 * 1024
+# Temp files older than this are leftovers of interrupted uploads.
+STALE_TMP_SECONDS = 3600
+# Unreferenced blobs younger than this are kept: dry-run uploads and ZIP
+# members are enqueued by blob path and may not have been processed yet.
+STALE_BLOB_SECONDS = 24 * 3600
+
+
+def store_root() -> Path:
+    return Path(settings.upload_folder) / STORE_DIRNAME
+
+
+def path_segment(value: str) -> str:
+    """Directory name for a turno/turma under the upload folder."""
+    slug = re.sub(r"[^0-9A-Za-z_-]+", "-", value.strip())
+    return slug or "geral"
+
+
+def blob_path(digest: str) -> Path:
+    return store_root() / "blobs" / digest[:2] / f"{digest}.pdf"
+
+
+def sidecar_path(digest: str, name: str) -> Path:
+    return store_root() / "blobs" / digest[:2] / f"{digest}.{name}"
+
+
+def file_digest(path: Path) -> str:
+    sha = hashlib.sha256()
+    with open(path, "rb") as handle:
+        for chunk in iter(lambda: handle.read(CHUNK_SIZE), b""):
+            sha.update(chunk)
+    return sha.hexdigest()
+
+
+def save_upload(stream: BinaryIO, link_path: Path | None) -> tuple[Path, str]:
+    """
+    Stores the stream by content and points ``link_path`` at the blob; returns
+    ``(blob, digest)``. Without a link the blob is unreferenced and left for
+    ``collect_garbage`` (used for dry runs).
+    """
+    tmp_dir = store_root() / "tmp"
+    tmp_dir.mkdir(parents=True, exist_ok=True)
+    tmp_path = tmp_dir / uuid4().hex
+    sha = hashlib.sha256()
+    with open(tmp_path, "wb") as handle:
+        for chunk in iter(lambda: stream.read(CHUNK_SIZE), b""):
+            sha.update(chunk)
+            handle.write(chunk)
+    digest = sha.hexdigest()
+
+    blob = blob_path(digest)
+    if blob.exists():
+        tmp_path.unlink()
+        # Restarts the grace period of a blob collect_garbage might be about to take.
+        os.utime(blob)
+        logger.info("Upload {} already stored", digest[:12])
+    else:
+        blob.parent.mkdir(parents=True, exist_ok=True)
+        os.replace(tmp_path, blob)
+    if link_path is not None:
+        link_upload(blob, link_path)
+    return blob, digest
+
+
+def read_sidecar(digest: str, name: str) -> bytes | None:
+    try:
+        return sidecar_path(digest, name).read_bytes()
+    except OSError:
+        return None
+
+
+def write_sidecar(digest: str, name: str, data: bytes) -> None:
+    path = sidecar_path(digest, name)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(f"{path.name}.{uuid4().hex}.tmp")
+    tmp_path.write_bytes(data)
+    os.replace(tmp_path, path)
+
+
+def upload_digest(link: Path) -> str:
+    """Content hash of an upload path; free for symlinked uploads (the blob is named by it)."""
+    if link.is_symlink():
+        blob = Path(os.path.realpath(link))
+        if blob.parent.parent.name == "blobs":
+            return blob.stem
+    return file_digest(link)
+
+
+def iter_upload_links() -> list[Path]:
+    """Every user-visible PDF path under the upload folder (the store itself excluded)."""
+    root = Path(settings.upload_folder)
+    if not root.exists():
+        return []
+    return [
+        path for path in root.rglob("*.pdf")
+        if STORE_DIRNAME not in path.relative_to(root).parts
+    ]
+
+
+def collect_garbage(dry_run: bool = False) -> dict[str, int]:
+    """
+    Removes blobs (and their sidecars) no upload path points to and older
+    than ``STALE_BLOB_SECONDS``, plus stale temp files.
+    """
+    root = store_root()
+    blobs_dir = root / "blobs"
+    referenced: set[str] = set()
+    for link in iter_upload_links():
+        if link.is_symlink():
+            referenced.add(Path(os.path.realpath(link)).stem)
+
+    orphans: dict[str, Path] = {}
+    if blobs_dir.exists():
+        cutoff = time.time() - STALE_BLOB_SECONDS
+        for blob in blobs_dir.glob("*/*.pdf"):
+            if blob.stem in referenced:
+                continue
+            stat = blob.stat()
+            # Hard-linked blobs (no symlink support) are referenced while nlink > 1.
+            if stat.st_nlink <= 1 and stat.st_mtime < cutoff:
+                orphans[blob.stem] = blob
+
+    freed = sum(blob.stat().st_size for blob in orphans.values())
+    removed_sidecars = removed_tmp = 0
+    if blobs_dir.exists():
+        for sidecar in blobs_dir.glob("*/*"):
+            digest = sidecar.name.split(".", 1)[0]
+            if sidecar.suffix == ".pdf" or (digest not in orphans and blob_path(digest).exists()):
+                continue
+            removed_sidecars += 1
+            if not dry_run:
+                sidecar.unlink()
+    if not dry_run:
+        for blob in orphans.values():
+            blob.unlink()
+    removed_blobs = len(orphans)
+
+    tmp_dir = root / "tmp"
+    if tmp_dir.exists():
+        cutoff = time.time() - STALE_TMP_SECONDS
+        for tmp in tmp_dir.iterdir():
+            if tmp.stat().st_mtime < cutoff:
+                removed_tmp += 1
+                if not dry_run:
+                    tmp.unlink()
+
+    logger.info(
+        "Upload store GC{}: {} blobs ({} bytes), {} sidecars, {} temp files",
+        " (dry run)" if dry_run else "", removed_blobs, freed, removed_sidecars, removed_tmp,
+    )
+    return {"blobs": removed_blobs, "bytes": freed, "sidecars": removed_sidecars, "tmp": removed_tmp}
+
+
+def link_upload(blob: Path, link_path: Path) -> None:
+    """Points ``link_path`` at a stored blob (symlink, else hard link, else copy)."""
+    link_path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_link = link_path.with_name(f".{link_path.name}.{uuid4().hex}")
+    try:
+        os.symlink(os.path.relpath(blob, link_path.parent), tmp_link)
+    except OSError:
+        try:
+            os.link(blob, tmp_link)
+        except OSError:
+            shutil.copyfile(blob, tmp_link)
+    os.replace(tmp_link, link_path)
@@ -1,21 +1,34 @@
+import base64
+import json
 from typing import Optional, List
 from sqlalchemy import select, func
 from sqlalchemy.orm import Session
 
 from app.repositories.usuario_repository import UsuarioRepository
-from app.core.security import hash_password, verify_password, generate_tokens
+from app.core.cache import cache_delete_pattern, cache_get, cache_set
+from app.core.security import generate_tokens, hash_password, verify_and_update_password, verify_password
 from app.core.exceptions import AppError, UnauthorizedError, NotFoundError, ValidationError
 from app.models import Usuario, Aluno
 from app.schemas.usuario import UsuarioCreate, UsuarioUpdate, UsuarioSchema, LoginResponse
 
+# Totals are also dropped whenever accounts are created/removed.
+USUARIO_TOTAL_CACHE_TIMEOUT = 300
+
+
 class UsuarioService:
     def __init__(self, session: Session):
         self.repository = UsuarioRepository(session)
 
     def authenticate(self, username: str, password: str, tenant_slug: Optional[str] = None) -> LoginResponse:
         user = self.repository.get_by_username(username)
-        if not user or not verify_password(password, user.password_hash):
+        if not user:
             raise UnauthorizedError("Usuário ou senha inválidos")
+        valid, new_hash = verify_and_update_password(password, user.password_hash)
+        if not valid:
+            raise UnauthorizedError("Usuário ou senha inválidos")
+        if new_hash:
+            # Stored with another BCRYPT_ROUNDS; upgrade while we have the plain password.
+            user.password_hash = new_hash
 
         # If tenant_slug is provided, verify user belongs to it (unless super_admin)
         if tenant_slug and user.role != "super_admin":
@@ -94,15 +107,49 @@ class UsuarioService:
         updated = self.repository.update(user, update_dict)
         return UsuarioSchema.model_validate(updated)
 
-    def list_users(self, page: int, per_page: int, query: str = None, role: str = None) -> dict:
-        skip = (page - 1) * per_page
-        users, total = self.repository.list_filtered(skip, per_page, query, role)
-        
+    def list_users(
+        self,
+        page: int,
+        per_page: int,
+        query: str = None,
+        role: str = None,
+        after: str = None,
+        tenant_id: int = None,
+    ) -> dict:
+        """
+        Read-only listing: keyset pagination when ``after`` (the previous
+        page's ``next_cursor``) is given, offset by ``page`` otherwise. The
+        total is cached per tenant/filter; see ``invalidate_usuario_totals``.
+        """
+        cursor = _decode_cursor(after) if after else None
+        rows = self.repository.list_page(
+            limit=per_page,
+            after=cursor,
+            skip=0 if cursor else (page - 1) * per_page,
+            query_text=query,
+            role=role,
+            tenant_id=tenant_id,
+        )
+
+        cache_key = usuario_total_cache_key(tenant_id, role, query)
+        cached = cache_get(cache_key)
+        if cached is not None:
+            total = int(cached)
+        else:
+            total = self.repository.count_filtered(query, role, tenant_id)
+            cache_set(cache_key, str(total), timeout=USUARIO_TOTAL_CACHE_TIMEOUT)
+
+        next_cursor = None
+        if len(rows) == per_page:
+            next_cursor = _encode_cursor(rows[-1].sort_key, rows[-1].id)
         return {
-            "items": [UsuarioSchema.model_validate(u) for u in users],
-            "total": total,
-            "page": page,
-            "per_page": per_page
+            "items": [_serialize_user_row(row) for row in rows],
+            "meta": {
+                "page": page,
+                "per_page": per_page,
+                "total": total,
+                "next_cursor": next_cursor,
+            },
         }
 
     def delete_user(self, user_id: int, current_user_id: int) -> None:
@@ -111,3 +158,46 @@ class UsuarioService:
             
         if not self.repository.delete(user_id):
             raise NotFoundError("Usuário")
+
+
+def _serialize_user_row(row) -> dict:
+    """Builds the UsuarioSchema-shaped dict from a ``UsuarioRepository.list_page`` row."""
+    data = row._asdict()
+    aluno = None
+    if data["aluno_nome"] is not None:
+        aluno = {
+            "id": data["aluno_id"],
+            "nome": data["aluno_nome"],
+            "matricula": data["aluno_matricula"],
+            "turma": data["aluno_turma"],
+            "turno": data["aluno_turno"],
+        }
+    for key in ("aluno_nome", "aluno_matricula", "aluno_turma", "aluno_turno", "sort_key"):
+        del data[key]
+    data["aluno"] = aluno
+    return data
+
+
+def _encode_cursor(sort_key: str, usuario_id: int) -> str:
+    raw = json.dumps([sort_key, usuario_id], separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def _decode_cursor(cursor: str) -> tuple[str, int]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        sort_key, usuario_id = json.loads(raw)
+        return str(sort_key), int(usuario_id)
+    except (ValueError, TypeError):
+        raise ValidationError("Cursor de paginação inválido")
+
+
+def usuario_total_cache_key(tenant_id: Optional[int], role: Optional[str], query_text: Optional[str]) -> str:
+    return f"cache:{tenant_id}:usuarios_total:{role or ''}:{(query_text or '').strip().lower()}"
+
+
+def invalidate_usuario_totals(tenant_id: Optional[int] = None) -> None:
+    """Drops cached /usuarios totals of the tenant (every tenant when None) and of the cross-tenant listing."""
+    cache_delete_pattern(f"cache:{'*' if tenant_id is None else tenant_id}:usuarios_total:*")
+    if tenant_id is not None:
+        cache_delete_pattern("cache:None:usuarios_total:*")
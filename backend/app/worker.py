@@ -0,0 +1,147 @@
+"""
+Warm RQ worker entry point: ``python -m app.worker [queues...]``.
+
+``rq worker`` forks a work horse per job from a parent that has imported
+nothing of the app, so every job pays for importing the ingestion stack
+(pdfplumber/pdfminer), the models and, for risk model training, sklearn,
+and runs with an engine inherited across fork. Here the parent builds the app
+once and imports the heavy modules before the first job:
+
+* default: fork per job (``WarmWorker``) from the preloaded parent; the
+  child drops the inherited DB connections before running the job.
+* ``--pool N``: N long-lived processes that run jobs without forking
+  (``PooledWorker``), for short jobs where even a fork is noticeable.
+  ``--max-jobs`` recycles them to bound memory growth.
+
+Both run the tenant scheduler's upkeep with RQ's periodic maintenance
+(``--maintenance-interval``): slots held by jobs whose work horse was killed
+are given back and pending jobs admitted.
+
+``scripts/bench_worker_startup.py`` measures the per-job startup overhead of
+both modes against a cold fork.
+"""
+from __future__ import annotations
+
+import argparse
+import importlib
+import time
+
+from loguru import logger
+from rq import SimpleWorker, Worker
+from rq.worker_pool import WorkerPool
+
+from .core import scheduler
+from .core.queue import priority_queues, queue, redis_conn
+
+DEFAULT_QUEUES = (*priority_queues, queue.name)
+# RQ's default is 10 minutes; a slot left by a killed job blocks its tenant until then.
+MAINTENANCE_INTERVAL = 60
+PRELOAD_MODULES = (
+    "pdfplumber",
+    "pdfminer.pdfparser",
+    "sklearn.linear_model",
+    "app.models",
+    "app.services.ingestion",
+    "app.services.accounts",
+    "app.services.ai_predictor",
+    "app.services.upload_batches",
+    "app.services.reprocess",
+)
+
+_app_context = None
+
+
+def preload() -> float:
+    """Builds the app (kept in a pushed app context) and imports the job modules; returns seconds."""
+    global _app_context
+    started = time.perf_counter()
+    from . import create_app
+    from .core.hashing import pwd_context
+
+    if _app_context is None:
+        _app_context = create_app().app_context()
+        _app_context.push()
+    for name in PRELOAD_MODULES:
+        importlib.import_module(name)
+    # Loads the bcrypt backend once instead of in every job that provisions accounts.
+    pwd_context.hash("warm-up")
+    return time.perf_counter() - started
+
+
+def reset_after_fork() -> None:
+    """Drops DB connections inherited from the parent without closing them under its feet."""
+    from .core import database
+
+    database.engine.dispose(close=False)
+
+
+class SchedulerMaintenance:
+    """Adds the tenant scheduler's slot reaping and dispatch to RQ's maintenance."""
+
+    def run_maintenance_tasks(self):
+        super().run_maintenance_tasks()
+        try:
+            reaped = scheduler.reap_slots()
+            admitted = scheduler.dispatch()
+        except Exception as exc:
+            logger.warning("Scheduler maintenance failed: {}", exc)
+            return
+        if reaped or admitted:
+            logger.info("Scheduler maintenance: {} slot(s) reaped, {} job(s) admitted", reaped, admitted)
+
+
+class WarmWorker(SchedulerMaintenance, Worker):
+    """Forks a work horse per job from a preloaded parent."""
+
+    def main_work_horse(self, job, queue):
+        reset_after_fork()
+        super().main_work_horse(job, queue)
+
+
+class PooledWorker(SchedulerMaintenance, SimpleWorker):
+    """
+    Runs jobs in its own (preloaded) process, without forking. WorkerPool
+    forks these off the preloaded parent and replaces the ones that exit
+    after ``max_jobs``.
+    """
+
+    max_jobs: int | None = None
+    maintenance_seconds: int = MAINTENANCE_INTERVAL
+
+    def __init__(self, *args, **kwargs):
+        kwargs.setdefault("maintenance_interval", self.maintenance_seconds)
+        super().__init__(*args, **kwargs)
+        reset_after_fork()
+
+    def work(self, *args, **kwargs):
+        kwargs.setdefault("max_jobs", self.max_jobs)
+        return super().work(*args, **kwargs)
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description="Preloaded RQ worker")
+    parser.add_argument("queues", nargs="*", default=list(DEFAULT_QUEUES))
+    parser.add_argument("--pool", type=int, default=0, help="run N non-forking workers instead of forking per job")
+    parser.add_argument("--burst", action="store_true", help="exit when the queues are empty")
+    parser.add_argument("--max-jobs", type=int, default=None, help="exit after N jobs (pooled workers are restarted)")
+    parser.add_argument(
+        "--maintenance-interval", type=int, default=MAINTENANCE_INTERVAL,
+        help="seconds between RQ registry cleanups and scheduler slot reaping",
+    )
+    parser.add_argument("--logging-level", default="INFO")
+    args = parser.parse_args(argv)
+
+    seconds = preload()
+    logger.info("Worker preloaded in {:.2f}s; queues: {}", seconds, ", ".join(args.queues))
+    if args.pool > 0:
+        PooledWorker.max_jobs = args.max_jobs
+        PooledWorker.maintenance_seconds = args.maintenance_interval
+        pool = WorkerPool(args.queues, connection=redis_conn, num_workers=args.pool, worker_class=PooledWorker)
+        pool.start(burst=args.burst, logging_level=args.logging_level)
+        return
+    worker = WarmWorker(args.queues, connection=redis_conn, maintenance_interval=args.maintenance_interval)
+    worker.work(burst=args.burst, max_jobs=args.max_jobs, logging_level=args.logging_level, with_scheduler=True)
+
+
+if __name__ == "__main__":
+    main()
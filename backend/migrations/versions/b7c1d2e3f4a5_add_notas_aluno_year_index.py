@@ -0,0 +1,25 @@
+"""add index on notas (aluno_id, academic_year_id)
+
+Revision ID: b7c1d2e3f4a5
+Revises: 858d070c6419
+Create Date: 2026-10-19 10:00:00.000000
+
+"""
+from typing import Sequence, Union
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = 'b7c1d2e3f4a5'
+down_revision: Union[str, Sequence[str], None] = '858d070c6419'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # The turma detail query outer-joins alunos -> notas by aluno_id for one academic year.
+    op.create_index('ix_notas_aluno_id_academic_year_id', 'notas', ['aluno_id', 'academic_year_id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_notas_aluno_id_academic_year_id', table_name='notas')
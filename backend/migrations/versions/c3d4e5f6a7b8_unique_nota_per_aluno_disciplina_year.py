@@ -0,0 +1,32 @@
+"""unique nota per (aluno_id, disciplina_normalizada, academic_year_id)
+
+Revision ID: c3d4e5f6a7b8
+Revises: b7c1d2e3f4a5
+Create Date: 2026-10-19 12:00:00.000000
+
+"""
+from typing import Sequence, Union
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = 'c3d4e5f6a7b8'
+down_revision: Union[str, Sequence[str], None] = 'b7c1d2e3f4a5'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Older imports could leave duplicates behind; keep the oldest row, as the row-by-row upsert did.
+    op.execute(sa.text(
+        "DELETE FROM notas WHERE id NOT IN ("
+        "SELECT MIN(id) FROM notas GROUP BY aluno_id, disciplina_normalizada, academic_year_id)"
+    ))
+    op.create_index(
+        'uq_notas_aluno_disciplina_year', 'notas',
+        ['aluno_id', 'disciplina_normalizada', 'academic_year_id'], unique=True,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('uq_notas_aluno_disciplina_year', table_name='notas')
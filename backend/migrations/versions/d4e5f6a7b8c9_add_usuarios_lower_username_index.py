@@ -0,0 +1,25 @@
+"""add index on usuarios (lower(username), id)
+
+Revision ID: d4e5f6a7b8c9
+Revises: c3d4e5f6a7b8
+Create Date: 2026-10-19 14:00:00.000000
+
+"""
+from typing import Sequence, Union
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = 'd4e5f6a7b8c9'
+down_revision: Union[str, Sequence[str], None] = 'c3d4e5f6a7b8'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # GET /usuarios pages by keyset on (lower(username), id).
+    op.create_index('ix_usuarios_lower_username_id', 'usuarios', [sa.text('lower(username)'), 'id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_usuarios_lower_username_id', table_name='usuarios')
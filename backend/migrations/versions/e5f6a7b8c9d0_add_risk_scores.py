@@ -0,0 +1,48 @@
+"""add risk_scores table
+
+Revision ID: e5f6a7b8c9d0
+Revises: d4e5f6a7b8c9
+Create Date: 2026-10-19 16:00:00.000000
+
+"""
+from typing import Sequence, Union
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = 'e5f6a7b8c9d0'
+down_revision: Union[str, Sequence[str], None] = 'd4e5f6a7b8c9'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Filled by the refresh job (services.risk_scores); `flask refresh-risk-scores` backfills it.
+    op.create_table(
+        'risk_scores',
+        sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+        sa.Column('aluno_id', sa.Integer(), nullable=False),
+        sa.Column('score', sa.Float(), nullable=False),
+        sa.Column('model_version', sa.String(length=64), nullable=False),
+        sa.Column('computed_at', sa.DateTime(), nullable=False),
+        sa.Column('tenant_id', sa.Integer(), nullable=False),
+        sa.Column('academic_year_id', sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(['aluno_id'], ['alunos.id'], ondelete='CASCADE'),
+        sa.ForeignKeyConstraint(['academic_year_id'], ['academic_years.id']),
+        sa.ForeignKeyConstraint(['tenant_id'], ['tenants.id']),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_index(op.f('ix_risk_scores_tenant_id'), 'risk_scores', ['tenant_id'], unique=False)
+    op.create_index(op.f('ix_risk_scores_academic_year_id'), 'risk_scores', ['academic_year_id'], unique=False)
+    op.create_index('uq_risk_scores_aluno_year', 'risk_scores', ['aluno_id', 'academic_year_id'], unique=True)
+    op.create_index(
+        'ix_risk_scores_tenant_year_score', 'risk_scores', ['tenant_id', 'academic_year_id', 'score'], unique=False
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_risk_scores_tenant_year_score', table_name='risk_scores')
+    op.drop_index('uq_risk_scores_aluno_year', table_name='risk_scores')
+    op.drop_index(op.f('ix_risk_scores_academic_year_id'), table_name='risk_scores')
+    op.drop_index(op.f('ix_risk_scores_tenant_id'), table_name='risk_scores')
+    op.drop_table('risk_scores')
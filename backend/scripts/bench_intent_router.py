@@ -0,0 +1,126 @@
+"""
+Routing accuracy and latency of the chat intent router.
+
+Usage:
+    python scripts/bench_intent_router.py [--corpus tests/data/chat_queries.jsonl] [--repeat 200]
+        [--legacy] [--json results.json]
+
+Every corpus message (``{"message": ..., "intent": ...}``, ``null`` for the
+help text) is routed ``--repeat`` times, filter extraction included; no
+database is touched. Reported: accuracy, the misrouted messages and the
+per-message latency (p50 / p95 / max of each message's mean). With --legacy
+the previous router (filters, then 13 ``any(re.search(...))`` loops in a
+fixed order) runs on the same corpus for comparison.
+"""
+import argparse
+import json
+import os
+import re
+import statistics
+import sys
+import time
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+
+LEGACY_PATTERNS = {
+    'chart_grades': [r'gr[áa]fico.*not[as]', r'comparar.*m[ée]dia', r'desempenho.*turma', r'm[ée]dias.*disciplina', r'desempenho.*escola'],
+    'risky_students': [r'risco', r'reprovad', r'not[as].*baix[as]', r'vermelho', r'abaixo.*50', r'perigo'],
+    'best_students': [r'melhor.*aluno', r'maior.*not[as]', r'destaque', r'top.*aluno', r'medalha', r'excel[êe]ncia'],
+    'count_stats': [r'quantos', r'total', r'contar', r'n[úu]mero de', r'quantidade'],
+    'report_faults': [r'faltas', r'frequ[êe]ncia', r'aus[êe]ncias', r'n[ãa]o veio', r'infrequente', r'presen[çc]a'],
+    'notices': [r'comunicado', r'aviso', r'mural', r'not[íi]cia', r'[úu]ltimas novidades'],
+    'occurrences': [r'ocorr[êe]ncia', r'advert[êe]ncia', r'elogio', r'comportamento', r'disciplinar'],
+    'student_info': [r'quem [ée]', r'sobre o aluno', r'perfil de', r'boletim do', r'situa[çc][ãa]o de', r'dados de'],
+    'dropout_radar': [r'abandono', r'evas[ãa]o', r'desistir', r'radar'],
+    'missing_grades': [r'sem not[as]', r'faltando', r'incompleto', r'pend[êe]ncia'],
+}
+
+
+def legacy_route(engine, message: str):
+    """The sequential router ``AIAnalystEngine.process_query`` used before, minus the handlers."""
+    filters = engine._extract_filters(message)
+    message_lower = message.lower()
+    p = LEGACY_PATTERNS
+    for intent in ('chart_grades', 'risky_students', 'count_stats', 'report_faults', 'best_students'):
+        if any(re.search(pattern, message_lower) for pattern in p[intent]):
+            return intent
+    # The old check compared against the literal 'm[ée]dia', so it never matched.
+    if 'acima' in message_lower and 'm[ée]dia' in message_lower:
+        return 'above_average'
+    if 'abaixo' in message_lower and 'm[ée]dia' in message_lower:
+        return 'below_average'
+    if any(re.search(pattern, message_lower) for pattern in [r'dif[íi]cil', r'complexa', r'pior.*not[as]', r'disciplina.*baix[as]']):
+        return 'hardest_subjects'
+    if any(re.search(pattern, message_lower) for pattern in [r'status', r'situa[çc][ãa]o', r'aprovad', r'recupera[çc][ãa]o']):
+        return 'status_stats'
+    for intent in ('notices', 'occurrences'):
+        if any(re.search(pattern, message_lower) for pattern in p[intent]):
+            return intent
+    if any(re.search(pattern, message_lower) for pattern in p['student_info']) or filters.get('aluno_nome'):
+        return 'student_info'
+    for intent in ('dropout_radar', 'missing_grades'):
+        if any(re.search(pattern, message_lower) for pattern in p[intent]):
+            return intent
+    return None
+
+
+def load_corpus(path: Path) -> list[dict]:
+    return [json.loads(line) for line in path.read_text(encoding="utf-8").splitlines() if line.strip()]
+
+
+def _run(name, route, corpus, repeat):
+    timings, misses = [], []
+    for item in corpus:
+        intent = route(item["message"])
+        if intent != item["intent"]:
+            misses.append((item["message"], item["intent"], intent))
+        started = time.perf_counter()
+        for _ in range(repeat):
+            route(item["message"])
+        timings.append((time.perf_counter() - started) / repeat * 1e6)
+    timings.sort()
+    return {
+        "router": name,
+        "messages": len(corpus),
+        "accuracy": round(1 - len(misses) / len(corpus), 4),
+        "p50_us": round(statistics.median(timings), 1),
+        "p95_us": round(timings[min(len(timings) - 1, int(len(timings) * 0.95))], 1),
+        "max_us": round(timings[-1], 1),
+        "misses": misses,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--corpus", type=Path, default=BACKEND_DIR / "tests" / "data" / "chat_queries.jsonl")
+    parser.add_argument("--repeat", type=int, default=200)
+    parser.add_argument("--legacy", action="store_true", help="also run the previous sequential router")
+    parser.add_argument("--json", type=Path, default=None, help="also write the results as JSON")
+    args = parser.parse_args()
+
+    os.environ.setdefault("FLASK_ENV", "test")
+    sys.path.insert(0, str(BACKEND_DIR))
+    from app.services.ai_chat import AIAnalystEngine
+
+    engine = AIAnalystEngine()
+    corpus = load_corpus(args.corpus)
+    results = [_run("scored", lambda message: engine.route(message)[0].intent, corpus, args.repeat)]
+    if args.legacy:
+        results.append(_run("legacy", lambda message: legacy_route(engine, message), corpus, args.repeat))
+
+    print(f"\n{args.corpus.name}: {len(corpus)} messages, {args.repeat} runs each")
+    print(f"{'router':>8} {'accuracy':>9} {'p50 µs':>8} {'p95 µs':>8} {'max µs':>8}")
+    for r in results:
+        print(f"{r['router']:>8} {r['accuracy']:>9.1%} {r['p50_us']:>8.1f} {r['p95_us']:>8.1f} {r['max_us']:>8.1f}")
+    for r in results:
+        for message, expected, got in r["misses"]:
+            print(f"  {r['router']}: {message!r} -> {got} (expected {expected})")
+
+    if args.json:
+        args.json.write_text(json.dumps({"corpus": str(args.corpus), "results": results}, indent=2, ensure_ascii=False))
+        print(f"\nWrote {args.json}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+"""
+Benchmark: per-page layout extraction, legacy vs. single pass.
+
+Usage:
+    python scripts/bench_parse_layout.py [--pages 500] [--alunos-per-page 1]
+
+"legacy" is what ``_parse_page`` used to do: ``extract_text()`` and
+``extract_tables()`` on every page, with page caches kept until the PDF is
+closed. "single-pass" is the current ``_parse_page`` (``_extract_page_layout``
+plus ``page.close()``). Each mode runs in a fresh process so peak RSS is its own.
+"""
+import argparse
+import multiprocessing
+import resource
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# Add backend directory to path so we can import app
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+
+from synthetic_boletim import write_boletim_pdf
+
+
+def _run(mode: str, pdf_path: str, queue) -> None:
+    import pdfplumber
+
+    from app.services.ingestion import _parse_page
+
+    start = time.perf_counter()
+    with pdfplumber.open(pdf_path) as pdf:
+        pages = len(pdf.pages)
+        for page in pdf.pages:
+            if mode == "legacy":
+                page.extract_text()
+                page.extract_tables()
+            else:
+                _parse_page(page)
+        elapsed = time.perf_counter() - start
+    # ru_maxrss is in KiB on Linux.
+    queue.put((pages, elapsed, resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--pages", type=int, default=500)
+    parser.add_argument("--alunos-per-page", type=int, default=1)
+    args = parser.parse_args()
+
+    ctx = multiprocessing.get_context("spawn")
+    with tempfile.TemporaryDirectory() as tmp:
+        pdf_path = Path(tmp) / "boletim.pdf"
+        write_boletim_pdf(pdf_path, args.pages, alunos_per_page=args.alunos_per_page)
+
+        print(f"{'mode':>12} {'pages':>6} {'seconds':>9} {'ms/page':>8} {'peak RSS MiB':>13}")
+        for mode in ("legacy", "single-pass"):
+            queue = ctx.Queue()
+            process = ctx.Process(target=_run, args=(mode, str(pdf_path), queue))
+            process.start()
+            pages, elapsed, peak_mib = queue.get()
+            process.join()
+            print(f"{mode:>12} {pages:>6} {elapsed:>9.2f} {elapsed / pages * 1000:>8.1f} {peak_mib:>13.1f}")
+
+
+if __name__ == "__main__":
+    main()
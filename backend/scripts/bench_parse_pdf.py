@@ -0,0 +1,52 @@
+"""
+Benchmark: sequential vs. process-pool PDF parsing (``parse_pdf``).
+
+Usage:
+    python scripts/bench_parse_pdf.py [--pages 400] [--alunos-per-page 1] [--workers 1 2 4] [--pages-per-task 25]
+
+Writes a synthetic boletim to a temp dir, parses it with each worker count
+and checks that every run yields the same records as the sequential one.
+"""
+import argparse
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# Add backend directory to path so we can import app
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+
+from app.core.config import settings
+from app.services.ingestion import parse_pdf
+from synthetic_boletim import write_boletim_pdf
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--pages", type=int, default=400)
+    parser.add_argument("--alunos-per-page", type=int, default=1)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--pages-per-task", type=int, default=settings.ingestion_pages_per_task)
+    args = parser.parse_args()
+    settings.ingestion_pages_per_task = args.pages_per_task
+
+    with tempfile.TemporaryDirectory() as tmp:
+        pdf_path = Path(tmp) / "boletim.pdf"
+        write_boletim_pdf(pdf_path, args.pages, alunos_per_page=args.alunos_per_page)
+
+        baseline = None
+        baseline_s = None
+        print(f"{'workers':>7} {'seconds':>9} {'pages/s':>9} {'speedup':>8} {'alunos':>7}")
+        for workers in args.workers:
+            start = time.perf_counter()
+            records, year = parse_pdf(pdf_path, [], workers=workers)
+            elapsed = time.perf_counter() - start
+            if baseline is None:
+                baseline, baseline_s = (records, year), elapsed
+            elif (records, year) != baseline:
+                raise SystemExit(f"workers={workers} produced different records than workers={args.workers[0]}")
+            print(f"{workers:>7} {elapsed:>9.2f} {args.pages / elapsed:>9.1f} {baseline_s / elapsed:>7.2f}x {len(records):>7}")
+
+
+if __name__ == "__main__":
+    main()
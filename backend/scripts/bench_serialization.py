@@ -0,0 +1,182 @@
+"""
+Benchmark: list endpoints serialization (ORM + Pydantic + stdlib json vs. column rows + orjson).
+
+Usage:
+    python scripts/bench_serialization.py [--alunos 1000] [--turma-size 40] [--repeat 20]
+
+Runs against an in-memory SQLite database, so it measures the Python side
+(row materialization, model building, JSON encoding) rather than the DB.
+"""
+import argparse
+import random
+import sys
+import time
+from math import ceil
+from pathlib import Path
+from statistics import mean, median
+
+# Add backend directory to path so we can import app
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+
+from flask import g
+from flask.json.provider import DefaultJSONProvider
+from sqlalchemy import create_engine, func, select
+from sqlalchemy.pool import StaticPool
+
+import app.core.database
+from app import create_app
+from app.core.database import Base, SessionLocal
+from app.core.json import FastJSONProvider
+from app.models import AcademicYear, Aluno, Nota, Tenant
+from app.schemas.aluno import AlunoListSchema, AlunoPaginatedResponse, PaginationMeta
+from app.schemas.turma import AlunoTurmaDetailSchema, NotaSimplificadaSchema, TurmaDetailResponse
+from app.services.aluno_service import AlunoService
+from app.services.turma_service import TurmaService
+
+DISCIPLINAS = [
+    "Arte", "Ciências", "Educação Física", "Ensino Religioso", "Geografia", "História",
+    "Língua Inglesa", "Língua Portuguesa", "Matemática", "Projeto de Vida", "Redação", "Tecnologia",
+]
+
+
+def seed(session, total_alunos: int, turma_size: int) -> tuple[int, int]:
+    tenant = Tenant(name="Bench", slug="bench")
+    session.add(tenant)
+    session.flush()
+    year = AcademicYear(tenant_id=tenant.id, label="2026", is_current=True)
+    session.add(year)
+    session.flush()
+
+    rng = random.Random(42)
+    for idx in range(total_alunos):
+        turma = "6º ANO A" if idx < turma_size else f"{7 + idx % 3}º ANO {'BCD'[idx % 3]}"
+        aluno = Aluno(
+            matricula=f"{100000 + idx}",
+            nome=f"ALUNO {idx:05d}",
+            turma=turma,
+            turno="Matutino",
+            tenant_id=tenant.id,
+            academic_year_id=year.id,
+        )
+        session.add(aluno)
+        session.flush()
+        for disciplina in DISCIPLINAS:
+            tri = [round(rng.uniform(10, 33), 2) for _ in range(3)]
+            session.add(Nota(
+                aluno_id=aluno.id,
+                disciplina=disciplina,
+                disciplina_normalizada=disciplina.lower(),
+                trimestre1=tri[0],
+                trimestre2=tri[1],
+                trimestre3=tri[2],
+                total=round(sum(tri), 2),
+                faltas=rng.randint(0, 12),
+                situacao="APR" if sum(tri) >= 60 else "REC",
+                tenant_id=tenant.id,
+                academic_year_id=year.id,
+            ))
+    session.commit()
+    return tenant.id, year.id
+
+
+def legacy_alunos_page(session, per_page: int) -> dict:
+    total = session.execute(select(func.count(Aluno.id))).scalar() or 0
+    rows = session.execute(
+        select(Aluno, func.avg(Nota.total).label("media"), func.sum(Nota.faltas).label("faltas"))
+        .outerjoin(Nota).group_by(Aluno.id).order_by(Aluno.nome).limit(per_page)
+    ).all()
+    items = [
+        AlunoListSchema(
+            id=a.id, matricula=a.matricula, nome=a.nome, turma=a.turma, turno=a.turno,
+            status=a.status, media=float(m) if m is not None else None,
+            faltas=int(f) if f is not None else 0,
+        )
+        for a, m, f in rows
+    ]
+    return AlunoPaginatedResponse(
+        items=items,
+        meta=PaginationMeta(page=1, per_page=per_page, total=total, pages=ceil(total / per_page)),
+    ).model_dump()
+
+
+def legacy_turma_detail(session, turma: str) -> dict:
+    alunos = session.query(Aluno).filter(Aluno.turma == turma).order_by(Aluno.nome).all()
+    notas = (
+        session.query(Nota).filter(Nota.aluno_id.in_([a.id for a in alunos]))
+        .order_by(Nota.aluno_id, Nota.disciplina).all()
+    )
+    por_aluno: dict[int, list[Nota]] = {a.id: [] for a in alunos}
+    for nota in notas:
+        por_aluno[nota.aluno_id].append(nota)
+    payload = []
+    for aluno in alunos:
+        ns = por_aluno[aluno.id]
+        totais = [float(n.total) for n in ns if n.total is not None]
+        payload.append(AlunoTurmaDetailSchema(
+            id=aluno.id, nome=aluno.nome, matricula=aluno.matricula, turma=aluno.turma,
+            turno=aluno.turno, media=round(mean(totais), 1) if totais else None,
+            situacao="APR",
+            notas=[
+                NotaSimplificadaSchema(
+                    disciplina=n.disciplina,
+                    trimestre1=float(n.trimestre1) if n.trimestre1 is not None else None,
+                    trimestre2=float(n.trimestre2) if n.trimestre2 is not None else None,
+                    trimestre3=float(n.trimestre3) if n.trimestre3 is not None else None,
+                    total=float(n.total) if n.total is not None else None,
+                    faltas=n.faltas, situacao=n.situacao,
+                ) for n in ns
+            ],
+        ))
+    return TurmaDetailResponse(turma=turma, turno=alunos[0].turno, total=len(payload), alunos=payload).model_dump()
+
+
+def timed(fn, repeat: int) -> float:
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - start)
+    return median(samples) * 1000
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--alunos", type=int, default=1000)
+    parser.add_argument("--turma-size", type=int, default=40)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    engine = create_engine("sqlite://", poolclass=StaticPool, connect_args={"check_same_thread": False})
+    app.core.database.engine = engine
+    SessionLocal.configure(bind=engine)
+    Base.metadata.create_all(bind=engine)
+
+    with SessionLocal() as session:
+        tenant_id, year_id = seed(session, args.alunos, args.turma_size)
+
+    flask_app = create_app()
+    stdlib_json = DefaultJSONProvider(flask_app)
+    fast_json = FastJSONProvider(flask_app)
+
+    with flask_app.test_request_context():
+        g.tenant_id, g.academic_year_id = tenant_id, year_id
+        with SessionLocal() as session:
+            cases = {
+                f"aluno page ({args.alunos} rows)": (
+                    lambda: stdlib_json.dumps(legacy_alunos_page(session, args.alunos)),
+                    lambda: fast_json.dumps(AlunoService(session).list_alunos(page=1, per_page=args.alunos)),
+                ),
+                f"turma detail ({args.turma_size} alunos x {len(DISCIPLINAS)} notas)": (
+                    lambda: stdlib_json.dumps(legacy_turma_detail(session, "6º ANO A")),
+                    lambda: fast_json.dumps(TurmaService(session).get_turma_detail("6º ANO A")),
+                ),
+            }
+            print(f"{'case':<45} {'legacy ms':>10} {'fast ms':>10} {'speedup':>8}")
+            for name, (legacy, fast) in cases.items():
+                legacy_ms = timed(legacy, args.repeat)
+                fast_ms = timed(fast, args.repeat)
+                print(f"{name:<45} {legacy_ms:>10.2f} {fast_ms:>10.2f} {legacy_ms / fast_ms:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
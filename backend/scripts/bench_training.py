@@ -0,0 +1,228 @@
+"""
+Benchmark for risk model training as the number of alunos grows.
+
+Usage:
+    python scripts/bench_training.py [--alunos 1000 5000 20000] [--notas-per-aluno 12]
+        [--database-url sqlite:///...] [--legacy] [--json results.json]
+
+For every size a fresh tenant is filled with synthetic alunos, notas and
+ocorrências (bulk inserts, not measured), then ``train_risk_model`` runs on
+it (without the risk score refresh that follows in production). Reported per
+size: wall time, SQL statements and peak RSS of the phase.
+With --legacy the previous implementation (``select(Aluno)`` plus one lazy
+load of ``aluno.notas`` per aluno and a DataFrame of dicts) runs too, on the
+same rows, for comparison. The default database is a temporary SQLite file;
+the benchmark's tenants are deleted afterwards. Models are written to a
+temporary RISK_MODEL_DIR.
+"""
+import argparse
+import json
+import os
+import random
+import resource
+import sys
+import tempfile
+import time
+from pathlib import Path
+from uuid import uuid4
+
+
+def _reset_peak_rss() -> None:
+    # Linux >= 4.0: resets VmHWM so each phase reports its own peak.
+    try:
+        Path("/proc/self/clear_refs").write_text("5")
+    except OSError:
+        pass
+
+
+def _peak_rss_mib() -> float:
+    try:
+        for line in Path("/proc/self/status").read_text().splitlines():
+            if line.startswith("VmHWM:"):
+                return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+class StatementCounter:
+    def __init__(self):
+        self.statements = 0
+
+    def __call__(self, conn, cursor, statement, parameters, context, executemany):
+        self.statements += 1
+
+
+def _measure(name, fn, *, alunos, counter):
+    counter.statements = 0
+    _reset_peak_rss()
+    start = time.perf_counter()
+    value = fn()
+    elapsed = time.perf_counter() - start
+    return {
+        "phase": name,
+        "alunos": alunos,
+        "seconds": round(elapsed, 3),
+        "alunos_per_second": round(alunos / elapsed, 1) if elapsed else None,
+        "statements": counter.statements,
+        "peak_rss_mib": round(_peak_rss_mib(), 1),
+    }, value
+
+
+def _legacy_train(tenant_id):
+    """The per-aluno implementation this benchmark replaced, kept for comparison."""
+    import pandas as pd
+    from sklearn.linear_model import LogisticRegression
+    from sqlalchemy import select
+
+    from app.core.database import SessionLocal
+    from app.models import Aluno
+
+    with SessionLocal() as session:
+        data = []
+        for aluno in session.execute(select(Aluno).where(Aluno.tenant_id == tenant_id)).scalars():
+            total_score = low = faltas = 0
+            for nota in aluno.notas:
+                score = float(nota.total or 0)
+                low += score < 60
+                total_score += score
+                faltas += nota.faltas or 0
+            data.append({
+                "mean_score": total_score / len(aluno.notas) if aluno.notas else 0,
+                "low_grades": low,
+                "faltas": faltas,
+                "target": 1 if (low >= 2 or faltas > 15) else 0,
+            })
+        df = pd.DataFrame(data)
+        X = df[["mean_score", "low_grades", "faltas"]]
+        return LogisticRegression().fit(X, df["target"]).score(X, df["target"])
+
+
+def _populate(session, tenant_id, year_id, alunos, notas_per_aluno, seed):
+    from sqlalchemy import insert, select
+
+    from app.models import Aluno, Nota, Ocorrencia, Usuario
+
+    rng = random.Random(seed)
+    prefix = uuid4().hex[:6]
+    session.execute(insert(Aluno), [
+        {
+            "matricula": f"{prefix}{i:07d}", "nome": f"Aluno {i}", "turma": f"{6 + i % 4}A", "turno": "Matutino",
+            "tenant_id": tenant_id, "academic_year_id": year_id,
+        }
+        for i in range(alunos)
+    ])
+    ids = session.execute(select(Aluno.id).where(Aluno.tenant_id == tenant_id)).scalars().all()
+    autor = Usuario(username=f"bench-{prefix}", password_hash="x", role="professor", tenant_id=tenant_id)
+    session.add(autor)
+    session.flush()
+
+    notas, ocorrencias = [], []
+    for aluno_id in ids:
+        level = rng.uniform(35, 95)
+        for d in range(notas_per_aluno):
+            notas.append({
+                "aluno_id": aluno_id, "disciplina": f"D{d}", "disciplina_normalizada": f"D{d}",
+                "total": None if rng.random() < 0.03 else round(min(100, max(0, rng.gauss(level, 12))), 1),
+                "faltas": rng.randint(0, 4), "tenant_id": tenant_id, "academic_year_id": year_id,
+            })
+        for _ in range(rng.choice((0, 0, 0, 1, 2))):
+            ocorrencias.append({
+                "aluno_id": aluno_id, "autor_id": autor.id, "tipo": "Advertência", "descricao": "bench",
+                "tenant_id": tenant_id, "academic_year_id": year_id,
+            })
+        if len(notas) >= 50_000:
+            session.execute(insert(Nota), notas)
+            notas.clear()
+    if notas:
+        session.execute(insert(Nota), notas)
+    if ocorrencias:
+        session.execute(insert(Ocorrencia), ocorrencias)
+
+
+def _bench_size(alunos, args, counter):
+    from sqlalchemy import delete
+
+    from app.core.database import session_scope
+    from app.models import AcademicYear, Aluno, Nota, Ocorrencia, Tenant, Usuario
+    from app.services.ai_predictor import train_risk_model
+
+    with session_scope() as session:
+        tenant = Tenant(name="Benchmark", slug=f"bench-{uuid4().hex[:8]}")
+        session.add(tenant)
+        session.flush()
+        year = AcademicYear(tenant_id=tenant.id, label="2025", is_current=True)
+        session.add(year)
+        session.flush()
+        tenant_id = tenant.id
+        _populate(session, tenant_id, year.id, alunos, args.notas_per_aluno, seed=alunos)
+
+    results = []
+    try:
+        result, summary = _measure("set-based", lambda: train_risk_model(tenant_id, refresh_scores=False), alunos=alunos, counter=counter)
+        result["accuracy"] = summary["accuracy"] if summary else None
+        results.append(result)
+        if args.legacy:
+            result, accuracy = _measure("legacy", lambda: _legacy_train(tenant_id), alunos=alunos, counter=counter)
+            result["accuracy"] = round(float(accuracy), 4)
+            results.append(result)
+    finally:
+        with session_scope() as session:
+            for model in (Ocorrencia, Usuario, Nota, Aluno, AcademicYear):
+                session.execute(delete(model).where(model.tenant_id == tenant_id))
+            session.execute(delete(Tenant).where(Tenant.id == tenant_id))
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--alunos", type=int, nargs="+", default=[1000, 5000, 20000])
+    parser.add_argument("--notas-per-aluno", type=int, default=12)
+    parser.add_argument("--database-url", default=None)
+    parser.add_argument("--legacy", action="store_true", help="also run the per-aluno implementation")
+    parser.add_argument("--json", type=Path, default=None, help="also write the results as JSON")
+    args = parser.parse_args()
+
+    # Settings are read at import time.
+    os.environ["FLASK_ENV"] = "test"
+    sys.path.append(str(Path(__file__).resolve().parent.parent))
+    from sqlalchemy import create_engine, event
+
+    import app.core.database
+    from app.core.config import settings
+    from app.core.database import Base, SessionLocal
+
+    with tempfile.TemporaryDirectory() as tmp:
+        url = args.database_url or f"sqlite:///{Path(tmp) / 'bench.db'}"
+        engine = create_engine(url)
+        app.core.database.engine = engine
+        SessionLocal.configure(bind=engine)
+        Base.metadata.create_all(bind=engine)
+        settings.risk_model_dir = str(Path(tmp) / "risk_models")
+
+        counter = StatementCounter()
+        event.listen(engine, "before_cursor_execute", counter)
+        results = []
+        try:
+            for alunos in args.alunos:
+                results.extend(_bench_size(alunos, args, counter))
+        finally:
+            event.remove(engine, "before_cursor_execute", counter)
+            engine.dispose()
+
+    label = url.split("@")[-1] if "@" in url else url
+    print(f"\n{label}: {args.notas_per_aluno} notas per aluno")
+    print(f"{'phase':>10} {'alunos':>8} {'seconds':>9} {'alunos/s':>10} {'stmts':>7} {'peak MiB':>9} {'accuracy':>9}")
+    for r in results:
+        print(
+            f"{r['phase']:>10} {r['alunos']:>8} {r['seconds']:>9.3f} {r['alunos_per_second'] or 0:>10.1f} "
+            f"{r['statements']:>7} {r['peak_rss_mib']:>9.1f} {r['accuracy'] or 0:>9.4f}"
+        )
+
+    if args.json:
+        args.json.write_text(json.dumps({"database": label, "results": results}, indent=2))
+        print(f"\nWrote {args.json}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,136 @@
+"""
+Startup cost and memory of a web worker's first risk scoring.
+
+Usage:
+    python scripts/bench_web_startup.py [--rows 500] [--repeat 3]
+
+Each mode runs in its own spawned interpreter: build the app (what a
+gunicorn worker does on boot), then load the active risk model and score
+``--rows`` alunos' features once (the first request that needs a score).
+Reported: seconds for both steps, RSS after each, and whether sklearn or
+pandas ended up imported.
+
+    coefficients   ``LinearRiskModel`` from a ``.coef`` file, NumPy dot product
+    pickled        the previous artifact: pandas + sklearn imported, pickled
+                   ``LogisticRegression`` unpickled, ``predict_proba``
+
+Both models come from the same fit on synthetic data, in a temporary
+RISK_MODEL_DIR; no database is involved.
+"""
+import argparse
+import multiprocessing
+import os
+import pickle
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+FEATURES = 4
+
+
+def _rss_mib() -> float:
+    for line in Path("/proc/self/status").read_text().splitlines():
+        if line.startswith("VmRSS:"):
+            return int(line.split()[1]) / 1024
+    return 0.0
+
+
+def _run_mode(mode: str, model_dir: str, rows: int, results) -> None:
+    os.environ.update(FLASK_ENV="test", RISK_MODEL_DIR=model_dir)
+    sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+    started = time.perf_counter()
+    from app import create_app
+
+    create_app()
+    boot_seconds = time.perf_counter() - started
+    boot_rss = _rss_mib()
+
+    started = time.perf_counter()
+    import numpy as np
+
+    X = np.random.default_rng(0).uniform(0, 100, size=(rows, FEATURES))
+    if mode == "coefficients":
+        from app.services.ai_predictor import FEATURE_SCHEMA  # noqa: F401  (the scoring module)
+        from app.services.risk_models import models
+
+        model, _ = models.get(None)
+        scores = model.predict_proba(X)
+    else:
+        import pandas  # noqa: F401
+        import sklearn.linear_model  # noqa: F401
+
+        estimator = pickle.loads((Path(model_dir) / "legacy.pkl").read_bytes())
+        scores = estimator.predict_proba(X)[:, 1]
+    score_seconds = time.perf_counter() - started
+
+    results.put({
+        "mode": mode,
+        "boot_seconds": boot_seconds,
+        "boot_rss_mib": boot_rss,
+        "score_seconds": score_seconds,
+        "rss_mib": _rss_mib(),
+        "sklearn": "sklearn" in sys.modules,
+        "pandas": "pandas" in sys.modules,
+        "mean_score": float(scores.mean()),
+    })
+
+
+def _prepare(model_dir: str) -> None:
+    import numpy as np
+    from sklearn.linear_model import LogisticRegression
+
+    os.environ["RISK_MODEL_DIR"] = model_dir
+    sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+    from app.core.config import settings
+    from app.services.ai_predictor import FEATURE_SCHEMA, FEATURES as feature_names
+    from app.services.risk_models import LinearRiskModel, save_model
+
+    settings.risk_model_dir = model_dir
+    rng = np.random.default_rng(1)
+    X = rng.uniform(0, 100, size=(2000, FEATURES))
+    y = (X[:, 0] < 50).astype(int)
+    estimator = LogisticRegression().fit(X, y)
+    save_model(None, LinearRiskModel.from_estimator(estimator, feature_names), {"feature_schema": FEATURE_SCHEMA})
+    (Path(model_dir) / "legacy.pkl").write_bytes(pickle.dumps(estimator))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=500)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    ctx = multiprocessing.get_context("spawn")
+    with tempfile.TemporaryDirectory() as model_dir:
+        # In a child too, so this process' imports do not leak into the measured ones.
+        prepare = ctx.Process(target=_prepare, args=(model_dir,))
+        prepare.start()
+        prepare.join()
+        if prepare.exitcode:
+            raise SystemExit("could not prepare the models")
+
+        print(f"{'mode':>13} {'boot s':>7} {'boot MiB':>9} {'score ms':>9} {'RSS MiB':>8} {'+MiB':>6}  imported")
+        for mode in ("coefficients", "pickled"):
+            runs = []
+            for _ in range(args.repeat):
+                results = ctx.Queue()
+                process = ctx.Process(target=_run_mode, args=(mode, model_dir, args.rows, results))
+                process.start()
+                runs.append(results.get())
+                process.join()
+            last = runs[-1]
+            imported = ", ".join(name for name in ("sklearn", "pandas") if last[name]) or "-"
+            boot_rss = statistics.median(r["boot_rss_mib"] for r in runs)
+            rss = statistics.median(r["rss_mib"] for r in runs)
+            print(
+                f"{mode:>13} {statistics.median(r['boot_seconds'] for r in runs):>7.2f} {boot_rss:>9.1f} "
+                f"{statistics.median(r['score_seconds'] for r in runs) * 1000:>9.1f} {rss:>8.1f} "
+                f"{rss - boot_rss:>6.1f}  {imported}"
+            )
+
+
+if __name__ == "__main__":
+    main()
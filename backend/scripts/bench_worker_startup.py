@@ -0,0 +1,112 @@
+"""
+Per-job startup overhead of the RQ worker modes.
+
+Usage:
+    python scripts/bench_worker_startup.py [--jobs 20]
+
+Every "job" resolves ``app.services.ingestion.process_pdf`` (what RQ does
+when it unpickles the job), touches the account and analytics modules and
+runs ``SELECT 1`` on a fresh session, then exits. Measured from the moment
+the job is handed over until it returns:
+
+    cold-fork    fork per job from a parent that imported nothing of the app
+                 (``rq worker``)
+    warm-fork    fork per job from a preloaded parent (``python -m app.worker``)
+    pooled       no fork, in the preloaded process (``python -m app.worker --pool N``)
+
+Each mode runs in its own spawned interpreter against a temporary SQLite
+database; Redis is not involved.
+"""
+import argparse
+import multiprocessing
+import os
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+JOB_IMPORTS = ("app.services.accounts", "app.services.ai_predictor")
+
+
+def _job() -> None:
+    import importlib
+
+    from rq.utils import import_attribute
+    from sqlalchemy import text
+
+    import_attribute("app.services.ingestion.process_pdf")
+    for name in JOB_IMPORTS:
+        importlib.import_module(name)
+    from app.core.database import session_scope
+
+    with session_scope() as session:
+        session.execute(text("SELECT 1"))
+
+
+def _forked_job(warm: bool) -> float:
+    started = time.perf_counter()
+    pid = os.fork()
+    if pid == 0:
+        code = 0
+        try:
+            if warm:
+                from app.worker import reset_after_fork
+
+                reset_after_fork()
+            _job()
+        except BaseException:
+            code = 1
+        os._exit(code)
+    _, status = os.waitpid(pid, 0)
+    if status != 0:
+        raise RuntimeError("job failed in the forked child")
+    return time.perf_counter() - started
+
+
+def _run_mode(mode: str, jobs: int, database_url: str, results) -> None:
+    os.environ.update(FLASK_ENV="test", DATABASE_URL=database_url)
+    sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+    preload_seconds = 0.0
+    if mode == "cold-fork":
+        # What `rq worker` has loaded before the first job.
+        import rq  # noqa: F401
+    else:
+        from app.worker import preload
+
+        preload_seconds = preload()
+    timings = []
+    for _ in range(jobs):
+        if mode == "pooled":
+            started = time.perf_counter()
+            _job()
+            timings.append(time.perf_counter() - started)
+        else:
+            timings.append(_forked_job(warm=mode == "warm-fork"))
+    results.put((mode, preload_seconds, timings))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--jobs", type=int, default=20)
+    args = parser.parse_args()
+
+    ctx = multiprocessing.get_context("spawn")
+    with tempfile.TemporaryDirectory() as tmp:
+        database_url = f"sqlite:///{Path(tmp) / 'bench.db'}"
+        print(f"{'mode':>10} {'preload s':>10} {'first ms':>9} {'mean ms':>8} {'p50 ms':>7} {'max ms':>7}")
+        for mode in ("cold-fork", "warm-fork", "pooled"):
+            results = ctx.Queue()
+            process = ctx.Process(target=_run_mode, args=(mode, args.jobs, database_url, results))
+            process.start()
+            _, preload_seconds, timings = results.get()
+            process.join()
+            ms = [t * 1000 for t in timings]
+            print(
+                f"{mode:>10} {preload_seconds:>10.2f} {ms[0]:>9.1f} {statistics.mean(ms):>8.1f} "
+                f"{statistics.median(ms):>7.1f} {max(ms):>7.1f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
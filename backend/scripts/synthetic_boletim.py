@@ -0,0 +1,221 @@
+"""
+Synthetic boletim PDF writer used by the ingestion benchmarks.
+
+Writes a plain PDF (no third-party dependency) that mimics the layout the
+parser expects: the "BOLETIM ESCOLAR - YYYY" header, "Aluno(a): ... Matrícula:"
+and "Turma:" lines, and a ruled grade table whose header matches
+``_normalize_header`` aliases.
+
+Realism knobs: ``turma_size`` keeps consecutive alunos in the same turma
+(one boletim per turma, as schools export them), ``blank_rate`` leaves
+trimestre cells empty (grades not launched yet) and ``drop_rate`` omits
+disciplinas from an aluno's table. ``write_school_pdfs`` writes one file per
+turma, like a start-of-term batch upload.
+
+Usage:
+    python scripts/synthetic_boletim.py out.pdf --pages 400 [--alunos-per-page 1]
+        [--turma-size 35] [--blank-rate 0.1] [--drop-rate 0.05]
+    python scripts/synthetic_boletim.py out_dir --school --turmas 20 --turma-size 35
+"""
+from __future__ import annotations
+
+import argparse
+import random
+from pathlib import Path
+
+DISCIPLINAS = [
+    "Arte", "Ciências", "Educação Física", "Ensino Religioso", "Geografia", "História",
+    "Língua Inglesa", "Língua Portuguesa", "Matemática", "Projeto de Vida", "Redação", "Tecnologia",
+]
+HEADER = ["Componentes Curriculares", "1º Trimestre", "2º Trimestre", "3º Trimestre", "Total de Pontos", "T. Faltas", "Situação"]
+COL_WIDTHS = [150, 62, 62, 62, 70, 50, 56]
+NOMES = ["ANA", "BRUNO", "CARLA", "DANIEL", "EDUARDA", "FELIPE", "GABRIELA", "HEITOR", "ISABELA", "JOÃO"]
+SOBRENOMES = ["SILVA", "SANTOS", "OLIVEIRA", "SOUZA", "LIMA", "PEREIRA", "FERREIRA", "GOMES", "RIBEIRO", "ARAÚJO"]
+TURMAS = ["6º ANO A", "6º ANO B", "7º ANO A", "8º ANO C", "9º ANO D"]
+TURNOS = ["MATUTINO", "VESPERTINO"]
+SERIES = ["6º ANO", "7º ANO", "8º ANO", "9º ANO"]
+
+PAGE_W, PAGE_H = 595, 842
+ROW_H = 16
+
+
+def _pdf_text(value: str) -> bytes:
+    raw = value.encode("cp1252")
+    return raw.replace(b"\\", b"\\\\").replace(b"(", b"\\(").replace(b")", b"\\)")
+
+
+def _text(x: float, y: float, value: str, size: int = 9) -> bytes:
+    return b"BT /F1 %d Tf %.1f %.1f Td (" % (size, x, y) + _pdf_text(value) + b") Tj ET\n"
+
+
+def _student_block(
+    top: float,
+    rng: random.Random,
+    year: int,
+    matricula: int,
+    turma: str,
+    turno: str,
+    *,
+    blank_rate: float = 0.0,
+    drop_rate: float = 0.0,
+) -> tuple[bytes, float]:
+    nome = f"{rng.choice(NOMES)} {rng.choice(SOBRENOMES)} {rng.choice(SOBRENOMES)}"
+    out = bytearray()
+    out += _text(40, top, f"BOLETIM ESCOLAR - {year}", 12)
+    out += _text(40, top - 18, f"Aluno(a): {nome} Matrícula: {matricula}")
+    out += _text(40, top - 32, f"Turma: {turma} {turno} - - Ensino Fundamental de 9 anos")
+
+    rows = [HEADER]
+    for disciplina in DISCIPLINAS:
+        if drop_rate and rng.random() < drop_rate:
+            continue
+        tri = [round(rng.uniform(8, 33), 1) for _ in range(3)]
+        if blank_rate:
+            tri = [None if rng.random() < blank_rate else value for value in tri]
+        total = round(sum(value for value in tri if value is not None), 1)
+        situacao = "APR" if total >= 60 else ("REC" if total >= 40 else "REP")
+        rows.append([
+            disciplina, *(_grade(v) for v in tri), _grade(total),
+            str(rng.randint(0, 15)), situacao,
+        ])
+
+    y = top - 48
+    for row in rows:
+        x = 40
+        for cell, width in zip(row, COL_WIDTHS):
+            out += b"%.1f %.1f %.1f %.1f re S\n" % (x, y - ROW_H, width, ROW_H)
+            if cell:
+                out += _text(x + 3, y - ROW_H + 5, cell, 7)
+            x += width
+        y -= ROW_H
+    return bytes(out), y
+
+
+def _grade(value: float | None) -> str:
+    return "" if value is None else f"{value:.1f}".replace(".", ",")
+
+
+def _turma_for(group: int) -> tuple[str, str]:
+    serie = SERIES[group // 5 % len(SERIES)]
+    return f"{serie} {chr(ord('A') + group % 5)}", TURNOS[group % len(TURNOS)]
+
+
+def write_boletim_pdf(
+    path: Path | str,
+    pages: int,
+    *,
+    alunos_per_page: int = 1,
+    year: int = 2025,
+    seed: int = 42,
+    first_matricula: int = 40000,
+    turma_size: int | None = None,
+    first_turma: int = 0,
+    blank_rate: float = 0.0,
+    drop_rate: float = 0.0,
+) -> int:
+    """
+    Writes ``pages`` pages with ``alunos_per_page`` boletins each; returns the
+    aluno count. Without ``turma_size`` the turma rotates per page.
+    """
+    rng = random.Random(seed)
+    contents: list[bytes] = []
+    matricula = first_matricula
+    for page_idx in range(pages):
+        stream = bytearray(b"0.5 w\n")
+        top = PAGE_H - 40
+        for _ in range(alunos_per_page):
+            if turma_size:
+                turma, turno = _turma_for(first_turma + (matricula - first_matricula) // turma_size)
+            else:
+                turma, turno = TURMAS[page_idx % len(TURMAS)], TURNOS[page_idx % len(TURNOS)]
+            block, top = _student_block(
+                top, rng, year, matricula, turma, turno, blank_rate=blank_rate, drop_rate=drop_rate
+            )
+            stream += block
+            top -= 30
+            matricula += 1
+        contents.append(bytes(stream))
+
+    # Object layout: 1 catalog, 2 pages, 3 font, then (page, content) pairs.
+    objects: list[bytes] = [b"", b"", b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica /Encoding /WinAnsiEncoding >>"]
+    kids = []
+    for content in contents:
+        page_num = len(objects) + 1
+        kids.append(b"%d 0 R" % page_num)
+        objects.append(
+            b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 %d %d] /Resources << /Font << /F1 3 0 R >> >> /Contents %d 0 R >>"
+            % (PAGE_W, PAGE_H, page_num + 1)
+        )
+        objects.append(b"<< /Length %d >>\nstream\n" % len(content) + content + b"\nendstream")
+    objects[0] = b"<< /Type /Catalog /Pages 2 0 R >>"
+    objects[1] = b"<< /Type /Pages /Kids [" + b" ".join(kids) + b"] /Count %d >>" % len(contents)
+
+    out = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(len(out))
+        out += b"%d 0 obj\n" % number + body + b"\nendobj\n"
+    xref = len(out)
+    out += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    for offset in offsets:
+        out += b"%010d 00000 n \n" % offset
+    out += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref)
+    Path(path).write_bytes(bytes(out))
+    return pages * alunos_per_page
+
+
+def write_school_pdfs(
+    directory: Path | str,
+    *,
+    turmas: int = 20,
+    turma_size: int = 35,
+    year: int = 2025,
+    seed: int = 42,
+    blank_rate: float = 0.05,
+    drop_rate: float = 0.02,
+) -> list[Path]:
+    """One boletim PDF per turma (one aluno per page), as a school exports them."""
+    directory = Path(directory)
+    directory.mkdir(parents=True, exist_ok=True)
+    paths = []
+    for index in range(turmas):
+        first = 40000 + index * turma_size
+        turma, turno = _turma_for(index)
+        path = directory / f"boletim_{index + 1:03d}_{turma.replace('º', '').replace(' ', '_')}_{turno.lower()}.pdf"
+        write_boletim_pdf(
+            path, turma_size, year=year, seed=seed + index, first_matricula=first,
+            turma_size=turma_size, first_turma=index, blank_rate=blank_rate, drop_rate=drop_rate,
+        )
+        paths.append(path)
+    return paths
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("output", type=Path)
+    parser.add_argument("--pages", type=int, default=100)
+    parser.add_argument("--alunos-per-page", type=int, default=1)
+    parser.add_argument("--year", type=int, default=2025)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--turma-size", type=int, default=None)
+    parser.add_argument("--blank-rate", type=float, default=0.0)
+    parser.add_argument("--drop-rate", type=float, default=0.0)
+    parser.add_argument("--school", action="store_true", help="write one PDF per turma into OUTPUT (a directory)")
+    parser.add_argument("--turmas", type=int, default=20)
+    args = parser.parse_args()
+    if args.school:
+        paths = write_school_pdfs(
+            args.output, turmas=args.turmas, turma_size=args.turma_size or 35, year=args.year,
+            seed=args.seed, blank_rate=args.blank_rate, drop_rate=args.drop_rate,
+        )
+        print(f"Wrote {len(paths)} boletins to {args.output}")
+        return
+    total = write_boletim_pdf(
+        args.output, args.pages, alunos_per_page=args.alunos_per_page, year=args.year, seed=args.seed,
+        turma_size=args.turma_size, blank_rate=args.blank_rate, drop_rate=args.drop_rate,
+    )
+    print(f"Wrote {args.output} ({args.pages} pages, {total} alunos)")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,4 +1,7 @@
+import importlib.util
 import os
+from pathlib import Path
+
 import pytest
 from sqlalchemy import create_engine
 from app import create_app
@@ -75,3 +78,12 @@ def auth_headers(client, admin_user):
     })
     token = response.json["access_token"]
     return {"Authorization": f"Bearer {token}"}
+
+@pytest.fixture(scope="session")
+def synthetic_boletim():
+    """The scripts/synthetic_boletim.py module (scripts/ is not a package)."""
+    path = Path(__file__).resolve().parent.parent / "scripts" / "synthetic_boletim.py"
+    spec = importlib.util.spec_from_file_location("synthetic_boletim", path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
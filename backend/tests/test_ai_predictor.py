@@ -0,0 +1,162 @@
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import numpy as np
+import pytest
+from sklearn.linear_model import LogisticRegression
+from sqlalchemy import delete, event
+
+from app.core.database import session_scope
+from app.models import AcademicYear, Aluno, Nota, Ocorrencia, Tenant, Usuario
+from app.services import ai_predictor, risk_models
+
+GRADES = {"PRED-1": [(90, 1), (70, 2)], "PRED-2": [(30, 10), (None, 8), (50, 4)], "PRED-3": []}
+OCORRENCIAS = {"PRED-1": 0, "PRED-2": 2, "PRED-3": 1}
+# FEATURES per aluno above: missing totals count as 0.
+EXPECTED = [[80.0, 0, 3, 0], [80 / 3, 3, 22, 2], [0.0, 0, 0, 1]]
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+
+
+@pytest.fixture
+def model_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(risk_models.settings, "risk_model_dir", str(tmp_path / "risk_models"))
+    monkeypatch.setattr(ai_predictor, "_training_requested", {})
+    risk_models.models.clear()
+    yield tmp_path / "risk_models"
+    risk_models.models.clear()
+
+
+@pytest.fixture
+def submitted(monkeypatch):
+    jobs = []
+    monkeypatch.setattr("app.core.jobs.submit_job", lambda func, args=(), **kwargs: jobs.append((func, args)) or "job-1")
+    return jobs
+
+
+def _save(tenant_id, estimator, schema=ai_predictor.FEATURE_SCHEMA, features=ai_predictor.FEATURES):
+    model = risk_models.LinearRiskModel.from_estimator(estimator, features)
+    return risk_models.save_model(tenant_id, model, {"feature_schema": schema})
+
+
+@pytest.fixture
+def predictor_alunos(db_engine):
+    with session_scope() as session:
+        tenant = Tenant(name="Predictor", slug="predictor-test")
+        session.add(tenant)
+        session.flush()
+        year = AcademicYear(tenant_id=tenant.id, label="2025")
+        session.add(year)
+        session.flush()
+        tenant_id = tenant.id
+        alunos = [
+            Aluno(matricula=m, nome=m, turma="6A", turno="Matutino", tenant_id=tenant.id, academic_year_id=year.id)
+            for m in GRADES
+        ]
+        session.add_all(alunos)
+        autor = Usuario(username="pred-autor", password_hash="x", role="professor", tenant_id=tenant.id)
+        session.add(autor)
+        session.flush()
+        for aluno in alunos:
+            for _ in range(OCORRENCIAS[aluno.matricula]):
+                session.add(Ocorrencia(
+                    tipo="Advertência", descricao="-", aluno_id=aluno.id, autor_id=autor.id,
+                    tenant_id=tenant.id, academic_year_id=year.id,
+                ))
+            for disciplina, (total, faltas) in zip(("MAT", "POR", "HIS"), GRADES[aluno.matricula]):
+                session.add(Nota(
+                    aluno_id=aluno.id, disciplina=disciplina, disciplina_normalizada=disciplina, total=total, faltas=faltas,
+                    tenant_id=tenant.id, academic_year_id=year.id,
+                ))
+        ids = [aluno.id for aluno in alunos]
+
+    yield tenant_id, ids
+
+    with session_scope() as session:
+        for model in (Ocorrencia, Nota, Aluno, Usuario, AcademicYear):
+            session.execute(delete(model).where(model.tenant_id == tenant_id))
+        session.execute(delete(Tenant).where(Tenant.id == tenant_id))
+
+
+def test_predict_risk_batch_scores_many_alunos_with_one_query(model_dir, db_engine, predictor_alunos):
+    tenant_id, ids = predictor_alunos
+    model = LogisticRegression().fit(
+        np.array([[80.0, 0, 2, 0], [40.0, 3, 20, 3], [70.0, 1, 5, 0], [30.0, 4, 30, 1]]), [0, 1, 0, 1]
+    )
+    _save(tenant_id, model)
+    # Warm the model cache: scoring itself touches no files.
+    assert risk_models.models.get(tenant_id) is not None
+
+    statements = []
+    listener = lambda conn, cursor, statement, *args: statements.append(statement)
+    event.listen(db_engine, "before_cursor_execute", listener)
+    try:
+        scores = ai_predictor.predict_risk_batch(ids, tenant_id)
+    finally:
+        event.remove(db_engine, "before_cursor_execute", listener)
+
+    expected = model.predict_proba(np.array(EXPECTED))[:, 1]
+    assert np.allclose([scores[aluno_id] for aluno_id in ids], expected)
+    assert len([s for s in statements if s.lstrip().upper().startswith("SELECT")]) == 1
+
+
+def test_training_streams_one_grouped_query_into_arrays(model_dir, monkeypatch, db_engine, predictor_alunos):
+    tenant_id, ids = predictor_alunos
+    monkeypatch.setattr(ai_predictor, "TRAINING_BATCH_SIZE", 2)
+
+    statements = []
+    listener = lambda conn, cursor, statement, *args: statements.append(statement)
+    event.listen(db_engine, "before_cursor_execute", listener)
+    try:
+        with ai_predictor.SessionLocal() as session:
+            aluno_ids, X = ai_predictor.load_training_matrix(session, tenant_id)
+        result = ai_predictor.train_risk_model(tenant_id, refresh_scores=False)
+    finally:
+        event.remove(db_engine, "before_cursor_execute", listener)
+
+    assert aluno_ids.tolist() == ids
+    assert np.allclose(X, EXPECTED)
+    assert ai_predictor.risk_labels(X).tolist() == [0, 1, 0]
+    # A count and the grouped query, for the matrix and again for training.
+    assert len(statements) == 4
+    assert (result["alunos"], result["feature_schema"], result["tenant_id"]) == (3, ai_predictor.FEATURE_SCHEMA, tenant_id)
+    assert risk_models.active_version(tenant_id) == result["version"]
+    model = risk_models.LinearRiskModel.from_json((model_dir / str(tenant_id) / f"{result['version']}.coef").read_bytes())
+    assert model.features == ai_predictor.FEATURES
+
+
+def test_outdated_tenant_model_falls_back_to_global_and_schedules_retraining(model_dir, submitted, predictor_alunos):
+    tenant_id, ids = predictor_alunos
+    _save(
+        tenant_id, LogisticRegression().fit(np.array([[80.0, 0, 2], [30.0, 4, 30]]), [0, 1]),
+        schema="older", features=ai_predictor.FEATURES[:3],
+    )
+    _save(None, LogisticRegression().fit(np.array([[80.0, 0, 2, 0], [30.0, 4, 30, 2]]), [0, 1]))
+
+    scores = ai_predictor.predict_risk_batch(ids, tenant_id)
+    ai_predictor.predict_risk_batch(ids, tenant_id)
+
+    assert set(scores) == set(ids)
+    # Requested once for the tenant, not again while pending.
+    assert submitted == [(ai_predictor.train_risk_model, (tenant_id,))]
+
+
+def test_missing_model_schedules_training_instead_of_training_inline(model_dir, submitted, monkeypatch):
+    monkeypatch.setattr(ai_predictor, "train_risk_model", lambda: (_ for _ in ()).throw(AssertionError("trained inline")))
+
+    assert ai_predictor.predict_risk_batch([1, 2], 7) == {}
+    assert ai_predictor.predict_risk(1, 7) == 0.0
+    assert len(submitted) == 1
+
+
+def test_scoring_path_does_not_import_sklearn_or_pandas():
+    code = (
+        "import sys; from app import create_app; create_app();"
+        "import app.services.analytics, app.services.risk_scores, app.services.ai_predictor;"
+        "print(sorted(m for m in ('sklearn', 'pandas') if m in sys.modules))"
+    )
+    env = {**os.environ, "FLASK_ENV": "test"}
+    result = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, env=env, cwd=BACKEND_DIR)
+    assert result.returncode == 0, result.stderr
+    assert result.stdout.strip().splitlines()[-1] == "[]"
@@ -0,0 +1,112 @@
+import redis
+
+from app.core import cache
+
+
+class FlakyRedis:
+    def __init__(self):
+        self.up = False
+        self.calls = 0
+        self.data = {b"cache:1:stale": b"old"}
+        self.incremented = []
+
+    def _check(self):
+        self.calls += 1
+        if not self.up:
+            raise redis.exceptions.ConnectionError("connection refused")
+
+    def get(self, key):
+        self._check()
+        return self.data.get(key.encode())
+
+    def setex(self, key, timeout, value):
+        self._check()
+        self.data[key.encode()] = value.encode() if isinstance(value, str) else value
+
+    def delete(self, *keys):
+        self._check()
+        for key in keys:
+            self.data.pop(key if isinstance(key, bytes) else key.encode(), None)
+
+    def scan_iter(self, pattern):
+        self._check()
+        prefix = pattern.rstrip("*").encode()
+        return [key for key in self.data if key.startswith(prefix)]
+
+    def incr(self, key):
+        self._check()
+        self.incremented.append(key)
+        return len(self.incremented)
+
+
+def test_breaker_opens_falls_back_to_local_lru_and_replays_on_recovery(monkeypatch):
+    now = [0.0]
+    client = FlakyRedis()
+    monkeypatch.setattr(cache.settings, "environment", "development")
+    monkeypatch.setattr(cache, "redis_client", client)
+    monkeypatch.setattr(cache, "breaker", cache.CircuitBreaker(2, cooldown=30, clock=lambda: now[0]))
+    monkeypatch.setattr(cache, "local_cache", cache.LocalLRU(10))
+    monkeypatch.setattr(cache, "_missed", {"delete": set(), "pattern": set(), "incr": set()})
+
+    # Two failures trip the breaker; after that Redis is not called at all.
+    cache.cache_set("turmas:1:a", "payload", timeout=60)
+    cache.cache_delete_pattern("cache:1:*")
+    assert cache.breaker.state == "open"
+    calls = client.calls
+    assert cache.cache_get("turmas:1:a") == b"payload"
+    assert cache.bump_data_version(1, 2) is None
+    assert cache.data_version(1, 2) is None
+    assert client.calls == calls
+    assert cache.cache_stats()["short_circuited"] == 3
+
+    # After the cool-down one call probes; Redis is back, missed invalidations are replayed.
+    client.up = True
+    now[0] = 31.0
+    assert cache.cache_get("turmas:1:a") is None
+    stats = cache.cache_stats()
+    assert (stats["state"], stats["trips"], stats["missed_invalidations"]) == ("closed", 1, 0)
+    assert b"cache:1:stale" not in client.data
+    assert client.incremented == ["data_version:1:2"]
+    assert stats["local"]["entries"] == 0
+
+
+def test_half_open_probe_failure_reopens_the_breaker():
+    now = [0.0]
+    breaker = cache.CircuitBreaker(1, cooldown=10, clock=lambda: now[0])
+    breaker.record_failure(TimeoutError("read timeout"))
+    assert not breaker.allow()
+
+    now[0] = 10.0
+    assert breaker.allow()
+    # Only one probe at a time.
+    assert not breaker.allow()
+    breaker.record_failure(TimeoutError("read timeout"))
+    assert breaker.state == "open" and breaker.trips == 2
+    now[0] = 15.0
+    assert not breaker.allow()
+
+
+def test_failures_below_the_threshold_still_recover_and_local_ttl_is_capped(monkeypatch):
+    client = FlakyRedis()
+    monkeypatch.setattr(cache.settings, "environment", "development")
+    monkeypatch.setattr(cache, "redis_client", client)
+    monkeypatch.setattr(cache, "breaker", cache.CircuitBreaker(5, cooldown=30))
+    monkeypatch.setattr(cache, "local_cache", cache.LocalLRU(10, max_ttl=30))
+    monkeypatch.setattr(cache, "_missed", {"delete": set(), "pattern": set(), "incr": set()})
+    now = [100.0]
+    monkeypatch.setattr(cache.time, "monotonic", lambda: now[0])
+
+    # Failures below the threshold: the breaker stays closed, but writes and invalidations went local only.
+    cache.cache_set("turmas:1:a", "payload", timeout=600)
+    cache.cache_delete("cache:1:stale")
+    assert cache.breaker.state == "closed"
+    now[0] = 129.0
+    assert cache.local_cache.get("turmas:1:a") == b"payload"
+    now[0] = 130.0
+    assert cache.local_cache.get("turmas:1:a") is None
+
+    cache.cache_set("turmas:1:b", "payload", timeout=600)
+    client.up = True
+    assert cache.cache_get("turmas:1:c") is None
+    assert b"cache:1:stale" not in client.data
+    assert cache.cache_stats()["local"]["entries"] == 0
@@ -0,0 +1,114 @@
+import json
+from pathlib import Path
+
+import pytest
+from sqlalchemy import delete
+
+from app.core.database import session_scope
+from app.models import AcademicYear, Aluno, Nota, Tenant
+from app.services import ai_chat
+from app.services.ai_chat import INTENTS, AIAnalystEngine, ai_engine
+from app.services.intent_router import Intent, IntentRouter
+
+CORPUS = [
+    json.loads(line)
+    for line in (Path(__file__).parent / "data" / "chat_queries.jsonl").read_text(encoding="utf-8").splitlines()
+    if line.strip()
+]
+
+
+@pytest.mark.parametrize("item", CORPUS, ids=[item["message"] for item in CORPUS])
+def test_corpus_routes_to_expected_intent(item):
+    route, _ = ai_engine.route(item["message"])
+    assert route.intent == item["intent"], route.scores
+
+
+def test_every_intent_has_corpus_coverage():
+    assert {intent.name for intent in INTENTS} <= {item["intent"] for item in CORPUS}
+
+
+def test_cues_score_gaps_adjacency_and_ties():
+    router = IntentRouter([
+        Intent("first", ("nao veio", "melhor ... aluno")),
+        Intent("second", ("aluno",), filters=("nome",)),
+    ])
+
+    assert router.route("O aluno NÃO veio").intent == "first"
+    # "nao ... veio" must be adjacent; "melhor ... aluno" may have a gap but keeps its order.
+    assert router.route("nao sei se veio").intent is None
+    assert router.route("aluno melhor").scores == {"second": 1}
+    assert router.route("melhores notas do aluno").scores == {"first": 2, "second": 1}
+    # Equal scores: the intent declared first wins.
+    assert router.route("nao veio", {"nome": "X"}).scores == {"first": 2, "second": 1}
+    assert router.route("aluno", {"nome": "X"}).intent == "second"
+
+
+@pytest.fixture
+def chat_turmas(db_engine):
+    with session_scope() as session:
+        tenant = Tenant(name="Chat", slug="chat-router-test")
+        session.add(tenant)
+        session.flush()
+        year = AcademicYear(tenant_id=tenant.id, label="2025")
+        session.add(year)
+        session.flush()
+        # nome: (turma, trimestre1, trimestre3)
+        for nome, (turma, t1, t3) in {"Ana": ("8º ANO A", 60, 85), "Bia": ("8º ANO A", 70, 40), "Caio": ("8º ANO B", 50, 55)}.items():
+            aluno = Aluno(matricula=f"CHAT-{nome}", nome=nome, turma=turma, turno="Matutino", tenant_id=tenant.id, academic_year_id=year.id)
+            session.add(aluno)
+            session.flush()
+            session.add(Nota(
+                aluno_id=aluno.id, disciplina="MAT", disciplina_normalizada="MAT", trimestre1=t1, trimestre3=t3,
+                total=(t1 + t3) / 2, tenant_id=tenant.id, academic_year_id=year.id,
+            ))
+        tenant_id = tenant.id
+
+    yield
+
+    with session_scope() as session:
+        for model in (Nota, Aluno, AcademicYear):
+            session.execute(delete(model).where(model.tenant_id == tenant_id))
+        session.execute(delete(Tenant).where(Tenant.id == tenant_id))
+
+
+def test_evolution_and_class_comparison_are_answered(chat_turmas):
+    improved = ai_engine.process_query("Quais alunos do 8A melhoraram?")
+    assert [row["Aluno"] for row in improved["data"]] == ["Ana"]
+    assert improved["data"][0]["Variação"] == "+25.0"
+
+    declined = ai_engine.process_query("quem piorou no 8º ano A?")
+    assert [row["Aluno"] for row in declined["data"]] == ["Bia"]
+
+    ranking = ai_engine.process_query("Ranking das turmas do 8A e 8B")
+    assert [(row["Turma"], row["Média"]) for row in ranking["data"]] == [("8º ANO A", 63.8), ("8º ANO B", 52.5)]
+
+
+def test_answers_are_cached_per_intent_filters_and_data_version(chat_turmas, monkeypatch):
+    store, version = {}, {"value": 3}
+    monkeypatch.setattr(ai_chat, "cache_get", store.get)
+    monkeypatch.setattr(ai_chat, "cache_set", lambda key, value, timeout: store.__setitem__(key, value))
+    monkeypatch.setattr(ai_chat, "data_version", lambda tenant_id, year_id: version["value"])
+    engine = AIAnalystEngine()
+
+    first = engine.process_query("Ranking das turmas do 8A e 8B", 7, 1)
+    # Same intent and relevant filters (turmas in any order; turno is overridden by turmas).
+    assert engine.process_query("qual a diferença entre as turmas 8B e 8A à tarde?", 7, 1) == first
+    engine.process_query("Ranking das turmas do 8A", 7, 1)
+    engine.process_query("Ranking das turmas do 8A e 8B", 8, 1)
+    version["value"] = 4
+    engine.process_query("Ranking das turmas do 8A e 8B", 7, 1)
+    engine.process_query("Últimos comunicados", 7, 1)
+    # The chart filters on turmas and turno together: each turno is its own entry.
+    for turno in ("de manhã", "à tarde", "à tarde", "à noite"):
+        engine.process_query(f"gráfico de notas do 8A {turno}", 7, 1)
+    # Unknown version, or no year (no write bumps its version): not cached.
+    engine.process_query("Ranking das turmas do 8A e 8B", 7, None)
+    version["value"] = None
+    engine.process_query("Ranking das turmas do 8A e 8B", 7, 1)
+
+    assert len(store) == 7
+    assert engine.cache_stats.stats() == {
+        "chart_grades": {"hits": 1, "misses": 3, "bypass": 0, "hit_rate": 0.25},
+        "class_comparison": {"hits": 1, "misses": 4, "bypass": 2, "hit_rate": 0.2},
+        "notices": {"hits": 0, "misses": 0, "bypass": 1, "hit_rate": 0.0},
+    }
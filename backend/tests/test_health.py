@@ -7,3 +7,11 @@ def test_health_endpoint():
     response = client.get("/health")
     assert response.status_code == 200
     assert response.json == {"status": "ok"}
+
+
+def test_cache_health_reports_breaker_state():
+    app = create_app()
+    response = app.test_client().get("/health/cache")
+    assert response.status_code == 200
+    assert response.json["state"] in {"closed", "open", "half_open"}
+    assert set(response.json["local"]) == {"entries", "hits", "misses"}
@@ -1,12 +1,23 @@
-from sqlalchemy import select
+import pdfplumber
+from sqlalchemy import delete, event, select
 
+from app.core.config import settings
 from app.core.database import session_scope
-from app.models import Aluno, Nota, Usuario
+from app.models import AcademicYear, Aluno, Nota, Tenant, Usuario
+from app.services import accounts, ingestion, risk_scores
+from app.services.accounts import provision_aluno_users
 from app.services.ingestion import (
     ParsedAlunoRecord,
     ParsedNotaRecord,
+    ParsedPage,
+    _decode_parse_result,
+    _encode_parse_result,
+    _extract_page_layout,
     _extract_student_meta,
+    _merge_pages,
     apply_records,
+    process_pdf,
+    sync_records,
 )
 
 
@@ -24,9 +35,23 @@ def _cleanup_matricula(matricula: str) -> None:
         session.commit()
 
 
-def test_apply_records_creates_and_updates_aluno_notas():
+def _tenant_year(slug: str) -> tuple[int, int]:
+    with session_scope() as session:
+        tenant = session.execute(select(Tenant).where(Tenant.slug == slug)).scalar_one_or_none()
+        if tenant is None:
+            tenant = Tenant(name=f"Escola {slug}", slug=slug)
+            session.add(tenant)
+            session.flush()
+            session.add(AcademicYear(tenant_id=tenant.id, label="2025", is_current=True))
+            session.flush()
+        year = session.execute(select(AcademicYear).where(AcademicYear.tenant_id == tenant.id)).scalar_one()
+        return tenant.id, year.id
+
+
+def test_apply_records_creates_and_updates_aluno_notas(db_engine):
     matricula = "TEST-INGEST"
     _cleanup_matricula(matricula)
+    tenant_id, year_id = _tenant_year("teste-ingest")
 
     primeira_execucao = ParsedAlunoRecord(
         matricula=matricula,
@@ -47,7 +72,7 @@ def test_apply_records_creates_and_updates_aluno_notas():
         ],
     )
 
-    assert apply_records([primeira_execucao]) == 1
+    assert apply_records([primeira_execucao], tenant_id=tenant_id, academic_year_id=year_id) == 1
 
     with session_scope() as session:
         aluno = session.execute(select(Aluno).where(Aluno.matricula == matricula)).scalar_one()
@@ -79,7 +104,7 @@ def test_apply_records_creates_and_updates_aluno_notas():
         ],
     )
 
-    assert apply_records([segunda_execucao]) == 1
+    assert apply_records([segunda_execucao], tenant_id=tenant_id, academic_year_id=year_id) == 1
 
     with session_scope() as session:
         aluno = session.execute(select(Aluno).where(Aluno.matricula == matricula)).scalar_one()
@@ -95,6 +120,134 @@ def test_apply_records_creates_and_updates_aluno_notas():
     _cleanup_matricula(matricula)
 
 
+def test_apply_records_upserts_notas_without_duplicates(db_engine):
+    matricula = "TEST-BULK"
+    _cleanup_matricula(matricula)
+    tenant_id, year_id = _tenant_year("teste-ingest")
+
+    def record(total, disciplinas):
+        return ParsedAlunoRecord(
+            matricula=matricula, nome="Ciclana Bulk", turma="7B", turno="VESPERTINO",
+            notas=[
+                ParsedNotaRecord(disciplina=d, disciplina_normalizada=d.lower(), total=total, faltas=None)
+                for d in disciplinas
+            ],
+        )
+
+    # The same matricula twice in one batch: the last record wins.
+    assert apply_records([record(50, ["Arte"]), record(60, ["Arte", "Redação"])], tenant_id=tenant_id, academic_year_id=year_id) == 1
+    assert apply_records([record(70, ["Redação"])], tenant_id=tenant_id, academic_year_id=year_id) == 1
+
+    with session_scope() as session:
+        aluno = session.execute(select(Aluno).where(Aluno.matricula == matricula)).scalar_one()
+        notas = {
+            n.disciplina: (float(n.total), n.faltas)
+            for n in session.execute(select(Nota).where(Nota.aluno_id == aluno.id)).scalars()
+        }
+        assert notas == {"Arte": (60.0, 0), "Redação": (70.0, 0)}
+        # Accounts are a separate stage.
+        assert session.execute(select(Usuario).where(Usuario.aluno_id == aluno.id)).scalar_one_or_none() is None
+
+    _cleanup_matricula(matricula)
+
+
+def test_sync_records_writes_only_the_diff(db_engine):
+    matricula = "TEST-DIFF"
+    _cleanup_matricula(matricula)
+    tenant_id, year_id = _tenant_year("teste-ingest")
+
+    def record(matematica, disciplinas=("Arte", "Matemática")):
+        totals = {"Arte": 60.0, "Matemática": matematica}
+        return ParsedAlunoRecord(
+            matricula=matricula, nome="Diff Silva", turma="9D", turno="MATUTINO",
+            notas=[
+                ParsedNotaRecord(disciplina=d, disciplina_normalizada=d.lower(), total=totals[d], faltas=None)
+                for d in disciplinas
+            ],
+        )
+
+    first = sync_records([record(55.0)], tenant_id=tenant_id, academic_year_id=year_id)
+    assert first["alunos"] == {"new": 1, "changed": 0, "unchanged": 0}
+    assert first["notas"] == {"new": 2, "changed": 0, "unchanged": 0, "removed": 0}
+
+    statements: list[str] = []
+
+    def capture(conn, cursor, statement, *args):
+        statements.append(statement.lstrip().split()[0].upper())
+
+    event.listen(db_engine, "before_cursor_execute", capture)
+    try:
+        again = sync_records([record(55.0)], tenant_id=tenant_id, academic_year_id=year_id)
+    finally:
+        event.remove(db_engine, "before_cursor_execute", capture)
+    assert again["alunos"] == {"new": 0, "changed": 0, "unchanged": 1}
+    assert again["notas"] == {"new": 0, "changed": 0, "unchanged": 2, "removed": 0}
+    assert set(statements) == {"SELECT"}
+
+    preview = sync_records([record(75.0, ["Matemática"])], tenant_id=tenant_id, academic_year_id=year_id, dry_run=True)
+    assert preview["notas"] == {"new": 0, "changed": 1, "unchanged": 0, "removed": 1}
+    [change] = preview["changes"]
+    assert change["status"] == "changed"
+    assert change["notas"] == [
+        {"disciplina": "Matemática", "status": "changed", "changes": {"total": [55.0, 75.0]}},
+        {"disciplina": "Arte", "status": "removed"},
+    ]
+    with session_scope() as session:
+        aluno = session.execute(select(Aluno).where(Aluno.matricula == matricula)).scalar_one()
+        totals = {n.disciplina: float(n.total) for n in session.execute(select(Nota).where(Nota.aluno_id == aluno.id)).scalars()}
+        assert totals == {"Arte": 60.0, "Matemática": 55.0}
+
+    _cleanup_matricula(matricula)
+
+
+def test_provision_aluno_users_creates_missing_accounts_once(db_engine):
+    matricula = "TEST-ACCOUNT"
+    _cleanup_matricula(matricula)
+    tenant_id, year_id = _tenant_year("teste-ingest")
+    apply_records(
+        [ParsedAlunoRecord(matricula=matricula, nome="Beltrano Conta", turma="8C", turno="MATUTINO")],
+        tenant_id=tenant_id, academic_year_id=year_id,
+    )
+
+    with session_scope() as session:
+        first = provision_aluno_users(session, tenant_id=tenant_id, matriculas=[matricula])
+    with session_scope() as session:
+        second = provision_aluno_users(session, tenant_id=tenant_id, matriculas=[matricula])
+        usuario = session.execute(select(Usuario).where(Usuario.username == "beltranotest-account")).scalar_one()
+        assert usuario.role == "aluno"
+        assert usuario.must_change_password is True
+        assert usuario.tenant_id == tenant_id
+
+    assert (first["created"], second["created"]) == (1, 0)
+
+    _cleanup_matricula(matricula)
+
+
+def test_reconciliation_invalidates_usuario_totals_after_commit(db_engine, monkeypatch):
+    matricula = "TEST-RECONCILE"
+    _cleanup_matricula(matricula)
+    tenant_id, year_id = _tenant_year("teste-ingest")
+    apply_records(
+        [ParsedAlunoRecord(matricula=matricula, nome="Ciclano Conta", turma="8C", turno="MATUTINO")],
+        tenant_id=tenant_id, academic_year_id=year_id,
+    )
+    visible = []
+
+    def invalidate(tenant):
+        # A listing started now must already see the new account.
+        with session_scope() as session:
+            visible.append(session.execute(
+                select(Usuario.id).where(Usuario.username == "ciclanotest-reconcile")
+            ).scalar_one_or_none() is not None)
+
+    monkeypatch.setattr(accounts, "invalidate_usuario_totals", invalidate)
+    assert accounts.reconcile_aluno_users(tenant_id)["created"] >= 1
+    assert accounts.reconcile_aluno_users(tenant_id)["created"] == 0
+    assert visible == [True]
+
+    _cleanup_matricula(matricula)
+
+
 def test_extract_student_meta_from_pdf_text():
     text = (
         "BOLETIM ESCOLAR - 2025\n"
@@ -126,3 +279,94 @@ def test_extract_student_meta_handles_multiple_students_on_page():
     assert metas[0]["matricula"] == "10001"
     assert metas[1]["matricula"] == "10002"
     assert metas[0]["turma"] == "6º ANO A"
+
+
+def test_merge_pages_keeps_first_year_and_accumulates_notas_in_page_order():
+    def nota(disciplina):
+        return ParsedNotaRecord(disciplina=disciplina, disciplina_normalizada=disciplina.lower())
+
+    pages = [
+        ParsedPage(1, None, []),
+        ParsedPage(2, 2025, [({"matricula": "10001", "nome": "ALUNO UM", "turma": "6º ANO A", "turno": None}, [nota("Arte")])]),
+        ParsedPage(3, 2024, [
+            ({"matricula": "10002", "nome": "ALUNO DOIS", "turma": None, "turno": None}, [nota("Arte")]),
+            ({"matricula": "10001", "nome": "ALUNO UM ", "turma": "6º ANO B", "turno": "Matutino"}, [nota("Redação")]),
+            ({"matricula": None, "nome": "SEM MATRÍCULA"}, []),
+        ]),
+    ]
+    errors: list[str] = []
+
+    records, year = _merge_pages(pages, errors, turno="Vespertino", turma="7º ANO C")
+
+    assert year == 2025
+    assert [r.matricula for r in records] == ["10001", "10002"]
+    um, dois = records
+    assert um.nome == "ALUNO UM"
+    assert (um.turma, um.turno) == ("6º ANO B", "Matutino")
+    assert [n.disciplina for n in um.notas] == ["Arte", "Redação"]
+    assert (dois.turma, dois.turno) == ("7º ANO C", "Vespertino")
+    assert errors == ["Página 3: Aluno sem matrícula ignorado."]
+
+
+def test_parse_result_cache_round_trips_records():
+    records = [
+        ParsedAlunoRecord(
+            matricula="10001", nome="ALUNO UM", turma="6º ANO A", turno="Matutino",
+            notas=[ParsedNotaRecord("Matemática", "matematica", 8.5, None, 9.0, 17.5, 2, "APR")],
+        ),
+        ParsedAlunoRecord(matricula="10002", nome="ALUNO DOIS", turma=None, turno=None),
+    ]
+
+    encoded = _encode_parse_result(records, 2025, ["aviso"])
+
+    assert _decode_parse_result(encoded) == (records, 2025, ["aviso"])
+    assert _encode_parse_result(records, 2025, ["aviso"]) == encoded
+
+
+def test_extract_page_layout_matches_extract_text_and_tables(tmp_path, synthetic_boletim):
+    pdf_path = tmp_path / "boletim.pdf"
+    synthetic_boletim.write_boletim_pdf(pdf_path, 2, alunos_per_page=2)
+
+    with pdfplumber.open(str(pdf_path)) as pdf:
+        for page in pdf.pages:
+            text, tables = _extract_page_layout(page)
+            assert tables == page.extract_tables()
+            # Free text keeps the header and student lines, without the grade tables.
+            full_text = page.extract_text()
+            assert [line for line in full_text.splitlines() if line in text.splitlines()] == text.splitlines()
+            assert text.count("Matrícula:") == 2
+            assert "Matemática" not in text and "Matemática" in full_text
+
+
+def _skipped(pdf, tenant_id, year_id) -> bool:
+    return process_pdf(pdf, tenant_id=tenant_id, academic_year_id=year_id)["skipped"]
+
+
+def test_process_pdf_skips_every_already_applied_file_of_a_batch(tmp_path, monkeypatch, db_engine, synthetic_boletim):
+    monkeypatch.setattr(settings, "upload_folder", str(tmp_path / "uploads"))
+    store: dict[str, bytes] = {}
+    versions = {"current": 1}
+    monkeypatch.setattr(ingestion, "cache_get", store.get)
+    monkeypatch.setattr(ingestion, "cache_set", lambda key, value, timeout=None: store.__setitem__(
+        key, value if isinstance(value, bytes) else str(value).encode()))
+    monkeypatch.setattr(ingestion, "data_version", lambda tenant_id, year_id: versions["current"])
+    monkeypatch.setattr(ingestion, "bump_data_version", lambda tenant_id, year_id: versions.update(current=versions["current"] + 1))
+    monkeypatch.setattr(risk_scores, "after_ingestion", lambda *args, **kwargs: None)
+    tenant_id, year_id = _tenant_year("ingest-marker")
+    pdf_a, pdf_b = tmp_path / "a.pdf", tmp_path / "b.pdf"
+    synthetic_boletim.write_boletim_pdf(pdf_a, 1, first_matricula=73000)
+    synthetic_boletim.write_boletim_pdf(pdf_b, 1, seed=7, first_matricula=74000)
+    try:
+        for pdf in (pdf_a, pdf_b):
+            assert _skipped(pdf, tenant_id, year_id) is False
+        # A's marker predates B's write; the re-check writes nothing and re-stamps it at the current version...
+        assert [_skipped(pdf, tenant_id, year_id) for pdf in (pdf_a, pdf_b)] == [False, True]
+        # ...so re-sending the batch again skips A too, although B was the last file applied.
+        assert [_skipped(pdf, tenant_id, year_id) for pdf in (pdf_a, pdf_b)] == [True, True]
+        # A write to the tenant/year invalidates every marker.
+        versions["current"] += 1
+        assert _skipped(pdf_a, tenant_id, year_id) is False
+    finally:
+        with session_scope() as session:
+            for model in (Usuario, Nota, Aluno):
+                session.execute(delete(model).where(model.tenant_id == tenant_id))
@@ -0,0 +1,51 @@
+import json
+
+from app.services.job_progress import JobProgress, progress_channel
+
+
+class FakeConnection:
+    def __init__(self):
+        self.published = []
+
+    def publish(self, channel, message):
+        self.published.append((channel, json.loads(message)))
+
+
+class FakeJob:
+    id = "job-1"
+
+    def __init__(self):
+        self.meta = {}
+        self.saves = 0
+        self.connection = FakeConnection()
+
+    def save_meta(self):
+        self.saves += 1
+
+
+def test_job_progress_throttles_updates_but_always_publishes_phase_ends():
+    job = FakeJob()
+    progress = JobProgress(job, interval=3600)
+
+    progress.phase("parsing", total=100, unit="pages")
+    for done in range(1, 101):
+        progress.advance(done, records=done * 2)
+    progress.finish(alunos=200)
+
+    phases = [(message["phase"], message["done"]) for _, message in job.connection.published]
+    assert phases == [("parsing", 0), ("parsing", 100), ("finished", 0)]
+    assert {channel for channel, _ in job.connection.published} == {progress_channel("job-1")}
+    assert job.connection.published[1][1]["records"] == 200
+    assert job.connection.published[1][1]["eta_seconds"] == 0
+    assert job.meta["progress"]["alunos"] == 200
+    assert job.saves == 3
+
+
+def test_job_progress_without_job_only_keeps_state():
+    progress = JobProgress(None, interval=0)
+
+    progress.phase("diffing", total=4, unit="alunos")
+    progress.advance(2)
+
+    assert progress.state["done"] == 2
+    assert progress.state["eta_seconds"] is not None
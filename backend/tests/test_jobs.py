@@ -0,0 +1,106 @@
+import json
+import threading
+import time
+
+from flask_jwt_extended import create_access_token
+from sqlalchemy import delete
+
+from app.core.database import session_scope
+from app.core import jobs
+from app.core.jobs import LocalJobBackend
+from app.models import Tenant
+from app.services.job_progress import JobProgress, stream_events
+
+
+def _wait_for(backend, job_ids, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if all(backend.fetch(job_id).get_status() in {"finished", "failed"} for job_id in job_ids):
+            return
+        time.sleep(0.01)
+    raise AssertionError("jobs did not finish")
+
+
+def test_local_backend_serializes_each_tenant_and_keeps_the_job_contract(monkeypatch):
+    monkeypatch.setattr("app.core.jobs.settings.tenant_job_concurrency", 1)
+    backend = LocalJobBackend(workers=4, max_pending=10)
+    lock = threading.Lock()
+    running = {"1": 0, "2": 0}
+    overlap = {"1": 0, "2": 0}
+
+    def work(tenant, value):
+        with lock:
+            running[tenant] += 1
+            overlap[tenant] = max(overlap[tenant], running[tenant])
+        time.sleep(0.02)
+        with lock:
+            running[tenant] -= 1
+        if value < 0:
+            raise ValueError("nota inválida")
+        return {"count": value}
+
+    job_ids = [
+        backend.submit(work, (str(tenant), value), {}, tenant_id=tenant, priority="interactive", job_timeout=60, meta=None)
+        for tenant, value in [(1, 1), (1, 2), (2, 3), (2, -1), (1, 4)]
+    ]
+    _wait_for(backend, job_ids)
+
+    assert overlap == {"1": 1, "2": 1}
+    first = backend.fetch(job_ids[0])
+    assert first.is_finished and first.result == {"count": 1}
+    assert first.enqueued_at <= first.started_at <= first.ended_at
+    assert first.meta == {"tenant": "1", "priority": "interactive"}
+    failed = backend.fetch(job_ids[3])
+    assert failed.get_status() == "failed"
+    assert failed.latest_result().exc_string.strip().endswith("ValueError: nota inválida")
+    assert backend.fetch("unknown") is None
+    assert backend.stats()["tenants"]["1"]["wait"]["interactive"]["jobs"] == 3
+
+
+def test_local_backend_streams_progress_events_without_redis():
+    backend = LocalJobBackend(workers=1, max_pending=10)
+    gate = threading.Event()
+
+    def work():
+        gate.wait(5)
+        progress = JobProgress(backend.current_job(), interval=0)
+        progress.phase("parsing", total=2, unit="pages")
+        progress.advance(2)
+        progress.finish(alunos=2)
+        return {"count": 2}
+
+    job = backend.fetch(backend.submit(work, (), {}, tenant_id=1, priority="interactive", job_timeout=60, meta=None))
+    events = stream_events(job, timeout=5)
+    frames = [next(events)]
+    gate.set()
+    frames.extend(events)
+
+    assert json.loads(frames[0].split("data: ", 1)[1])["status"] in {"queued", "started"}
+    phases = [json.loads(f.split("data: ", 1)[1])["phase"] for f in frames if f.startswith("event: progress")]
+    assert phases == ["parsing", "parsing", "finished"]
+    final = json.loads(frames[-1].split("data: ", 1)[1])
+    assert (final["status"], final["result"]) == ("finished", {"count": 2})
+
+
+def test_job_endpoints_hide_other_tenants_jobs(flask_app, client, db_engine, monkeypatch):
+    backend = LocalJobBackend(workers=1, max_pending=10)
+    monkeypatch.setattr(jobs, "_backend", backend)
+    with session_scope() as session:
+        tenants = [Tenant(name=f"Jobs {slug}", slug=f"jobs-{slug}") for slug in ("a", "b")]
+        session.add_all(tenants)
+        session.flush()
+        own, other = (tenant.id for tenant in tenants)
+    with flask_app.app_context():
+        token = create_access_token(identity="1", additional_claims={"tenant_id": own, "roles": ["admin"]})
+    job_id = jobs.submit_job(lambda: {"changes": [{"matricula": "X"}]}, tenant_id=other)
+    _wait_for(backend, [job_id])
+
+    try:
+        for path in (f"/api/v1/uploads/jobs/{job_id}", f"/api/v1/uploads/jobs/{job_id}/events"):
+            headers = {"Authorization": f"Bearer {token}", "X-Tenant-ID": str(own)}
+            assert client.get(path, headers=headers).status_code == 404
+            headers["X-Tenant-ID"] = str(other)
+            assert client.get(path, headers=headers).status_code == 200
+    finally:
+        with session_scope() as session:
+            session.execute(delete(Tenant).where(Tenant.id.in_([own, other])))
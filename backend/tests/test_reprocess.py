@@ -0,0 +1,81 @@
+import io
+
+from sqlalchemy import delete
+
+from app.core.config import settings
+from app.core.database import session_scope
+from app.models import AcademicYear, Aluno, Nota, Tenant, Usuario
+from app.services import upload_store
+from app.services.reprocess import Checkpoint, collect_upload_files, run_local
+
+
+def test_run_local_resumes_from_checkpoint_and_retries_failures(tmp_path, monkeypatch, db_engine, synthetic_boletim):
+    monkeypatch.setattr(settings, "upload_folder", str(tmp_path / "uploads"))
+    source = tmp_path / "boletim.pdf"
+    synthetic_boletim.write_boletim_pdf(source, 2, first_matricula=71000)
+    with open(source, "rb") as handle:
+        upload_store.save_upload(handle, tmp_path / "uploads" / "Matutino" / "6A" / "boletim.pdf")
+    # The same content under another path is processed once.
+    with open(source, "rb") as handle:
+        upload_store.save_upload(handle, tmp_path / "uploads" / "Matutino" / "6B" / "copia.pdf")
+    upload_store.save_upload(io.BytesIO(b"not a pdf"), tmp_path / "uploads" / "Matutino" / "6A" / "quebrado.pdf")
+    _, done_digest = upload_store.save_upload(io.BytesIO(b"%PDF done"), tmp_path / "uploads" / "antigo.pdf")
+
+    with session_scope() as session:
+        tenant = Tenant(name="Reprocess", slug="reprocess-test")
+        session.add(tenant)
+        session.flush()
+        tenant_id = tenant.id
+
+    files = collect_upload_files()
+    checkpoint = Checkpoint(tmp_path / "run.checkpoint")
+    checkpoint.add(done_digest)
+    try:
+        summary = run_local(
+            files, tenant_id=tenant_id, academic_year_id=None, year_label=None, checkpoint=checkpoint, workers=1,
+        )
+
+        assert len(files) == 3
+        assert (summary.processed, summary.skipped, summary.failed) == (1, 1, 1)
+        assert summary.alunos == 2
+        assert summary.failures[0][0].endswith("quebrado.pdf")
+        # The failed file is retried by the next run, the others are not.
+        assert Checkpoint(checkpoint.path).done == {done_digest, files[0].digest}
+    finally:
+        with session_scope() as session:
+            for model in (Usuario, Nota, Aluno, AcademicYear):
+                session.execute(delete(model).where(model.tenant_id == tenant_id))
+            session.execute(delete(Tenant).where(Tenant.id == tenant_id))
+
+
+def test_run_local_pool_parses_in_parallel_but_writes_serially(tmp_path, monkeypatch, db_engine, synthetic_boletim):
+    monkeypatch.setattr(settings, "upload_folder", str(tmp_path / "uploads"))
+    # Two boletins of a year the tenant does not have yet, sharing alunos.
+    for name, seed in (("a.pdf", 1), ("b.pdf", 2)):
+        source = tmp_path / name
+        synthetic_boletim.write_boletim_pdf(source, 3, seed=seed, year=2031, first_matricula=72000)
+        with open(source, "rb") as handle:
+            upload_store.save_upload(handle, tmp_path / "uploads" / "Matutino" / "7A" / name)
+
+    with session_scope() as session:
+        tenant = Tenant(name="Reprocess pool", slug="reprocess-pool-test")
+        session.add(tenant)
+        session.flush()
+        tenant_id = tenant.id
+
+    try:
+        summary = run_local(
+            collect_upload_files(), tenant_id=tenant_id, academic_year_id=None, year_label=None,
+            checkpoint=Checkpoint(tmp_path / "pool.checkpoint"), workers=2,
+        )
+
+        assert (summary.processed, summary.failed) == (2, 0), summary.failures
+        with session_scope() as session:
+            years = session.query(AcademicYear).filter(AcademicYear.tenant_id == tenant_id).all()
+            assert [year.label for year in years] == ["2031"]
+            assert session.query(Aluno).filter(Aluno.tenant_id == tenant_id).count() == 3
+    finally:
+        with session_scope() as session:
+            for model in (Usuario, Nota, Aluno, AcademicYear):
+                session.execute(delete(model).where(model.tenant_id == tenant_id))
+            session.execute(delete(Tenant).where(Tenant.id == tenant_id))
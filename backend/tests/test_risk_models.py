@@ -0,0 +1,66 @@
+import numpy as np
+import pytest
+from sklearn.linear_model import LogisticRegression
+
+from app.core.exceptions import NotFoundError
+from app.services import risk_models
+
+
+def _model(weight):
+    return risk_models.LinearRiskModel(["a", "b"], [weight, 0.0], 0.0)
+
+
+@pytest.fixture
+def model_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(risk_models.settings, "risk_model_dir", str(tmp_path))
+    risk_models.models.clear()
+    yield tmp_path
+    risk_models.models.clear()
+
+
+def test_versions_are_listed_activated_and_pruned(model_dir, monkeypatch):
+    monkeypatch.setattr(risk_models, "KEEP_VERSIONS", 2)
+    first = risk_models.save_model(3, _model(1), {"alunos": 10, "accuracy": 0.9})
+    assert risk_models.activate_version(3, first["version"])["active"]
+    later = [risk_models.save_model(3, _model(n), {"alunos": 10 + n}, activate=False) for n in (2, 3, 4)]
+
+    versions = risk_models.list_versions(3)
+    # The active version survives pruning; only KEEP_VERSIONS others are kept.
+    assert [v["version"] for v in versions] == [later[2]["version"], later[1]["version"], first["version"]]
+    assert [v["active"] for v in versions] == [False, False, True]
+    assert versions[-1]["alunos"] == 10 and versions[-1]["tenant_id"] == 3
+    assert not list(model_dir.glob("3/*.tmp"))
+    assert risk_models.list_scopes() == ["3"]
+
+    with pytest.raises(NotFoundError):
+        risk_models.activate_version(3, later[0]["version"])
+    with pytest.raises(NotFoundError):
+        risk_models.activate_version(3, "../3/ACTIVE")
+
+
+def test_model_cache_rereads_active_only_after_the_check_interval(model_dir):
+    now = [0.0]
+    cache = risk_models.ModelCache(check_seconds=30, clock=lambda: now[0])
+    old = risk_models.save_model(None, _model(1), {})
+    new = risk_models.save_model(None, _model(2), {}, activate=False)
+
+    assert cache.get(None)[0].weights.tolist() == [1.0, 0.0]
+    assert cache.get(5) is None
+    # Activated by another process: this one keeps the cached model until the interval passes.
+    (model_dir / "global" / risk_models.ACTIVE_FILENAME).write_text(new["version"])
+    now[0] = 29.0
+    assert cache.get(None)[1]["version"] == old["version"]
+    now[0] = 30.0
+    model, meta = cache.get(None)
+    assert model.weights.tolist() == [2.0, 0.0] and meta == new
+
+
+def test_linear_model_matches_the_estimator_it_was_exported_from():
+    X = np.array([[80.0, 0], [30.0, 4], [55.0, 2], [65.0, 1], [-2000.0, 900]])
+    estimator = LogisticRegression().fit(X[:4], [0, 1, 1, 0])
+    model = risk_models.LinearRiskModel.from_json(risk_models.LinearRiskModel.from_estimator(estimator, ["a", "b"]).to_json())
+
+    assert model.features == ["a", "b"]
+    assert np.allclose(model.predict_proba(X), estimator.predict_proba(X)[:, 1])
+    with pytest.raises(ValueError):
+        risk_models.LinearRiskModel(["a"], [1.0, 2.0], 0.0)
@@ -0,0 +1,119 @@
+import numpy as np
+import pytest
+from sklearn.linear_model import LogisticRegression
+from sqlalchemy import delete, select
+
+from app.core.database import session_scope
+from app.models import AcademicYear, Aluno, Nota, RiskScore, Tenant
+from app.repositories.aluno_repository import AlunoRepository
+from app.services import analytics, risk_models, risk_scores
+from app.services.ai_predictor import FEATURE_SCHEMA, FEATURES
+
+# matricula: (total, faltas) of its only nota
+ALUNOS = {"RS-1": (95, 0), "RS-2": (40, 25), "RS-3": (55, 12)}
+
+
+@pytest.fixture
+def scored_tenant(db_engine, tmp_path, monkeypatch):
+    monkeypatch.setattr(risk_models.settings, "risk_model_dir", str(tmp_path))
+    risk_models.models.clear()
+    with session_scope() as session:
+        tenant = Tenant(name="Risk scores", slug="risk-scores-test")
+        session.add(tenant)
+        session.flush()
+        year = AcademicYear(tenant_id=tenant.id, label="2025")
+        session.add(year)
+        session.flush()
+        alunos = {
+            m: Aluno(matricula=m, nome=m, turma="7B", turno="Vespertino", tenant_id=tenant.id, academic_year_id=year.id)
+            for m in ALUNOS
+        }
+        session.add_all(alunos.values())
+        session.flush()
+        for m, (total, faltas) in ALUNOS.items():
+            session.add(Nota(
+                aluno_id=alunos[m].id, disciplina="MAT", disciplina_normalizada="MAT", total=total, faltas=faltas,
+                tenant_id=tenant.id, academic_year_id=year.id,
+            ))
+        tenant_id = tenant.id
+        ids = {m: aluno.id for m, aluno in alunos.items()}
+    # Risk grows with faltas.
+    model = LogisticRegression().fit(np.array([[90.0, 0, 0, 0], [40.0, 1, 30, 0], [60.0, 0, 10, 0], [50.0, 1, 20, 0]]), [0, 1, 0, 1])
+    risk_models.save_model(tenant_id, risk_models.LinearRiskModel.from_estimator(model, FEATURES), {"feature_schema": FEATURE_SCHEMA})
+
+    yield tenant_id, ids
+
+    risk_models.models.clear()
+    with session_scope() as session:
+        for model in (RiskScore, Nota, Aluno, AcademicYear):
+            session.execute(delete(model).where(model.tenant_id == tenant_id))
+        session.execute(delete(Tenant).where(Tenant.id == tenant_id))
+
+
+def _stored(tenant_id):
+    with session_scope() as session:
+        return {
+            aluno_id: (score, version)
+            for aluno_id, score, version in session.execute(
+                select(RiskScore.aluno_id, RiskScore.score, RiskScore.model_version).where(RiskScore.tenant_id == tenant_id)
+            )
+        }
+
+
+def test_refresh_upserts_one_score_per_aluno_and_year(scored_tenant, monkeypatch):
+    tenant_id, ids = scored_tenant
+    monkeypatch.setattr(risk_scores, "REFRESH_CHUNK_SIZE", 2)
+
+    result = risk_scores.refresh_risk_scores(tenant_id, turmas=["7B"])
+    first = _stored(tenant_id)
+    version = risk_models.active_version(tenant_id)
+
+    assert result["alunos"] == 3 and result["model_version"] == version
+    assert set(first) == set(ids.values())
+    assert {v for _, v in first.values()} == {version}
+    assert first[ids["RS-2"]][0] > first[ids["RS-3"]][0] > first[ids["RS-1"]][0]
+
+    # Rerunning replaces the rows instead of adding more.
+    assert risk_scores.refresh_risk_scores(tenant_id)["alunos"] == 3
+    assert len(_stored(tenant_id)) == 3
+    assert risk_scores.refresh_risk_scores(tenant_id, turmas=["9Z"])["alunos"] == 0
+
+
+def test_alunos_listing_and_dashboard_read_stored_scores(scored_tenant, monkeypatch):
+    tenant_id, ids = scored_tenant
+    risk_scores.refresh_risk_scores(tenant_id)
+    scores = {aluno_id: score for aluno_id, (score, _) in _stored(tenant_id).items()}
+    monkeypatch.setattr(risk_models.models, "get", lambda *a: pytest.fail("scored on the request path"))
+
+    with session_scope() as session:
+        repo = AlunoRepository(session)
+        rows, total = repo.get_paginated_with_average(turma="7B", sort="-risk_score")
+        assert total == 3
+        assert [row.id for row in rows] == [ids["RS-2"], ids["RS-3"], ids["RS-1"]]
+        assert rows[0].risk_score == pytest.approx(scores[ids["RS-2"]])
+
+        threshold = scores[ids["RS-3"]]
+        rows, total = repo.get_paginated_with_average(turma="7B", risk_min=threshold)
+        assert total == 2 and [row.nome for row in rows] == ["RS-2", "RS-3"]
+
+        dashboard = analytics.build_teacher_dashboard(session, turma="7B")
+    alerts = {alert["nome"]: alert["risk_score"] for alert in dashboard["alerts"]}
+    assert alerts["RS-2"] == pytest.approx(scores[ids["RS-2"]])
+
+
+def test_after_ingestion_rescores_turmas_only_when_training_is_already_pending(monkeypatch):
+    from app.services import ai_predictor
+
+    refreshes = []
+    monkeypatch.setattr(risk_scores.settings, "risk_refresh_after_ingestion", True)
+    monkeypatch.setattr(risk_scores, "request_risk_refresh", lambda *args: refreshes.append(args))
+
+    # A new training rescores the whole tenant with the new model.
+    monkeypatch.setattr(ai_predictor, "request_training", lambda tenant_id: "train-1")
+    risk_scores.after_ingestion(5, 9, {"7B"})
+    assert refreshes == []
+
+    # Deduplicated: the pending training may predate this import.
+    monkeypatch.setattr(ai_predictor, "request_training", lambda tenant_id: None)
+    risk_scores.after_ingestion(5, 9, {"7B"})
+    assert refreshes == [(5, 9, {"7B"})]
@@ -0,0 +1,88 @@
+from app.core import scheduler
+
+
+class FakeRedis:
+    def __init__(self, tenants):
+        self.tenants = tenants
+        self.cursor = 0
+
+    def smembers(self, key):
+        return {tenant.encode() for tenant in self.tenants} if key == scheduler._tenants_key("bulk") else set()
+
+    def incr(self, key):
+        self.cursor += 1
+        return self.cursor
+
+
+def test_dispatch_admits_round_robin_within_the_tenant_limit(monkeypatch):
+    pending = {"1": ["a1", "a2", "a3"], "2": ["b1"], "3": ["c1", "c2"]}
+    slots = {tenant: 0 for tenant in pending}
+    admitted = []
+
+    def admit(priority, tenant, limit):
+        if slots[tenant] >= limit or not pending[tenant]:
+            return None
+        slots[tenant] += 1
+        return pending[tenant].pop(0)
+
+    monkeypatch.setattr(scheduler, "redis_conn", FakeRedis(pending))
+    monkeypatch.setattr(scheduler, "_admit", admit)
+    monkeypatch.setattr(scheduler, "_enqueue", lambda priority, tenant, job_id: admitted.append(job_id))
+    monkeypatch.setattr(scheduler.settings, "tenant_job_concurrency", 1)
+
+    # One job per tenant, starting after the rotating cursor.
+    assert scheduler.dispatch() == 3
+    assert admitted == ["b1", "c1", "a1"]
+
+    # With free slots every tenant gets one job per round until its list is empty.
+    slots.update({tenant: 0 for tenant in slots})
+    admitted.clear()
+    monkeypatch.setattr(scheduler.settings, "tenant_job_concurrency", 5)
+    assert scheduler.dispatch() == 3
+    assert admitted == ["c2", "a2", "a3"]
+
+
+class SlotsRedis:
+    def __init__(self, slots):
+        self.slots = slots
+
+    def scan_iter(self, pattern):
+        return [scheduler._slots_key(tenant).encode() for tenant in self.slots]
+
+    def zrange(self, key, start, end):
+        return [job_id.encode() for job_id in self.slots[key.decode().rsplit(":", 1)[1]]]
+
+    def zrem(self, key, *job_ids):
+        members = self.slots[key.decode().rsplit(":", 1)[1]]
+        removed = [job_id for job_id in job_ids if job_id in members]
+        for job_id in removed:
+            members.remove(job_id)
+        return len(removed)
+
+
+class StubJob:
+    def __init__(self, status):
+        self.status = status
+
+    def get_status(self, refresh=True):
+        return self.status
+
+
+def test_reap_slots_gives_back_slots_of_jobs_no_longer_running(monkeypatch):
+    statuses = {
+        "running": scheduler.JobStatus.STARTED,
+        "admitted": scheduler.JobStatus.QUEUED,
+        # Work horse killed: RQ marks the job failed without running its callbacks.
+        "killed": scheduler.JobStatus.FAILED,
+        "done": scheduler.JobStatus.FINISHED,
+    }
+    slots = {"1": ["running", "killed"], "2": ["admitted", "done", "expired"], "3": []}
+    monkeypatch.setattr(scheduler, "redis_conn", SlotsRedis(slots))
+    monkeypatch.setattr(
+        scheduler.Job, "fetch_many",
+        lambda job_ids, connection: [StubJob(statuses[job_id]) if job_id in statuses else None for job_id in job_ids],
+    )
+
+    assert scheduler.reap_slots() == 3
+    assert slots == {"1": ["running"], "2": ["admitted"], "3": []}
+    assert scheduler.reap_slots() == 0
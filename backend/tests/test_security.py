@@ -0,0 +1,44 @@
+import threading
+
+from passlib.hash import bcrypt
+
+from app.core.hashing import PasswordHasher, configured_rounds, password_hasher
+from app.core.security import hash_passwords, verify_and_update_password, verify_password
+
+
+def test_verify_and_update_rehashes_when_cost_changes():
+    outdated_rounds = 5 if configured_rounds() != 5 else 6
+    outdated = bcrypt.using(rounds=outdated_rounds).hash("segredo")
+
+    valid, new_hash = verify_and_update_password("segredo", outdated)
+
+    assert valid is True
+    assert new_hash is not None
+    assert bcrypt.from_string(new_hash).rounds == configured_rounds()
+    assert verify_and_update_password("segredo", new_hash) == (True, None)
+    assert verify_and_update_password("errado", outdated) == (False, None)
+
+
+def test_hash_passwords_records_wait_metrics():
+    calls_before = password_hasher.stats()["calls"]
+
+    hashes = hash_passwords(["1001", "1002"])
+
+    assert [verify_password(raw, hashed) for raw, hashed in zip(["1001", "1002"], hashes)] == [True, True]
+    stats = password_hasher.stats()
+    assert stats["calls"] >= calls_before + 4
+    assert stats["rounds"] == configured_rounds()
+
+
+def test_pooled_hashing_from_threads_uses_the_fork_server():
+    hasher = PasswordHasher(workers=2, max_pending=8)
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(hasher.hash_many(["2001", "2002"]))) for _ in range(3)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(timeout=60)
+
+    assert hasher._executor()._mp_context.get_start_method() in {"forkserver", "spawn"}
+    assert len(results) == 3
+    assert all(verify_password("2002", hashes[1]) for hashes in results)
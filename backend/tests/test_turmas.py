@@ -0,0 +1,64 @@
+from app.models import AcademicYear, Aluno, Nota, Tenant
+from app.services.turma_service import TurmaService, turma_detail_cache_key
+
+
+def _seed_turma(session):
+    tenant = Tenant(name="Escola Teste Turmas", slug="teste-turmas")
+    session.add(tenant)
+    session.flush()
+    year = AcademicYear(tenant_id=tenant.id, label="2025", is_current=True)
+    session.add(year)
+    session.flush()
+
+    def aluno(matricula, nome, notas):
+        registro = Aluno(
+            matricula=matricula, nome=nome, turma="6º ANO A", turno="Matutino",
+            tenant_id=tenant.id, academic_year_id=year.id,
+        )
+        session.add(registro)
+        session.flush()
+        for disciplina, total, situacao in notas:
+            session.add(Nota(
+                aluno_id=registro.id, disciplina=disciplina, disciplina_normalizada=disciplina.lower(),
+                total=total, faltas=1, situacao=situacao,
+                tenant_id=tenant.id, academic_year_id=year.id,
+            ))
+
+    aluno("T-001", "ANA", [("Arte", 80, "APR"), ("Matemática", 55, "rep")])
+    aluno("T-002", "BRUNO", [("Arte", 70, "APR"), ("Matemática", 65, "AR")])
+    aluno("T-003", "CARLA", [("Arte", 40, ""), ("Matemática", None, "REC")])
+    aluno("T-004", "DANIEL", [])
+    session.flush()
+    return tenant.id, year.id
+
+
+def test_turma_detail_computes_media_and_situacao_in_sql(session):
+    tenant_id, year_id = _seed_turma(session)
+
+    detail = TurmaService(session).get_turma_detail("6o-ano-a", tenant_id, year_id)
+
+    assert detail["turma"] == "6º ANO A"
+    assert detail["total"] == 4
+    por_nome = {a["nome"]: a for a in detail["alunos"]}
+    assert [a["nome"] for a in detail["alunos"]] == ["ANA", "BRUNO", "CARLA", "DANIEL"]
+
+    assert por_nome["ANA"]["media"] == 67.5
+    assert por_nome["ANA"]["situacao"] == "REP"
+    assert por_nome["BRUNO"]["situacao"] == "AR"
+    assert por_nome["CARLA"]["media"] == 40.0
+    assert por_nome["CARLA"]["situacao"] == "REC"
+
+    assert por_nome["DANIEL"]["notas"] == []
+    assert por_nome["DANIEL"]["media"] is None
+    assert por_nome["DANIEL"]["situacao"] == "APR"
+
+    nota = por_nome["ANA"]["notas"][0]
+    assert nota == {
+        "disciplina": "Arte", "trimestre1": None, "trimestre2": None, "trimestre3": None,
+        "total": 80.0, "faltas": 1, "situacao": "APR",
+    }
+
+
+def test_turma_detail_cache_key_is_shared_by_name_and_slug():
+    assert turma_detail_cache_key(1, 2, "6º ANO A") == turma_detail_cache_key(1, 2, "6o-ano-a")
+    assert turma_detail_cache_key(1, 2, "6º ANO A") != turma_detail_cache_key(1, 3, "6º ANO A")
@@ -0,0 +1,89 @@
+import io
+import json
+import zipfile
+
+import pytest
+
+from app.core.config import settings
+from app.services import upload_batches
+from app.services.ingestion import infer_turma_turno
+from app.services.upload_batches import _expand
+
+
+def test_expand_unpacks_zip_members_and_rejects_other_files():
+    archive = io.BytesIO()
+    with zipfile.ZipFile(archive, "w") as zf:
+        zf.writestr("9 ano/boletim 9A.pdf", b"%PDF-1.4 a")
+        zf.writestr("__MACOSX/9 ano/._boletim 9A.pdf", b"junk")
+        zf.writestr("leia-me.txt", b"texto")
+    archive.seek(0)
+
+    expanded = [
+        (name, stream.read() if stream else None, error)
+        for name, stream, error in _expand([
+            ("lote.zip", archive),
+            ("6A.pdf", io.BytesIO(b"%PDF-1.4 b")),
+            ("planilha.xlsx", io.BytesIO(b"x")),
+            ("quebrado.zip", io.BytesIO(b"not a zip")),
+        ])
+    ]
+
+    assert expanded == [
+        ("boletim_9A.pdf", b"%PDF-1.4 a", None),
+        ("6A.pdf", b"%PDF-1.4 b", None),
+        ("planilha.xlsx", None, "apenas arquivos PDF ou ZIP"),
+        ("quebrado.zip", None, "ZIP inválido"),
+    ]
+
+
+def test_infer_turma_turno_reads_the_turma_line(tmp_path, synthetic_boletim):
+    pdf_path = tmp_path / "boletim.pdf"
+    synthetic_boletim.write_boletim_pdf(pdf_path, 2)
+
+    assert infer_turma_turno(pdf_path) == ("6º ANO A", "Matutino")
+
+
+def _corrupt_member_zip() -> bytes:
+    archive = io.BytesIO()
+    with zipfile.ZipFile(archive, "w", compression=zipfile.ZIP_DEFLATED) as zf:
+        zf.writestr("6A.pdf", b"%PDF-1.4 boletim 6A")
+        zf.writestr("6B.pdf", b"%PDF-1.4 boletim 6B " * 200)
+    data = bytearray(archive.getvalue())
+    # Garbles 6B's deflate stream; the central directory stays valid.
+    start = data.index(b"6B.pdf") + len(b"6B.pdf")
+    data[start:start + 40] = bytes(range(200, 240))
+    return bytes(data)
+
+
+def test_create_batch_rejects_damaged_members_and_saves_the_record(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "upload_folder", str(tmp_path))
+    submitted, records = [], {}
+    monkeypatch.setattr(
+        upload_batches, "submit_job",
+        lambda func, args, kwargs, **options: submitted.append((func, args, kwargs, options)) or f"job-{len(submitted)}",
+    )
+    monkeypatch.setattr(upload_batches, "save_record", lambda key, data, ttl: records.__setitem__(key, json.loads(data)))
+
+    batch = upload_batches.create_batch(
+        [("lote.zip", io.BytesIO(_corrupt_member_zip())), ("7A.pdf", io.BytesIO(b"%PDF-1.4 boletim 7A"))],
+        tenant_id=3, academic_year_id=4, turno="Matutino",
+    )
+
+    assert [entry["filename"] for entry in batch["files"]] == ["6A.pdf", "7A.pdf"]
+    assert batch["rejected"] == [{"filename": "6B.pdf", "error": "arquivo corrompido"}]
+    assert records[upload_batches.batch_key(batch["batch_id"])]["files"] == batch["files"]
+    # The PDF is only read by the job.
+    func, (blob, link_name), kwargs, options = submitted[0]
+    assert func is upload_batches.process_batch_file and link_name == "6A.pdf"
+    assert blob.read_bytes() == b"%PDF-1.4 boletim 6A"
+    assert kwargs["turno"] == "Matutino" and options["tenant_id"] == 3
+
+
+def test_batch_file_job_fails_without_turma(tmp_path, monkeypatch):
+    blob = tmp_path / "blob.pdf"
+    blob.write_bytes(b"%PDF-1.4")
+    monkeypatch.setattr(upload_batches, "infer_turma_turno", lambda path: (None, "Matutino"))
+    monkeypatch.setattr(upload_batches, "process_pdf", lambda *a, **k: pytest.fail("ingested without turma"))
+
+    with pytest.raises(ValueError, match="turma/turno"):
+        upload_batches.process_batch_file(blob, "boletim.pdf", tenant_id=1, academic_year_id=1)
@@ -0,0 +1,63 @@
+import io
+import os
+import time
+
+import pytest
+
+from app.core.config import settings
+from app.services import upload_store
+
+
+@pytest.fixture
+def upload_folder(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "upload_folder", str(tmp_path))
+    return tmp_path
+
+
+def test_identical_uploads_share_one_blob(upload_folder):
+    _, first = upload_store.save_upload(io.BytesIO(b"%PDF-1.4 boletim"), upload_folder / "matutino" / "6A" / "a.pdf")
+    blob, second = upload_store.save_upload(io.BytesIO(b"%PDF-1.4 boletim"), upload_folder / "vespertino" / "6B" / "b.pdf")
+
+    assert first == second
+    assert blob == upload_store.blob_path(first)
+    assert len(list((upload_folder / ".store" / "blobs").glob("*/*.pdf"))) == 1
+    assert (upload_folder / "vespertino" / "6B" / "b.pdf").read_bytes() == b"%PDF-1.4 boletim"
+    assert sorted(p.name for p in upload_store.iter_upload_links()) == ["a.pdf", "b.pdf"]
+
+
+def test_collect_garbage_removes_replaced_blob_and_its_sidecars(upload_folder):
+    link = upload_folder / "matutino" / "6A" / "boletim.pdf"
+    _, old = upload_store.save_upload(io.BytesIO(b"versao 1"), link)
+    upload_store.write_sidecar(old, "parsed-x.json.gz", b"cache")
+    _, new = upload_store.save_upload(io.BytesIO(b"versao 2"), link)
+    # Still in its grace period.
+    assert upload_store.collect_garbage()["blobs"] == 0
+    stale = time.time() - upload_store.STALE_BLOB_SECONDS - 60
+    os.utime(upload_store.blob_path(old), (stale, stale))
+
+    assert upload_store.collect_garbage(dry_run=True)["blobs"] == 1
+    assert upload_store.blob_path(old).exists()
+
+    result = upload_store.collect_garbage()
+
+    assert (result["blobs"], result["sidecars"]) == (1, 1)
+    assert not upload_store.blob_path(old).exists()
+    assert upload_store.read_sidecar(old, "parsed-x.json.gz") is None
+    assert upload_store.blob_path(new).exists()
+    assert link.read_bytes() == b"versao 2"
+
+
+def test_collect_garbage_spares_young_unlinked_blobs(upload_folder):
+    # A dry-run upload or ZIP member: stored without a link, enqueued by blob path.
+    blob, digest = upload_store.save_upload(io.BytesIO(b"dry run"), None)
+    stale = time.time() - upload_store.STALE_BLOB_SECONDS - 60
+    os.utime(blob, (stale, stale))
+    # Uploaded again: the existing blob gets a fresh grace period.
+    upload_store.save_upload(io.BytesIO(b"dry run"), None)
+
+    assert upload_store.collect_garbage()["blobs"] == 0
+    assert blob.exists()
+
+    os.utime(blob, (stale, stale))
+    assert upload_store.collect_garbage()["blobs"] == 1
+    assert not upload_store.blob_path(digest).exists()
@@ -0,0 +1,71 @@
+from flask import g
+
+from app.models import AcademicYear, Aluno, Tenant, Usuario
+from app.services.usuario_service import UsuarioService
+
+
+def _seed_usuarios(session):
+    tenant = Tenant(name="Escola Teste Usuarios", slug="teste-usuarios")
+    outro = Tenant(name="Outra Escola", slug="teste-usuarios-outra")
+    session.add_all([tenant, outro])
+    session.flush()
+    year = AcademicYear(tenant_id=tenant.id, label="2025", is_current=True)
+    session.add(year)
+    session.flush()
+    aluno = Aluno(
+        matricula="U-001", nome="ALUNA LISTADA", turma="6A", turno="Matutino",
+        tenant_id=tenant.id, academic_year_id=year.id,
+    )
+    session.add(aluno)
+    session.flush()
+
+    for username in ["Bia", "ana", "carlos", "Diego", "eva"]:
+        session.add(Usuario(username=f"{username}-lst", password_hash="x", role="professor", tenant_id=tenant.id))
+    session.add(Usuario(username="aluna-lst", password_hash="x", role="aluno", aluno_id=aluno.id, tenant_id=tenant.id))
+    session.add(Usuario(username="zeca-lst", password_hash="x", role="professor", tenant_id=outro.id))
+    session.flush()
+    return tenant.id, year.id
+
+
+def test_list_users_walks_keyset_pages_in_case_insensitive_order(session):
+    tenant_id, _ = _seed_usuarios(session)
+    service = UsuarioService(session)
+
+    seen, after, page = [], None, 1
+    while True:
+        result = service.list_users(page=page, per_page=4, after=after, tenant_id=tenant_id, query="-lst")
+        seen.extend(item["username"] for item in result["items"])
+        assert result["meta"]["total"] == 6
+        after = result["meta"]["next_cursor"]
+        if not after:
+            break
+        page += 1
+
+    assert seen == ["aluna-lst", "ana-lst", "Bia-lst", "carlos-lst", "Diego-lst", "eva-lst"]
+
+
+def test_list_users_keeps_users_without_aluno_and_nests_aluno(session):
+    tenant_id, _ = _seed_usuarios(session)
+
+    result = UsuarioService(session).list_users(page=1, per_page=50, tenant_id=tenant_id, query="a-lst")
+
+    por_nome = {item["username"]: item for item in result["items"]}
+    assert set(por_nome) == {"aluna-lst", "ana-lst", "Bia-lst", "eva-lst"}
+    assert por_nome["aluna-lst"]["aluno"]["nome"] == "ALUNA LISTADA"
+    assert por_nome["ana-lst"]["aluno"] is None
+    assert "sort_key" not in por_nome["ana-lst"]
+
+
+def test_list_users_in_a_tenant_request_keeps_users_without_aluno(session, flask_app):
+    tenant_id, year_id = _seed_usuarios(session)
+
+    # The session listener scopes queries to g.tenant_id/g.academic_year_id; it must not
+    # turn the outer-joined Aluno into an inner filter.
+    with flask_app.test_request_context():
+        g.tenant_id, g.academic_year_id = tenant_id, year_id
+        result = UsuarioService(session).list_users(page=1, per_page=50, tenant_id=tenant_id)
+
+    usernames = {item["username"] for item in result["items"]}
+    assert {"ana-lst", "Bia-lst", "carlos-lst", "Diego-lst", "eva-lst", "aluna-lst"} <= usernames
+    assert "zeca-lst" not in usernames
+    assert result["meta"]["total"] == len(usernames)
@@ -47,6 +47,8 @@ const getMediaColor = (media?: number | null): "default" | "success" | "warning"
   return "warning";
 };
 
+// Same threshold as RISK_ALERT in backend/app/services/risk_scores.py
+const RISK_ALERT = 0.5;
 
 export const AlunosPage = () => {
   const [searchParams, setSearchParams] = useSearchParams();
@@ -63,6 +65,7 @@ export const AlunosPage = () => {
 
   const [turno, setTurno] = useState("");
   const [turma, setTurma] = useState("");
+  const [sort, setSort] = useState("nome");
   const [open, setOpen] = useState(false);
 
   const user = useAppSelector((state) => state.auth.user);
@@ -107,8 +110,9 @@ export const AlunosPage = () => {
     if (turno) params.turno = turno;
     if (turma) params.turma = turma;
     if (search) params.q = search;
+    if (sort !== "nome") params.sort = sort;
     return params;
-  }, [turno, turma, search]);
+  }, [turno, turma, search, sort]);
 
 
   const {
@@ -204,13 +208,26 @@ export const AlunosPage = () => {
             <option key={t} value={t}>{t}</option>
           ))}
         </TextField>
-        {(search || turno || turma) && (
+        <TextField
+          select
+          label="Ordenar"
+          value={sort}
+          onChange={(e) => setSort(e.target.value)}
+          size="small"
+          sx={{ minWidth: 140 }}
+          SelectProps={{ native: true }}
+        >
+          <option value="nome">Nome</option>
+          <option value="-risk_score">Maior risco</option>
+        </TextField>
+        {(search || turno || turma || sort !== "nome") && (
           <Button
             variant="outlined"
             onClick={() => {
               setSearch("");
               setTurno("");
               setTurma("");
+              setSort("nome");
             }}
             size="small"
           >
@@ -316,6 +333,19 @@ export const AlunosPage = () => {
                           fontWeight: 600
                         }}
                       />
+                      {aluno.risk_score !== null && aluno.risk_score !== undefined && aluno.risk_score >= RISK_ALERT && (
+                        <Chip
+                          label={`Risco ${Math.round(aluno.risk_score * 100)}%`}
+                          size="small"
+                          color="error"
+                          variant="outlined"
+                          sx={{
+                            height: 20,
+                            fontSize: "0.625rem",
+                            fontWeight: 600
+                          }}
+                        />
+                      )}
                       {aluno.faltas !== null && aluno.faltas !== undefined && aluno.faltas > 0 && (
                         <Chip
                           label={`${aluno.faltas} faltas`}
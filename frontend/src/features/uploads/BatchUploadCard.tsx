@@ -0,0 +1,138 @@
+import FolderZipIcon from "@mui/icons-material/FolderZip";
+import {
+  Alert,
+  Box,
+  Button,
+  Card,
+  CardContent,
+  CardHeader,
+  Chip,
+  LinearProgress,
+  List,
+  ListItem,
+  ListItemText,
+  Stack,
+  Typography
+} from "@mui/material";
+import { ChangeEvent, useRef, useState } from "react";
+
+import { useGetUploadBatchQuery, useUploadBoletinsBatchMutation } from "../../lib/api";
+
+const statusColors: Record<string, "default" | "info" | "success" | "error" | "warning"> = {
+  queued: "default",
+  started: "info",
+  finished: "success",
+  failed: "error",
+  expired: "warning"
+};
+
+export const BatchUploadCard = () => {
+  const fileInputRef = useRef<HTMLInputElement | null>(null);
+  const [files, setFiles] = useState<File[]>([]);
+  const [batchId, setBatchId] = useState<string | null>(null);
+  const [error, setError] = useState<string | null>(null);
+
+  const [uploadBatch, { isLoading: isUploading, data: created }] = useUploadBoletinsBatchMutation();
+  const { data: batch } = useGetUploadBatchQuery(batchId || "", {
+    pollingInterval: 3000,
+    skip: !batchId
+  });
+  const finished = batch?.status === "finished";
+
+  const handleFilesChange = (event: ChangeEvent<HTMLInputElement>) => {
+    setFiles(Array.from(event.target.files ?? []));
+  };
+
+  const handleSubmit = async () => {
+    if (!files.length) return;
+    setError(null);
+    try {
+      const response = await uploadBatch(files).unwrap();
+      setBatchId(response.batch_id);
+      setFiles([]);
+      if (fileInputRef.current) {
+        fileInputRef.current.value = "";
+      }
+    } catch (err) {
+      setError((err as { data?: { error?: string } }).data?.error || "Falha ao enviar lote");
+    }
+  };
+
+  const rejected = batch?.rejected ?? created?.rejected ?? [];
+  const items = batch?.files ?? created?.files ?? [];
+
+  return (
+    <Card>
+      <CardHeader
+        title="Envio em lote"
+        subheader="Selecione vários PDFs ou um ZIP: turma e turno são lidos de cada boletim"
+      />
+      {(isUploading || (batchId && !finished)) && (
+        <LinearProgress
+          variant={batch?.total ? "determinate" : "indeterminate"}
+          value={batch?.total ? ((batch.done ?? 0) / batch.total) * 100 : undefined}
+        />
+      )}
+      <CardContent>
+        {error && (
+          <Alert severity="error" sx={{ mb: 2 }}>
+            {error}
+          </Alert>
+        )}
+        {batch && (
+          <Alert severity={finished ? "success" : "info"} sx={{ mb: 2 }}>
+            {finished
+              ? `Lote concluído: ${batch.alunos ?? 0} alunos processados em ${batch.total} arquivos.`
+              : `Processando lote: ${batch.done ?? 0}/${batch.total} arquivos concluídos.`}
+          </Alert>
+        )}
+        <Stack direction={{ xs: "column", md: "row" }} alignItems="center" gap={2}>
+          <Button component="label" variant="outlined" startIcon={<FolderZipIcon />} sx={{ minWidth: 200 }}>
+            Selecionar arquivos
+            <input
+              ref={fileInputRef}
+              type="file"
+              accept="application/pdf,application/zip,.zip"
+              multiple
+              hidden
+              onChange={handleFilesChange}
+            />
+          </Button>
+          <Typography flex={1} color={files.length ? "text.primary" : "text.secondary"}>
+            {files.length ? `${files.length} arquivo(s) selecionado(s)` : "Nenhum arquivo selecionado"}
+          </Typography>
+          <Button variant="contained" onClick={handleSubmit} disabled={!files.length || isUploading}>
+            Enviar lote
+          </Button>
+        </Stack>
+
+        {items.length > 0 && (
+          <List dense sx={{ mt: 2 }}>
+            {items.map((item) => (
+              <ListItem key={item.job_id} secondaryAction={
+                <Chip size="small" label={item.status ?? "queued"} color={statusColors[item.status ?? "queued"] ?? "default"} />
+              }>
+                <ListItemText
+                  primary={item.filename}
+                  secondary={`${item.turma ? `${item.turma} · ${item.turno}` : "lendo turma/turno…"}${item.result ? ` · ${item.result.count} alunos` : ""}${item.error ? ` · ${item.error}` : ""}`}
+                />
+              </ListItem>
+            ))}
+          </List>
+        )}
+        {rejected.length > 0 && (
+          <Box mt={2}>
+            <Typography variant="subtitle2" color="error">
+              Arquivos ignorados
+            </Typography>
+            {rejected.map((item) => (
+              <Typography key={item.filename} variant="body2" color="text.secondary">
+                {item.filename}: {item.error}
+              </Typography>
+            ))}
+          </Box>
+        )}
+      </CardContent>
+    </Card>
+  );
+};
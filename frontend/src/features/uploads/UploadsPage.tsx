@@ -15,9 +15,32 @@ import {
 } from "@mui/material";
 import { ChangeEvent, FormEvent, useEffect, useRef, useState } from "react";
 
+import { useAppSelector } from "../../app/hooks";
 import { useGetJobStatusQuery, useUploadBoletimMutation } from "../../lib/api";
+import { JobProgress, JobSnapshot, streamJobEvents } from "../../lib/jobEvents";
+import { BatchUploadCard } from "./BatchUploadCard";
 
 const turnos = ["Matutino", "Vespertino", "Noturno"];
+const terminalStatuses = ["finished", "failed", "stopped", "canceled"];
+const phaseLabels: Record<string, string> = {
+  parsing: "Lendo páginas",
+  diffing: "Comparando com os dados atuais",
+  writing: "Gravando notas",
+  accounts: "Criando contas de alunos"
+};
+
+const describeProgress = (progress: JobProgress) => {
+  const label = phaseLabels[progress.phase] ?? progress.phase;
+  let message = label;
+  if (progress.total) {
+    message += `: ${progress.done}/${progress.total}`;
+    if (progress.unit === "pages") message += " páginas";
+  }
+  if (progress.eta_seconds) {
+    message += ` (≈ ${Math.ceil(progress.eta_seconds)}s restantes)`;
+  }
+  return message;
+};
 
 export const UploadsPage = () => {
   const fileInputRef = useRef<HTMLInputElement | null>(null);
@@ -27,13 +50,68 @@ export const UploadsPage = () => {
   const [feedback, setFeedback] = useState<{ type: "success" | "error" | "info"; message: string } | null>(null);
   const [currentJobId, setCurrentJobId] = useState<string | null>(null);
 
+  const [liveStatus, setLiveStatus] = useState<JobSnapshot | null>(null);
+  const [progress, setProgress] = useState<JobProgress | null>(null);
+  const [streamFailed, setStreamFailed] = useState(false);
+  const token = useAppSelector((state) => state.auth.accessToken);
+  const tenantId = useAppSelector((state) => state.app.tenantId);
+  const academicYearId = useAppSelector((state) => state.app.academicYearId);
+
   const [uploadBoletim, { isLoading: isUploading }] = useUploadBoletimMutation();
-  const { data: jobStatus } = useGetJobStatusQuery(currentJobId || "", {
+  // Polling is only the fallback for when the event stream is unavailable.
+  const { data: polledStatus } = useGetJobStatusQuery(currentJobId || "", {
     pollingInterval: 2000,
-    skip: !currentJobId
+    skip: !currentJobId || !streamFailed
   });
+  const jobStatus = streamFailed ? polledStatus : liveStatus;
 
   const [queuedStartTime, setQueuedStartTime] = useState<number | null>(null);
+  const [queueCheck, setQueueCheck] = useState(0);
+
+  useEffect(() => {
+    if (!currentJobId || !token) return;
+    const controller = new AbortController();
+    let active = true;
+    const follow = async () => {
+      try {
+        // The server closes long streams; reconnect until the job is done.
+        let terminal = false;
+        while (active && !terminal) {
+          await streamJobEvents(
+            currentJobId,
+            {
+              onStatus: (snapshot) => {
+                terminal = terminalStatuses.includes(snapshot.status);
+                setLiveStatus(snapshot);
+                if (snapshot.progress) setProgress(snapshot.progress);
+              },
+              onProgress: (update) => {
+                setProgress(update);
+                setLiveStatus((current) =>
+                  current && current.status === "queued" ? { ...current, status: "started" } : current
+                );
+              }
+            },
+            { token, tenantId, academicYearId, signal: controller.signal }
+          );
+        }
+      } catch (error) {
+        if (active) setStreamFailed(true);
+      }
+    };
+    follow();
+    return () => {
+      active = false;
+      controller.abort();
+    };
+  }, [currentJobId, token, tenantId, academicYearId]);
+
+  useEffect(() => {
+    if (jobStatus?.status !== "queued" || !queuedStartTime) return;
+    // With streaming there are no polls to re-check the queue wait, so schedule it.
+    const timer = window.setTimeout(() => setQueueCheck((tick) => tick + 1), 15500);
+    return () => window.clearTimeout(timer);
+  }, [jobStatus, queuedStartTime]);
 
   useEffect(() => {
     if (jobStatus) {
@@ -63,11 +141,12 @@ export const UploadsPage = () => {
           setFeedback({ type: "info", message: "Arquivo na fila... Aguardando processamento." });
         }
       } else {
-        setFeedback({ type: "info", message: `Processando arquivo... Status: ${jobStatus.status}` });
+        const message = progress ? describeProgress(progress) : `Status: ${jobStatus.status}`;
+        setFeedback({ type: "info", message: `Processando arquivo... ${message}` });
         setQueuedStartTime(null);
       }
     }
-  }, [jobStatus, queuedStartTime]);
+  }, [jobStatus, queuedStartTime, progress, queueCheck]);
 
   const handleFileChange = (event: ChangeEvent<HTMLInputElement>) => {
     const selected = event.target.files?.[0];
@@ -97,6 +176,9 @@ export const UploadsPage = () => {
         type: "info",
         message: `Upload recebido. Iniciando processamento (Job: ${response.job_id})...`
       });
+      setLiveStatus(null);
+      setProgress(null);
+      setStreamFailed(false);
       setCurrentJobId(response.job_id);
       setFile(null);
       if (fileInputRef.current) {
@@ -120,7 +202,12 @@ export const UploadsPage = () => {
           title="Upload de boletins PDF"
           subheader="Envie arquivos por turno/turma para acionar a ingestão automática"
         />
-        {(isUploading || !!currentJobId) && <LinearProgress />}
+        {(isUploading || !!currentJobId) &&
+          (progress?.total ? (
+            <LinearProgress variant="determinate" value={Math.min(100, (progress.done / progress.total) * 100)} />
+          ) : (
+            <LinearProgress />
+          ))}
         <CardContent>
           {feedback && (
             <Alert severity={feedback.type} sx={{ mb: 2 }}>
@@ -188,6 +275,8 @@ export const UploadsPage = () => {
         </CardContent>
       </Card>
 
+      <BatchUploadCard />
+
       <Card variant="outlined">
         <CardContent>
           <Stack direction="row" alignItems="center" gap={2}>
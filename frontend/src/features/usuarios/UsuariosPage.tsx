@@ -62,7 +62,9 @@ export const UsuariosPage = () => {
   const currentUser = useAppSelector((state) => state.auth.user);
   const isAdmin = Boolean(currentUser?.is_admin || currentUser?.role === "admin");
   const USERS_PER_PAGE = 50;
-  const [page, setPage] = useState(1);
+  // Keyset pagination: cursors[i] is the "after" cursor of page i + 1.
+  const [cursors, setCursors] = useState<(string | undefined)[]>([undefined]);
+  const page = cursors.length;
   const [search, setSearch] = useState("");
   const [roleFilter, setRoleFilter] = useState("");
   const [dialogOpen, setDialogOpen] = useState(false);
@@ -71,17 +73,18 @@ export const UsuariosPage = () => {
   const [formError, setFormError] = useState<string>("");
 
   useEffect(() => {
-    setPage(1);
+    setCursors([undefined]);
   }, [search, roleFilter]);
 
   const filters = useMemo(
     () => ({
       page,
+      after: cursors[cursors.length - 1],
       per_page: USERS_PER_PAGE,
       q: search.trim() || undefined,
       role: roleFilter || undefined
     }),
-    [page, search, roleFilter, USERS_PER_PAGE]
+    [page, cursors, search, roleFilter, USERS_PER_PAGE]
   );
 
   const { data, isFetching, isError } = useListUsuariosQuery(filters, {
@@ -96,6 +99,7 @@ export const UsuariosPage = () => {
   const pageMeta = data?.meta;
   const currentPerPage = pageMeta?.per_page ?? USERS_PER_PAGE;
   const totalPages = pageMeta ? Math.max(1, Math.ceil(pageMeta.total / currentPerPage)) : 1;
+  const nextCursor = pageMeta?.next_cursor ?? null;
 
   const closeDialog = () => {
     setDialogOpen(false);
@@ -284,13 +288,17 @@ export const UsuariosPage = () => {
               Total: {pageMeta?.total ?? usuarios.length}
             </Typography>
             <Stack direction="row" spacing={1}>
-              <Button variant="outlined" disabled={page <= 1} onClick={() => setPage((prev) => Math.max(1, prev - 1))}>
+              <Button
+                variant="outlined"
+                disabled={page <= 1}
+                onClick={() => setCursors((prev) => (prev.length > 1 ? prev.slice(0, -1) : prev))}
+              >
                 Anterior
               </Button>
               <Button
                 variant="outlined"
-                disabled={pageMeta ? pageMeta.page >= totalPages : usuarios.length === 0}
-                onClick={() => setPage((prev) => prev + 1)}
+                disabled={!nextCursor}
+                onClick={() => nextCursor && setCursors((prev) => [...prev, nextCursor])}
               >
                 Próxima
               </Button>
@@ -70,12 +70,14 @@ type ListUsuariosResponse = {
     page: number;
     per_page: number;
     total: number;
+    next_cursor?: string | null;
   };
 };
 
 type ListUsuariosParams = {
   page?: number;
   per_page?: number;
+  after?: string;
   q?: string;
   role?: string;
 };
@@ -141,6 +143,7 @@ export type AlunoSummary = {
   media?: number | null;
   faltas?: number | null;
   status?: string | null;
+  risk_score?: number | null;
 };
 
 
@@ -165,6 +168,8 @@ type ListAlunosParams = {
   q?: string;
   turno?: string;
   turma?: string;
+  sort?: "nome" | "-nome" | "media" | "-media" | "risk_score" | "-risk_score";
+  risk_min?: number;
 };
 
 type ListAlunosResponse = {
@@ -215,14 +220,41 @@ type UploadBoletimPayload = {
   file: File;
   turno: string;
   turma: string;
+  dryRun?: boolean;
 };
 
 type UploadBoletimResponse = {
   filename: string;
+  sha256?: string;
   status: string;
   job_id: string;
   turno: string;
   turma: string;
+  dry_run?: boolean;
+};
+
+export type UploadBatchFile = {
+  filename: string;
+  sha256: string;
+  // Read from the PDF by the file's job; null until it runs.
+  turma?: string | null;
+  turno?: string | null;
+  job_id: string;
+  status?: string;
+  progress?: { phase: string; done: number; total: number | null } | null;
+  result?: { count: number; skipped: boolean; warnings: number };
+  error?: string;
+};
+
+export type UploadBatch = {
+  batch_id: string;
+  status: string;
+  total?: number;
+  done?: number;
+  counts?: Record<string, number>;
+  alunos?: number;
+  files: UploadBatchFile[];
+  rejected: Array<{ filename: string; error: string }>;
 };
 
 type RelatorioResponse = {
@@ -330,11 +362,14 @@ export const api = createApi({
       providesTags: (result, _error, slug) => ["Turmas", { type: "Turmas", id: slug }]
     }),
     uploadBoletim: builder.mutation<UploadBoletimResponse, UploadBoletimPayload>({
-      query: ({ file, turno, turma }) => {
+      query: ({ file, turno, turma, dryRun }) => {
         const formData = new FormData();
         formData.append("file", file);
         formData.append("turno", turno);
         formData.append("turma", turma);
+        if (dryRun) {
+          formData.append("dry_run", "true");
+        }
 
         return {
           url: "/uploads/pdf",
@@ -356,6 +391,22 @@ export const api = createApi({
         params: sanitizeParams(params)
       })
     }),
+    uploadBoletinsBatch: builder.mutation<UploadBatch, File[]>({
+      query: (files) => {
+        const formData = new FormData();
+        files.forEach((file) => formData.append("files", file));
+        return {
+          url: "/uploads/batch",
+          method: "POST",
+          body: formData
+        };
+      },
+      invalidatesTags: ["Uploads", "Turmas", "Alunos", "Dashboard", "Notas"]
+    }),
+    getUploadBatch: builder.query<UploadBatch, string>({
+      query: (batchId) => `/uploads/batches/${batchId}`,
+      keepUnusedDataFor: 0
+    }),
     getJobStatus: builder.query<{ status: string; result?: any; error?: string }, string>({
       query: (jobId) => `/uploads/jobs/${jobId}`,
       keepUnusedDataFor: 0
@@ -580,6 +631,8 @@ export const {
   useListTurmasQuery,
   useGetTurmaAlunosQuery,
   useUploadBoletimMutation,
+  useUploadBoletinsBatchMutation,
+  useGetUploadBatchQuery,
   useGetRelatorioQuery,
   useGetGraficoQuery,
   useGetJobStatusQuery,
@@ -0,0 +1,75 @@
+const API_BASE_URL = import.meta.env.VITE_API_BASE_URL ?? "/api/v1";
+
+export type JobProgress = {
+  phase: string;
+  done: number;
+  total: number | null;
+  eta_seconds: number | null;
+  unit?: string;
+  records?: number;
+  error?: string;
+};
+
+export type JobSnapshot = {
+  job_id: string;
+  status: string;
+  progress?: JobProgress | null;
+  result?: any;
+};
+
+type JobEventHandlers = {
+  onStatus: (snapshot: JobSnapshot) => void;
+  onProgress: (progress: JobProgress) => void;
+};
+
+type StreamOptions = {
+  token: string;
+  tenantId?: number | null;
+  academicYearId?: number | null;
+  signal?: AbortSignal;
+};
+
+/**
+ * Reads the job's server-sent events (`/uploads/jobs/<id>/events`).
+ * Uses fetch instead of EventSource so the Authorization header can be sent.
+ * Resolves when the server closes the stream.
+ */
+export const streamJobEvents = async (jobId: string, handlers: JobEventHandlers, options: StreamOptions) => {
+  const headers: Record<string, string> = { Authorization: `Bearer ${options.token}`, Accept: "text/event-stream" };
+  if (options.tenantId) {
+    headers["X-Tenant-ID"] = options.tenantId.toString();
+  }
+  if (options.academicYearId) {
+    headers["x-academic-year-id"] = options.academicYearId.toString();
+  }
+
+  const response = await fetch(`${API_BASE_URL}/uploads/jobs/${jobId}/events`, { headers, signal: options.signal });
+  if (!response.ok || !response.body) {
+    throw new Error(`Falha ao acompanhar job (${response.status})`);
+  }
+
+  const reader = response.body.getReader();
+  const decoder = new TextDecoder();
+  let buffer = "";
+  for (;;) {
+    const { done, value } = await reader.read();
+    if (done) break;
+    buffer += decoder.decode(value, { stream: true });
+    let boundary = buffer.indexOf("\n\n");
+    while (boundary !== -1) {
+      const frame = buffer.slice(0, boundary);
+      buffer = buffer.slice(boundary + 2);
+      boundary = buffer.indexOf("\n\n");
+
+      let event = "message";
+      let data = "";
+      for (const line of frame.split("\n")) {
+        if (line.startsWith("event:")) event = line.slice(6).trim();
+        else if (line.startsWith("data:")) data += line.slice(5).trim();
+      }
+      if (!data) continue;
+      if (event === "status") handlers.onStatus(JSON.parse(data));
+      else if (event === "progress") handlers.onProgress(JSON.parse(data));
+    }
+  }
+};